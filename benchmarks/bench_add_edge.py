@@ -0,0 +1,105 @@
+"""Time to build generated pipelines edge by edge.
+
+Compares checking the whole graph for cycles after each edge (and scanning the
+nodes for its ends), the previous behaviour of ``Pipeline.add_edge``, with the
+incrementally maintained topological order. The pipelines are built through
+``Pipelines.add_edge_to`` (without and with a store logging each edit) and
+``Pipeline.from_pipeline_config``, with their edges added in a random order so
+that many of them need reordering.
+"""
+import os
+import tempfile
+
+import networkx as nx
+
+from benchmarks.utils import (
+    bench_step_node,
+    make_config,
+    make_dag_edges,
+    timeit,
+)
+from chimerapy.orchestrator.services.pipeline_service import Pipelines
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    NotADagError,
+    Pipeline,
+)
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    SQLitePipelineStore,
+)
+
+SIZES = [1000, 2000, 10000]
+MAX_LEGACY_SIZE = 2000
+
+
+class LegacyPipeline(Pipeline):
+    def add_edge(self, source, sink, *, edge_id=None):
+        edge = {}
+        for node_id, data in self.nodes(data=True):
+            if node_id in (source, sink):
+                edge["source" if node_id == source else "sink"] = data[
+                    "wrapped_node"
+                ]
+        nx.DiGraph.add_edge(self, source, sink, id=edge_id)
+        if not self.is_dag():
+            nx.DiGraph.remove_edge(self, source, sink)
+            raise NotADagError(edge)
+        return edge
+
+
+def through_service(
+    num_nodes: int, pipeline_class=Pipeline, stored: bool = False
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        store = (
+            SQLitePipelineStore(os.path.join(directory, "pipelines.db"))
+            if stored
+            else None
+        )
+        build_through(Pipelines(store=store), num_nodes, pipeline_class)
+
+
+def build_through(pipelines: Pipelines, num_nodes: int, pipeline_class) -> None:
+    pipeline = pipeline_class("bench")
+    pipelines._add_pipeline(pipeline)
+    ids = [
+        pipelines.add_node_to(pipeline.id, bench_step_node()).unwrap().id
+        for _ in range(num_nodes)
+    ]
+    for i, j in make_dag_edges(num_nodes):
+        pipelines.add_edge_to(pipeline.id, (ids[i], ids[j])).unwrap()
+
+
+def main():
+    print(f"{'nodes':>8}{'edges':>8}{'path':>10}{'legacy s':>12}{'new s':>12}")
+    for num_nodes in SIZES:
+        config = make_config(num_nodes)
+        for path, build, build_legacy in [
+            (
+                "service",
+                lambda n=num_nodes: through_service(n),
+                lambda n=num_nodes: through_service(n, LegacyPipeline),
+            ),
+            (
+                "stored",
+                lambda n=num_nodes: through_service(n, stored=True),
+                lambda n=num_nodes: through_service(n, LegacyPipeline, True),
+            ),
+            (
+                "config",
+                lambda c=config: Pipeline.from_pipeline_config(c),
+                lambda c=config: LegacyPipeline.from_pipeline_config(c),
+            ),
+        ]:
+            legacy = (
+                f"{timeit(build_legacy, repeat=1):>12.2f}"
+                if num_nodes <= MAX_LEGACY_SIZE
+                else f"{'-':>12}"
+            )
+            print(
+                f"{num_nodes:>8}{len(config.adj):>8}{path:>10}{legacy}"
+                f"{timeit(build, repeat=3):>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Cross-worker traffic of the placement strategies.
+
+Multi-participant video pipelines: each participant has a webcam (sending
+about 2.7 MB/s) feeding a pose estimator and a preview window, and the pose
+estimators send their few KB/s to one shared aggregator. The clusters have a
+worker per 4 participants, and the diagnostics of a previous run give the CPU
+usage and payload size of each node. For each strategy: the planning time, the
+expected bytes per second sent between workers and the CPU spread between the
+most and the least loaded workers.
+"""
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    PlacementRequest,
+)
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    PlacementEngine,
+)
+from chimerapy.orchestrator.services.pipeline_service import Pipeline
+
+PARTICIPANTS = [8, 40, 200]
+
+# The CPU usage (%) and the payload size (KB) per diagnostics interval
+PROFILES = {
+    "webcam": (10.0, 27000.0),
+    "pose": (30.0, 50.0),
+    "show": (5.0, 0.0),
+    "aggregator": (20.0, 10.0),
+}
+
+
+def make_pipeline(participants: int) -> Pipeline:
+    step = bench_step_node()
+    pipeline = Pipeline(name="video")
+    aggregator = pipeline.add_node(step, name="aggregator")
+    for p in range(participants):
+        webcam = pipeline.add_node(step, name=f"webcam-{p}")
+        pose = pipeline.add_node(step, name=f"pose-{p}")
+        show = pipeline.add_node(step, name=f"show-{p}")
+        pipeline.add_edge(webcam.id, pose.id)
+        pipeline.add_edge(webcam.id, show.id)
+        pipeline.add_edge(pose.id, aggregator.id)
+    return pipeline
+
+
+def make_state(pipeline: Pipeline, num_workers: int) -> ClusterState:
+    """A cluster where the nodes of a previous run are all on the first worker."""
+    nodes = {}
+    for _, wrapped_node in pipeline.nodes(data="wrapped_node"):
+        name = wrapped_node.kwargs["name"]
+        cpu, payload_size = PROFILES[name.split("-")[0]]
+        nodes[f"previous-{name}"] = {
+            "id": f"previous-{name}",
+            "name": name,
+            "fsm": "STOPPED",
+            "diagnostics": {
+                "timestamp": "",
+                "latency": 0.0,
+                "payload_size": payload_size,
+                "memory_usage": 1e5,
+                "cpu_usage": cpu,
+                "num_of_steps": 300,
+            },
+        }
+    workers = {
+        f"worker-{w:03}": {
+            "id": f"worker-{w:03}",
+            "name": f"Worker{w}",
+            "nodes": nodes if w == 0 else {},
+        }
+        for w in range(num_workers)
+    }
+    return ClusterState.model_validate({"workers": workers})
+
+
+def main():
+    engine = PlacementEngine(diagnostics_interval=10)
+    print(
+        f"{'people':>7}{'workers':>8}{'strategy':>14}{'plan ms':>9}"
+        f"{'total MB/s':>12}{'cross MB/s':>12}{'max cpu':>9}{'min cpu':>9}"
+    )
+    for participants in PARTICIPANTS:
+        pipeline = make_pipeline(participants)
+        state = make_state(pipeline, participants // 4)
+        total = sum(engine.traffic(pipeline, state).values())
+        for strategy in ("round-robin", "least-loaded", "min-cut"):
+            request = PlacementRequest(strategy=strategy)
+            elapsed = timeit(
+                lambda p=pipeline, s=state, r=request: engine.plan(p, s, r),
+                repeat=3,
+            )
+            plan = engine.plan(pipeline, state, request)
+            loads = [worker.cpu for worker in plan.workers.values()]
+            print(
+                f"{participants:>7}{len(state.workers):>8}{strategy:>14}"
+                f"{elapsed * 1e3:>9.1f}{total / 1e6:>12.1f}"
+                f"{plan.cross_worker_traffic / 1e6:>12.2f}"
+                f"{max(loads):>9.0f}{min(loads):>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
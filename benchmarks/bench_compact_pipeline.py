@@ -0,0 +1,92 @@
+"""Memory and iteration cost of large generated pipelines.
+
+Compares the networkx backed ``Pipeline`` with ``CompactPipeline``, both
+built from the same config, and loaded from its web JSON as a stored pipeline
+is: the memory allocated for the pipeline (as traced by ``tracemalloc``, the
+registered nodes being shared), the time to walk every node and its
+successors, to read an attribute of every node, to order the nodes
+topologically (as after each batch edit) and to build the web JSON.
+"""
+import gc
+import json
+import tracemalloc
+
+from benchmarks.utils import make_config, timeit
+from chimerapy.orchestrator.services.pipeline_service import (
+    CompactPipeline,
+    Pipeline,
+)
+
+SIZES = [1000, 5000, 20000]
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    pipeline = build()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return pipeline, allocated
+
+
+def walk(pipeline) -> int:
+    """Visits each node and its successors, as a scheduler would."""
+    visited = 0
+    for node_id in pipeline:
+        for _ in pipeline.successors(node_id):
+            visited += 1
+    return visited
+
+
+def worker_ids(pipeline) -> list:
+    """Reads an attribute of each node, as ``worker_graph_mapping`` does."""
+    return [
+        wrapped_node.worker_id
+        for _, wrapped_node in pipeline.nodes(data="wrapped_node")
+    ]
+
+
+def main():
+    print(
+        f"{'nodes':>8}{'built':>8}{'backend':>10}{'MiB':>8}{'B/node':>8}"
+        f"{'walk ms':>10}{'nodes ms':>10}{'order ms':>10}{'json ms':>10}"
+    )
+    for num_nodes in SIZES:
+        config = make_config(num_nodes)
+        document = json.dumps(
+            Pipeline.from_pipeline_config(config).to_web_json()
+        )
+        for built, pipeline_class in [
+            ("config", Pipeline),
+            ("config", CompactPipeline),
+            ("json", Pipeline),
+            ("json", CompactPipeline),
+        ]:
+            if built == "config":
+                pipeline, allocated = traced(
+                    lambda c=pipeline_class, config=config: (
+                        c.from_pipeline_config(config)
+                    )
+                )
+            else:
+                web_json = json.loads(document)
+                pipeline, allocated = traced(
+                    lambda c=pipeline_class, web_json=web_json: (
+                        c.from_web_json(web_json)
+                    )
+                )
+            walked = timeit(lambda p=pipeline: walk(p))
+            read = timeit(lambda p=pipeline: worker_ids(p))
+            ordered = timeit(lambda p=pipeline: p._reset_order())
+            jsoned = timeit(lambda p=pipeline: p._build_web_json(), repeat=3)
+            print(
+                f"{num_nodes:>8}{built:>8}{pipeline_class.__name__[:7]:>10}"
+                f"{allocated / 2**20:>8.1f}{allocated // num_nodes:>8}"
+                f"{walked * 1e3:>10.1f}{read * 1e3:>10.1f}"
+                f"{ordered * 1e3:>10.1f}{jsoned * 1e3:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time to decode a manager update message into an ``UpdateMessage``.
+
+Compares the round trip through the engine's ``ManagerState`` (the previous
+decode path) with validating the wire dict directly, and with constructing the
+models from it without validation (``model_construct``).
+"""
+from benchmarks.utils import make_manager_state_dict, timeit
+from chimerapy.engine.states import ManagerState
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    NodeDiagnostics,
+    NodeState,
+    RegisteredMethod,
+    UpdateMessage,
+    UpdateMessageType,
+    WorkerState,
+)
+
+NUM_MESSAGES = 200
+WORKERS = [1, 10, 100]
+NODES_PER_WORKER = 5
+
+
+def via_engine_state(msg):
+    data = ManagerState.from_dict(msg["data"])
+    return UpdateMessage(
+        signal=UpdateMessageType.NETWORK_UPDATE,
+        data=ClusterState.from_cp_manager_state(data, False),
+    )
+
+
+def validated(msg):
+    return UpdateMessage.from_updates_dict(
+        msg, UpdateMessageType.NETWORK_UPDATE, False
+    )
+
+
+def _construct_worker(worker):
+    nodes = {}
+    for node_id, node in worker["nodes"].items():
+        nodes[node_id] = NodeState.model_construct(
+            **{
+                **node,
+                "registered_methods": {
+                    key: RegisteredMethod.model_construct(**method)
+                    for key, method in node["registered_methods"].items()
+                },
+                "diagnostics": NodeDiagnostics.model_construct(
+                    **node["diagnostics"]
+                ),
+            }
+        )
+    return WorkerState.model_construct(**{**worker, "nodes": nodes})
+
+
+def constructed(msg):
+    data = msg["data"]
+    return UpdateMessage.model_construct(
+        signal=UpdateMessageType.NETWORK_UPDATE,
+        data=ClusterState.model_construct(
+            **{
+                **data,
+                "workers": {
+                    worker_id: _construct_worker(worker)
+                    for worker_id, worker in data["workers"].items()
+                },
+                "zeroconf_discovery": False,
+            }
+        ),
+    )
+
+
+def main():
+    decoders = [via_engine_state, validated, constructed]
+    print(
+        f"{'workers':>8}"
+        + "".join(f"{d.__name__ + ' us':>20}" for d in decoders)
+    )
+    for num_workers in WORKERS:
+        msg = {"data": make_manager_state_dict(num_workers, NODES_PER_WORKER)}
+        num_messages = max(NUM_MESSAGES // num_workers, 10)
+        row = f"{num_workers:>8}"
+        for decode in decoders:
+            elapsed = timeit(
+                lambda: [decode(msg) for _ in range(num_messages)]  # noqa: B023
+            )
+            row += f"{elapsed / num_messages * 1e6:>20.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Payload size and encode/decode time of the update frames, JSON vs msgpack.
+
+The payloads are network updates of realistic cluster states, as sent to the
+subscribers of ``/cluster/updates``.
+"""
+import json
+
+import msgpack
+
+from benchmarks.utils import make_manager_state_dict, timeit
+from chimerapy.orchestrator.models.cluster_models import (
+    UpdateMessage,
+    UpdateMessageType,
+)
+from chimerapy.orchestrator.services.cluster_service.frames import dumps, packb
+
+WORKERS = [1, 10, 100]
+NODES_PER_WORKER = 5
+REPEAT = 100
+
+
+def main():
+    print(
+        f"{'workers':>8} {'codec':>8} {'bytes':>9} {'encode us':>10} "
+        f"{'decode us':>10}"
+    )
+    for num_workers in WORKERS:
+        payload = UpdateMessage.from_updates_dict(
+            {"data": make_manager_state_dict(num_workers, NODES_PER_WORKER)},
+            UpdateMessageType.NETWORK_UPDATE,
+            False,
+        ).model_dump(mode="json")
+
+        for codec, encode, decode in [
+            ("json", dumps, json.loads),
+            ("msgpack", packb, msgpack.unpackb),
+        ]:
+            data = encode(payload)
+            size = len(data.encode() if isinstance(data, str) else data)
+            encode_time = timeit(
+                lambda: [encode(payload) for _ in range(REPEAT)]  # noqa: B023
+            )
+            decode_time = timeit(
+                lambda: [decode(data) for _ in range(REPEAT)]  # noqa: B023
+            )
+            print(
+                f"{num_workers:>8} {codec:>8} {size:>9} "
+                f"{encode_time / REPEAT * 1e6:>10.1f} "
+                f"{decode_time / REPEAT * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""CPU time per cluster update when fanned out to many websocket clients.
+
+Compares encoding the update once per client (``send_json``) with sending the
+shared, once encoded, frames of the broadcaster.
+"""
+import asyncio
+import json
+import time
+
+from starlette.websockets import WebSocketState
+
+from benchmarks.utils import make_manager_state_dict
+from chimerapy.orchestrator.models.cluster_models import (
+    UpdateMessage,
+    UpdateMessageType,
+)
+from chimerapy.orchestrator.routers.updates_session import UpdatesSession
+from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    UpdatesBroadcaster,
+)
+
+NUM_UPDATES = 50
+CLIENTS = [1, 10, 50, 100, 500]
+
+
+class FakeWebSocket:
+    """Just enough of a starlette WebSocket for the updates sessions."""
+
+    client_state = WebSocketState.CONNECTED
+
+    async def receive(self):
+        await asyncio.Event().wait()
+
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def send_json(self, data) -> None:
+        await self.send_text(
+            json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        )
+
+
+class LegacySession(UpdatesSession):
+    """Encodes each update for every client, as ``send_json`` does."""
+
+    async def _send_batch(self, batch) -> bool:
+        for message in batch:
+            if self.is_sentinel(message):
+                return False
+            await self.ws.send_json(message.payload)
+        return True
+
+
+async def run(num_clients: int, session_cls) -> float:
+    broadcaster = UpdatesBroadcaster("STOP", max_queue_size=0)
+    await broadcaster.initialize()
+    broadcast_task = asyncio.create_task(broadcaster.start_broadcast())
+
+    relays = []
+    for _ in range(num_clients):
+        session = session_cls(FakeWebSocket(), lambda msg: msg == "STOP")
+        await broadcaster.add_client(session.queue)
+        relays.append(asyncio.create_task(session.run()))
+
+    state = make_manager_state_dict(num_workers=10, nodes_per_worker=5)
+    start = time.process_time()
+    for _ in range(NUM_UPDATES):
+        msg = UpdateMessage.from_updates_dict(
+            {"data": state}, UpdateMessageType.NETWORK_UPDATE, False
+        )
+        await broadcaster.put_update(msg.model_dump(mode="json"))
+    broadcaster.enqueue_sentinel()
+    await asyncio.gather(broadcast_task, *relays)
+    return (time.process_time() - start) / NUM_UPDATES
+
+
+def main():
+    print(f"{'clients':>8} {'per-client ms':>14} {'encode-once ms':>15}")
+    for num_clients in CLIENTS:
+        legacy = asyncio.run(run(num_clients, LegacySession))
+        shared = asyncio.run(run(num_clients, UpdatesSession))
+        print(f"{num_clients:>8} {legacy * 1e3:>14.3f} {shared * 1e3:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Time of the instantiate/destroy cycles of a reset loop.
+
+Compares constructing every node on each instantiation with reusing the
+instances released to a ``NodeInstancePool`` by the previous reset.
+"""
+import asyncio
+
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+
+NUM_NODES = 200
+NUM_CYCLES = 10
+
+
+def make_pipeline(num_nodes: int) -> Pipeline:
+    pipeline = Pipeline("bench")
+    for n in range(num_nodes):
+        node = pipeline.add_node(bench_step_node(), name=f"step-{n}")
+        node.worker_id = f"worker-{n % 10}"
+    return pipeline
+
+
+async def cycles(pipeline: Pipeline, pool=None) -> None:
+    for _ in range(NUM_CYCLES):
+        await pipeline.instantiate_async(pool=pool)
+        pipeline.destroy(pool)
+
+
+def main():
+    pipeline = make_pipeline(NUM_NODES)
+    pool = NodeInstancePool(capacity=NUM_NODES)
+
+    print(f"{NUM_NODES} nodes, {NUM_CYCLES} reset cycles")
+    print(f"{'path':>10}{'ms/cycle':>12}")
+    for name, cycle_pool in [("construct", None), ("pooled", pool)]:
+        elapsed = timeit(
+            lambda: asyncio.run(cycles(pipeline, cycle_pool)),  # noqa: B023
+            repeat=3,
+        )
+        print(f"{name:>10}{elapsed / NUM_CYCLES * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cost of listing the pipelines for a pipeline picker.
+
+Compares encoding the full list of pipelines (as ``/pipeline/list`` without
+parameters) with a page of their ids and names, and the lookup of the
+pipelines by name with a linear scan and with the index.
+"""
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.services.pipeline_service.pipelines import (
+    Pipelines,
+)
+
+NUM_PIPELINES = 5000
+NUM_NODES = 20
+PAGE = 50
+
+
+def make_pipelines() -> Pipelines:
+    pipelines = Pipelines()
+    for p in range(NUM_PIPELINES):
+        pipeline = pipelines.create_pipeline(
+            f"pipeline-{p % 100}", "", tags=[f"tag-{p % 10}"]
+        ).unwrap()
+        for n in range(NUM_NODES):
+            pipeline.add_node(bench_step_node(), name=f"step-{n}")
+    return pipelines
+
+
+def scan_by_name(pipelines: Pipelines, name: str) -> list:
+    return [p for p in pipelines._pipelines.values() if p.name == name]
+
+
+def main():
+    pipelines = make_pipelines()
+    _, cursor = pipelines.list_pipelines(limit=NUM_PIPELINES // 2).unwrap()
+
+    def invalidate():
+        # Edits invalidate the cached web JSON of the pipelines
+        for pipeline in pipelines._pipelines.values():
+            pipeline.touch()
+
+    def full_list():
+        invalidate()
+        pipelines.web_json_bytes().unwrap()
+
+    def page():
+        # The projected fields are read without the web JSON
+        pipelines.list_pipelines(
+            {"tag": "tag-3"}, cursor=cursor, limit=PAGE, fields=["id", "name"]
+        ).unwrap()
+
+    results = [
+        ("full list", timeit(full_list, repeat=3)),
+        (f"page of {PAGE}", timeit(page)),
+        ("scan by name", timeit(lambda: scan_by_name(pipelines, "pipeline-7"))),
+        (
+            "index by name",
+            timeit(lambda: pipelines.get_pipelines_by_name("pipeline-7")),
+        ),
+    ]
+    print(f"{NUM_PIPELINES} pipelines of {NUM_NODES} nodes")
+    print(f"{'listing':>16}{'ms':>10}")
+    for name, elapsed in results:
+        print(f"{name:>16}{elapsed * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
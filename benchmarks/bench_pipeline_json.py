@@ -0,0 +1,58 @@
+"""Time to get the web JSON of a large pipeline.
+
+Compares rebuilding every ``WebNode`` on each call (the previous behaviour of
+``Pipeline.to_web_json``) with the representation cached until the next
+mutation, and with its cached encoding as served by the REST routes.
+"""
+import json
+
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+
+NUM_NODES = 500
+NUM_CALLS = 100
+
+
+def make_pipeline(num_nodes: int) -> Pipeline:
+    pipeline = Pipeline("bench")
+    previous = None
+    for n in range(num_nodes):
+        node = pipeline.add_node(
+            bench_step_node(), name=f"step-{n}", worker_id=f"worker-{n % 10}"
+        )
+        if previous is not None:
+            pipeline.add_edge(previous.id, node.id)
+        previous = node
+    return pipeline
+
+
+def main():
+    pipeline = make_pipeline(NUM_NODES)
+
+    def rebuilt():
+        return json.dumps(pipeline._build_web_json()).encode("utf-8")
+
+    def cached():
+        return json.dumps(pipeline.to_web_json()).encode("utf-8")
+
+    def cached_bytes():
+        return pipeline.to_web_json_bytes()
+
+    print(f"{NUM_NODES} nodes, {len(cached_bytes())} bytes")
+    print(f"{'path':>14}{'us/call':>12}")
+    for encode in [rebuilt, cached, cached_bytes]:
+        elapsed = timeit(
+            lambda: [encode() for _ in range(NUM_CALLS)]  # noqa: B023
+        )
+        print(f"{encode.__name__:>14}{elapsed / NUM_CALLS * 1e6:>12.1f}")
+
+    def mutate_and_get():
+        pipeline.description = "bench"
+        return pipeline.to_web_json_bytes()
+
+    elapsed = timeit(lambda: [mutate_and_get() for _ in range(NUM_CALLS)])
+    print(f"{'after mutation':>14}{elapsed / NUM_CALLS * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Placing the nodes of large pipelines on a cluster.
+
+For each placement strategy: the time to plan the placement of a generated
+pipeline on the workers of a cluster whose nodes, from a previous run of the
+pipeline, report heterogeneous CPU and memory usages, the spread of the CPU
+load between the most and the least loaded workers and the number of workers
+used. Bin packing is given a CPU capacity per worker.
+"""
+import random
+
+from benchmarks.utils import make_config, timeit
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    PlacementRequest,
+    WorkerCapacity,
+)
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    PlacementEngine,
+)
+from chimerapy.orchestrator.services.pipeline_service import Pipeline
+
+SIZES = [(100, 5), (1000, 20), (5000, 50)]
+
+
+def make_state(num_nodes: int, num_workers: int, seed: int = 0) -> ClusterState:
+    """A cluster where the nodes of a previous run are all on the first worker."""
+    rng = random.Random(seed)
+    nodes = {
+        f"previous-{n}": {
+            "id": f"previous-{n}",
+            "name": f"step-{n}",
+            "fsm": "STOPPED",
+            "diagnostics": {
+                "timestamp": "",
+                "latency": 0.0,
+                "payload_size": 0.0,
+                "memory_usage": rng.uniform(1e4, 1e6),
+                "cpu_usage": rng.expovariate(1 / 5),
+                "num_of_steps": 0,
+            },
+        }
+        for n in range(num_nodes)
+    }
+    workers = {
+        f"worker-{w:03}": {
+            "id": f"worker-{w:03}",
+            "name": f"Worker{w}",
+            "nodes": nodes if w == 0 else {},
+        }
+        for w in range(num_workers)
+    }
+    return ClusterState.model_validate({"workers": workers})
+
+
+def main():
+    engine = PlacementEngine()
+    print(
+        f"{'nodes':>6}{'workers':>8}{'strategy':>14}{'plan ms':>10}"
+        f"{'max cpu':>10}{'min cpu':>10}{'used':>6}"
+    )
+    for num_nodes, num_workers in SIZES:
+        pipeline = Pipeline.from_pipeline_config(make_config(num_nodes))
+        state = make_state(num_nodes, num_workers)
+        total_cpu = sum(
+            node.diagnostics.cpu_usage
+            for node in state.workers["worker-000"].nodes.values()
+        )
+        capacity = WorkerCapacity(cpu=1.2 * total_cpu / num_workers)
+        for strategy in ("round-robin", "least-loaded", "bin-packing"):
+            request = PlacementRequest(
+                strategy=strategy,
+                default_capacity=(
+                    capacity if strategy == "bin-packing" else WorkerCapacity()
+                ),
+            )
+            elapsed = timeit(
+                lambda p=pipeline, s=state, r=request: engine.plan(p, s, r),
+                repeat=3,
+            )
+            plan = engine.plan(pipeline, state, request)
+            loads = [worker.cpu for worker in plan.workers.values()]
+            used = sum(1 for worker in plan.workers.values() if worker.nodes)
+            print(
+                f"{num_nodes:>6}{num_workers:>8}{strategy:>14}"
+                f"{elapsed * 1e3:>10.1f}{max(loads):>10.1f}"
+                f"{min(loads):>10.1f}{used:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
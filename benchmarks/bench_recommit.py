@@ -0,0 +1,210 @@
+"""Committing a pipeline again after changing one of its nodes.
+
+Pipelines with a chain of nodes (a source feeding steps feeding a sink) per
+worker are committed, one node changed (renamed or moved to another worker)
+and committed again: in full (the cluster reset and every node created again)
+or incrementally (``recommit``, only the nodes of the ``Deployment.diff``
+redeployed). For each: the time to plan the incremental commit, the number of
+nodes created and the commit time.
+
+The commits run against a simulated manager, with the requests of the
+engine's manager taking fixed times: starting a node process (NODE_STARTUP
+seconds), destroying a node (NODE_SHUTDOWN) and setting up the connections of
+a worker (CONNECTION). The node processes are started one at a time per
+worker when each worker has its own host, HOST_CORES at a time when the
+workers share a host (as the local workers of the dev mode do). The times are
+scaled down from what a node process takes to start (importing its
+dependencies, setting up its publisher and reporting back), so the ratios are
+what matter.
+"""
+import asyncio
+import time
+from collections import defaultdict
+
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.services.cluster_service.deployment import (
+    Deployment,
+    recommit,
+)
+from chimerapy.orchestrator.services.pipeline_service import Pipeline
+
+SIZES = [(4, 8), (16, 8), (64, 16)]
+CHANGES = ["none", "sink", "source", "moved"]
+
+NODE_STARTUP = 0.010
+NODE_SHUTDOWN = 0.002
+CONNECTION = 0.005
+HOST_CORES = 4
+
+
+class _WorkerHandler:
+    def _map_graph(self, worker_graph_map):
+        pass
+
+
+class _EventBus:
+    async def asend(self, event):
+        pass
+
+
+class SimulatedManager:
+    """The requests of the engine's manager ``recommit`` and ``async_commit`` make."""
+
+    def __init__(self, shared_host: bool):
+        self.worker_handler = _WorkerHandler()
+        self.eventbus = _EventBus()
+        host = asyncio.Semaphore(HOST_CORES)
+        self.hosts = defaultdict(
+            (lambda: host) if shared_host else asyncio.Semaphore
+        )
+        self.deployed = {}
+        self.created = 0
+
+    def _register_graph(self, graph):
+        pass
+
+    async def _async_request_node_creation(self, worker_id, node_id):
+        async with self.hosts[worker_id]:
+            await asyncio.sleep(NODE_STARTUP)
+        self.deployed[node_id] = worker_id
+        self.created += 1
+        return True
+
+    async def _async_request_node_destruction(self, worker_id, node_id):
+        await asyncio.sleep(NODE_SHUTDOWN)
+        del self.deployed[node_id]
+        return True
+
+    async def _async_request_node_pub_table(self, worker_id):
+        return True
+
+    async def _async_request_connection_creation(self, worker_id):
+        await asyncio.sleep(CONNECTION)
+        return True
+
+    async def async_reset(self, keep_workers=True):
+        await asyncio.gather(
+            *(
+                self._async_request_node_destruction(worker_id, node_id)
+                for node_id, worker_id in list(self.deployed.items())
+            )
+        )
+
+    async def async_commit(self, graph, mapping):
+        created = await asyncio.gather(
+            *(
+                self._async_request_node_creation(worker_id, node_id)
+                for worker_id, node_ids in mapping.items()
+                for node_id in node_ids
+            )
+        )
+        connected = await asyncio.gather(
+            *(self._async_request_connection_creation(w) for w in mapping)
+        )
+        return all(created) and all(connected)
+
+
+def make_pipeline(num_workers: int, chain_length: int) -> Pipeline:
+    step = bench_step_node()
+    pipeline = Pipeline(name="chains")
+    for w in range(num_workers):
+        previous = None
+        for n in range(chain_length):
+            node = pipeline.add_node(step, name=f"node-{w}-{n}")
+            node.worker_id = f"worker-{w}"
+            if previous is not None:
+                pipeline.add_edge(previous.id, node.id)
+            previous = node
+    return pipeline
+
+
+def change(pipeline: Pipeline, kind: str, chain_length: int) -> None:
+    nodes = {
+        wrapped_node.kwargs["name"]: wrapped_node
+        for _, wrapped_node in pipeline.nodes(data="wrapped_node")
+    }
+    if kind == "sink":
+        nodes[f"node-0-{chain_length - 1}"].kwargs["name"] = "sink"
+    elif kind == "source":
+        nodes["node-0-0"].kwargs["name"] = "source"
+    elif kind == "moved":
+        nodes[f"node-0-{chain_length - 1}"].worker_id = "worker-1"
+
+
+async def commit_twice(
+    pipeline: Pipeline, kind: str, chain_length: int, mode, shared_host
+):
+    """The time and number of nodes created to commit the changed pipeline."""
+    manager = SimulatedManager(shared_host)
+    pipeline.instantiate()
+    await manager.async_commit(
+        pipeline.chimerapy_graph, pipeline.worker_graph_mapping()
+    )
+    deployment = Deployment.of(pipeline)
+    workers = set(manager.deployed.values())
+    pipeline.destroy()
+    change(pipeline, kind, chain_length)
+    pipeline.instantiate()
+    manager.created = 0
+
+    start = time.perf_counter()
+    if mode == "full":
+        await manager.async_reset()
+        await manager.async_commit(
+            pipeline.chimerapy_graph, pipeline.worker_graph_mapping()
+        )
+    else:
+        plan = deployment.diff(pipeline, workers)
+        pipeline.adopt_instances(
+            {node_id: node.instance for node_id, node in plan.kept.items()}
+        )
+        await recommit(manager, pipeline, plan)
+    elapsed = time.perf_counter() - start
+    pipeline.destroy()
+    return elapsed, manager.created
+
+
+def main():
+    print(
+        f"{'hosts':>7}{'workers':>8}{'nodes':>7}{'change':>8}{'plan ms':>9}"
+        f"{'full':>6}{'full s':>8}{'incr':>6}{'incr s':>8}{'speedup':>9}"
+    )
+    for shared_host in (False, True):
+        for num_workers, chain_length in SIZES:
+            for kind in CHANGES:
+                run(num_workers, chain_length, kind, shared_host)
+
+
+def run(num_workers, chain_length, kind, shared_host):
+    pipeline = make_pipeline(num_workers, chain_length)
+    pipeline.instantiate()
+    deployment = Deployment.of(pipeline)
+    pipeline.destroy()
+    change(pipeline, kind, chain_length)
+    workers = {f"worker-{w}" for w in range(num_workers)}
+    planning = timeit(
+        lambda p=pipeline, d=deployment, w=workers: d.diff(p, w), repeat=3
+    )
+    commits = {
+        mode: asyncio.run(
+            commit_twice(
+                make_pipeline(num_workers, chain_length),
+                kind,
+                chain_length,
+                mode,
+                shared_host,
+            )
+        )
+        for mode in ("full", "incremental")
+    }
+    (full, full_created), (incremental, created) = commits.values()
+    print(
+        f"{'shared' if shared_host else 'own':>7}{num_workers:>8}"
+        f"{pipeline.number_of_nodes():>7}{kind:>8}{planning * 1e3:>9.2f}"
+        f"{full_created:>6}{full:>8.3f}{created:>6}{incremental:>8.3f}"
+        f"{full / incremental:>9.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
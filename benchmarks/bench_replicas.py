@@ -0,0 +1,109 @@
+"""Building multi-participant pipelines from a template.
+
+Compares adding the per participant subgraph node by node and edge by edge
+through the pipelines service (as with one REST call each) with adding all
+the replicas of a template at once, and the size of the templated config
+with the equivalent expanded one.
+"""
+import json
+
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.models.pipeline_config import (
+    ReplicasConfig,
+    TemplateConfig,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipelines import (
+    Pipelines,
+)
+
+PARTICIPANTS = [10, 50, 200]
+
+
+def make_template() -> TemplateConfig:
+    step = bench_step_node()
+    return TemplateConfig(
+        name="participant",
+        parameters={"fps": 30},
+        nodes=[
+            {"registry_name": "WebcamNode", "name": "webcam"},
+            {
+                "registry_name": step,
+                "name": "detect",
+                "kwargs": {"fps": "{fps}"},
+            },
+            {"registry_name": step, "name": "track"},
+            {"registry_name": "ShowWindow", "name": "show"},
+        ],
+        adj=[("webcam", "detect"), ("detect", "track"), ("track", "show")],
+    )
+
+
+def by_hand(template: TemplateConfig, count: int) -> None:
+    pipelines = Pipelines()
+    pipeline_id = pipelines.create_pipeline("by-hand").unwrap().id
+    for index in range(1, count + 1):
+        ids = {}
+        for node in template.nodes:
+            ids[node.name] = (
+                pipelines.add_node_to(
+                    pipeline_id,
+                    node.registry_name,
+                    name=f"participant-{index}-{node.name}",
+                )
+                .unwrap()
+                .id
+            )
+        for source, sink in template.adj:
+            pipelines.add_edge_to(pipeline_id, (ids[source], ids[sink]))
+
+
+def replicated(template: TemplateConfig, count: int) -> None:
+    pipelines = Pipelines()
+    pipeline_id = pipelines.create_pipeline("replicated").unwrap().id
+    pipelines.add_replicas_to(
+        pipeline_id,
+        template,
+        ReplicasConfig(count=count, workers=["worker-{index}"]),
+    ).unwrap()
+
+
+def config_sizes(template: TemplateConfig, count: int):
+    replicas = ReplicasConfig(count=count, workers=["worker-{index}"])
+    templated = {
+        "templates": [template.model_dump(mode="json")],
+        "replicas": [{"template": template.name, **replicas.model_dump()}],
+    }
+    expanded = replicas.expand(template)
+    plain = {
+        "nodes": [
+            node.model_dump(mode="json")
+            for replica in expanded
+            for node in replica.nodes
+        ],
+        "adj": [edge for replica in expanded for edge in replica.edges],
+        "mappings": {
+            replica.worker_id: [node.name for node in replica.nodes]
+            for replica in expanded
+        },
+    }
+    return len(json.dumps(templated)), len(json.dumps(plain))
+
+
+def main():
+    template = make_template()
+    print(
+        f"{'participants':>13}{'by hand ms':>12}{'replicas ms':>13}"
+        f"{'config B':>10}{'expanded B':>12}"
+    )
+    for count in PARTICIPANTS:
+        hand = timeit(lambda c=count: by_hand(template, c), repeat=3)
+        replica = timeit(lambda c=count: replicated(template, c), repeat=3)
+        templated, plain = config_sizes(template, count)
+        print(
+            f"{count:>13}{hand * 1e3:>12.1f}{replica * 1e3:>13.1f}"
+            f"{templated:>10}{plain:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Load harness for many concurrent, mostly idle, update subscribers.
+
+Connects ``NUM_SESSIONS`` fake websocket clients to an updates broadcaster,
+each with the previous relay + poll tasks or with an ``UpdatesSession`` (the
+connection's own task only, while idle), sends a few updates and disconnects
+them all. Reports the tasks and the (traced) memory per connection while idle,
+and checks that nothing is left behind.
+"""
+import asyncio
+import gc
+import json
+import tracemalloc
+
+from starlette.websockets import WebSocketState
+
+from benchmarks.utils import make_manager_state_dict
+from chimerapy.orchestrator.routers.updates_session import UpdatesSession
+from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    UpdatesBroadcaster,
+)
+
+NUM_SESSIONS = 2000
+NUM_UPDATES = 10
+
+
+class FakeWebSocket:
+    """An idle client, until it disconnects."""
+
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.disconnected = asyncio.Event()
+        self.received = 0
+
+    async def send_text(self, data: str) -> None:
+        self.received += 1
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def receive_json(self):
+        await self.receive()
+        raise ConnectionError
+
+
+async def legacy_handler(broadcaster, ws):
+    """Two tasks per connection, one relaying the updates, one polling."""
+
+    async def relay(q):
+        while (msg := await q.get()) != "STOP":
+            await ws.send_text(msg.text())
+
+    async def poll():
+        try:
+            while True:
+                await ws.receive_json()
+        except ConnectionError:
+            pass
+
+    q = asyncio.Queue()
+    await broadcaster.add_client(q)
+    tasks = [asyncio.create_task(relay(q)), asyncio.create_task(poll())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await broadcaster.remove_client(q)
+
+
+async def session_handler(broadcaster, ws):
+    session = UpdatesSession(ws, lambda msg: msg == "STOP")
+    session.stats = await broadcaster.add_client(session.queue)
+    try:
+        await session.run()
+    finally:
+        await broadcaster.remove_client(session.queue)
+
+
+async def run(handler):
+    broadcaster = UpdatesBroadcaster("STOP")
+    await broadcaster.initialize()
+    broadcast_task = asyncio.create_task(broadcaster.start_broadcast())
+    baseline_tasks = len(asyncio.all_tasks())
+
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+
+    clients = [FakeWebSocket() for _ in range(NUM_SESSIONS)]
+    handlers = [asyncio.create_task(handler(broadcaster, ws)) for ws in clients]
+    await asyncio.sleep(0.1)
+    idle, _ = tracemalloc.get_traced_memory()
+    tasks = len(asyncio.all_tasks()) - baseline_tasks
+
+    state = make_manager_state_dict(num_workers=10, nodes_per_worker=5)
+    for _ in range(NUM_UPDATES):
+        await broadcaster.put_update(
+            {"signal": "NETWORK_UPDATE", "data": state}
+        )
+    await asyncio.sleep(0.5)
+    _, peak = tracemalloc.get_traced_memory()
+    assert all(ws.received == NUM_UPDATES for ws in clients)
+
+    for ws in clients:
+        ws.disconnected.set()
+    await asyncio.gather(*handlers)
+    tracemalloc.stop()
+
+    leaked_clients = len(broadcaster.metrics()["clients"])
+    leaked_tasks = len(asyncio.all_tasks()) - baseline_tasks
+    broadcaster.enqueue_sentinel()
+    await broadcast_task
+
+    return {
+        "tasks/conn": tasks / NUM_SESSIONS,
+        "idle KiB/conn": (idle - start) / NUM_SESSIONS / 1024,
+        "peak MiB": (peak - start) / 2**20,
+        "leaked clients": leaked_clients,
+        "leaked tasks": leaked_tasks,
+    }
+
+
+def main():
+    print(f"{NUM_SESSIONS} idle subscribers, {NUM_UPDATES} updates")
+    for name, handler in [
+        ("relay+poll", legacy_handler),
+        ("session", session_handler),
+    ]:
+        result = asyncio.run(run(handler))
+        print(
+            f"{name:>12}: "
+            + json.dumps({k: round(v, 2) for k, v in result.items()})
+        )
+
+
+if __name__ == "__main__":
+    main()
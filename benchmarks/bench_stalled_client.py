@@ -0,0 +1,69 @@
+"""Memory held for a websocket client that stopped reading its updates.
+
+Updates of PAYLOAD_SIZE bytes are broadcast to a client that never reads
+them, with the client queue bounded (``max_queue_size``, dropping the oldest
+updates) or not. Reports the Python heap held by the updates (tracemalloc)
+and the growth of the process RSS, which also depends on the allocator.
+"""
+import asyncio
+import gc
+import tracemalloc
+
+import psutil
+
+from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    OverflowPolicy,
+    UpdatesBroadcaster,
+)
+
+PAYLOAD_SIZE = 64 * 1024
+NUM_UPDATES = [500, 2000, 4000]
+
+
+async def run(num_updates: int, max_queue_size: int):
+    broadcaster = UpdatesBroadcaster(
+        max_queue_size=max_queue_size,
+        overflow_policy=OverflowPolicy.DROP_OLDEST,
+    )
+    await broadcaster.initialize()
+    task = asyncio.create_task(broadcaster.start_broadcast())
+    stalled_queue = asyncio.Queue()
+    await broadcaster.add_client(stalled_queue)
+
+    process = psutil.Process()
+    gc.collect()
+    rss = process.memory_info().rss
+    tracemalloc.start()
+    for j in range(num_updates):
+        await broadcaster.put_update(
+            {"message_id": j, "payload": "x" * PAYLOAD_SIZE}
+        )
+        if j % 100 == 0:
+            await asyncio.sleep(0)
+    while not broadcaster.update_queue.empty():
+        await asyncio.sleep(0)
+
+    gc.collect()
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = process.memory_info().rss - rss
+    queued = stalled_queue.qsize()
+    task.cancel()
+    return heap, growth, queued
+
+
+def main():
+    print(
+        f"{'updates':>8}{'bound':>7}{'queued':>8}{'heap MiB':>10}{'rss MiB':>9}"
+    )
+    for num_updates in NUM_UPDATES:
+        for max_queue_size in (16, 0):
+            heap, growth, queued = asyncio.run(run(num_updates, max_queue_size))
+            print(
+                f"{num_updates:>8}{max_queue_size or '-':>7}{queued:>8}"
+                f"{heap / 2**20:>10.1f}{growth / 2**20:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
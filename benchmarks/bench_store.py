@@ -0,0 +1,83 @@
+"""Warm restart time of the pipelines service with an SQLite store.
+
+Fills a store with pipelines, each edited after its snapshot, then compares
+starting the service, getting one pipeline (loaded on first access) and
+listing them all (loading every pipeline). Also reports the cost of an edit
+logged to the store.
+"""
+import tempfile
+from pathlib import Path
+
+from benchmarks.utils import bench_step_node, timeit
+from chimerapy.orchestrator.services.pipeline_service.pipelines import (
+    Pipelines,
+)
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    SQLitePipelineStore,
+)
+
+NUM_PIPELINES = 200
+NUM_NODES = 50
+
+
+def fill(path: str) -> str:
+    pipelines = Pipelines(store=SQLitePipelineStore(path))
+    for p in range(NUM_PIPELINES):
+        pipeline = pipelines.create_pipeline(f"pipeline-{p}", "").unwrap()
+        nodes = [
+            pipelines.add_node_to(
+                pipeline.id, bench_step_node(), name=f"step-{n}"
+            ).unwrap()
+            for n in range(NUM_NODES)
+        ]
+        for source, sink in zip(nodes, nodes[1:]):
+            pipelines.add_edge_to(pipeline.id, (source.id, sink.id)).unwrap()
+    pipelines.shutdown()
+    return pipeline.id
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "pipelines.db")
+        pipeline_id = fill(path)
+
+        def restart(load=None):
+            pipelines = Pipelines(store=SQLitePipelineStore(path))
+            if load is not None:
+                load(pipelines)
+            pipelines.shutdown()
+
+        started = timeit(restart)
+        first = timeit(lambda: restart(lambda p: p.get_pipeline(pipeline_id)))
+        listed = timeit(lambda: restart(lambda p: p.web_json()), repeat=3)
+
+        pipelines = Pipelines(store=SQLitePipelineStore(path))
+        pipeline = pipelines.get_pipeline(pipeline_id).unwrap()
+        in_memory = Pipelines()
+        copy = in_memory.create_pipeline("copy", "").unwrap()
+
+        def edits(service, target):
+            for n in range(100):
+                service.update_from_web_json(
+                    target.id,
+                    {
+                        **target.to_web_json(),
+                        "description": f"edit-{n}",
+                    },
+                ).unwrap()
+
+        logged = timeit(lambda: edits(pipelines, pipeline), repeat=3)
+        unlogged = timeit(lambda: edits(in_memory, copy), repeat=3)
+        pipelines.shutdown()
+
+    print(f"{NUM_PIPELINES} pipelines of {NUM_NODES} nodes")
+    print(f"{'step':>22}{'ms':>10}")
+    print(f"{'start':>22}{started * 1e3:>10.2f}")
+    print(f"{'start + first access':>22}{first * 1e3:>10.2f}")
+    print(f"{'start + list all':>22}{listed * 1e3:>10.2f}")
+    print(f"{'edit (memory)':>22}{unlogged / 100 * 1e3:>10.3f}")
+    print(f"{'edit (logged)':>22}{logged / 100 * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
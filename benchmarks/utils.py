@@ -0,0 +1,126 @@
+"""Shared helpers for the benchmarks."""
+import random
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from chimerapy.orchestrator.models.pipeline_config import (
+        ChimeraPyPipelineConfig,
+    )
+
+
+def make_manager_state_dict(
+    num_workers: int = 10, nodes_per_worker: int = 5
+) -> Dict[str, Any]:
+    """A wire format ``ManagerState`` dict, as sent by the manager's ``/ws``."""
+    workers = {}
+    for w in range(num_workers):
+        worker_id = f"worker-{w}"
+        nodes = {}
+        for n in range(nodes_per_worker):
+            node_id = f"{worker_id}-node-{n}"
+            nodes[node_id] = {
+                "id": node_id,
+                "name": f"Node{n}",
+                "port": 50000 + n,
+                "fsm": "PREVIEWING",
+                "registered_methods": {
+                    "set_value": {
+                        "name": "set_value",
+                        "style": "concurrent",
+                        "params": {"value": "int"},
+                    }
+                },
+                "logdir": None,
+                "diagnostics": {
+                    "timestamp": "2023-08-01T12:00:00.000000",
+                    "latency": 12.5 + n,
+                    "payload_size": 1024.0 * (n + 1),
+                    "memory_usage": 40960.0,
+                    "cpu_usage": 7.5,
+                    "num_of_steps": 1000 + n,
+                },
+            }
+        workers[worker_id] = {
+            "id": worker_id,
+            "name": f"Worker{w}",
+            "nodes": nodes,
+            "ip": f"192.168.1.{w % 250 + 2}",
+            "port": 40000 + w,
+            "tempfolder": f"/tmp/chimerapy/{worker_id}",
+        }
+
+    return {
+        "id": "manager",
+        "workers": workers,
+        "ip": "192.168.1.1",
+        "port": 9000,
+        "logs_subscription_port": None,
+        "log_sink_enabled": False,
+        "logdir": "/tmp/chimerapy",
+    }
+
+
+def timeit(func: Callable[[], Any], repeat: int = 5) -> float:
+    """The best wall clock time of ``repeat`` runs of ``func``, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@lru_cache()
+def bench_step_node() -> str:
+    """Registers a step node for the generated pipelines, returns its name."""
+    from chimerapy.engine.node import Node
+    from chimerapy.orchestrator.registry.utils import step_node
+
+    @step_node(add_to_registry=True)
+    class BenchStepNode(Node):
+        def step(self, inputs):
+            return inputs
+
+    return BenchStepNode.__name__
+
+
+def make_dag_edges(
+    num_nodes: int, edges_per_node: float = 1.5, span: int = 20, seed: int = 0
+) -> List[Tuple[int, int]]:
+    """Random edges ``(i, j)``, ``i < j < i + span``, of a DAG, shuffled."""
+    rng = random.Random(seed)
+    edges = {(i, i + 1) for i in range(num_nodes - 1)}
+    while len(edges) < edges_per_node * num_nodes:
+        i = rng.randrange(num_nodes - 1)
+        edges.add((i, rng.randrange(i + 1, min(i + span, num_nodes))))
+    edges = sorted(edges)
+    rng.shuffle(edges)
+    return edges
+
+
+def make_config(num_nodes: int) -> "ChimeraPyPipelineConfig":
+    """A pipeline config of ``num_nodes`` step nodes and ``make_dag_edges``."""
+    from chimerapy.orchestrator.models.pipeline_config import (
+        ChimeraPyPipelineConfig,
+    )
+
+    return ChimeraPyPipelineConfig.model_validate(
+        {
+            "workers": {
+                "manager_ip": "127.0.0.1",
+                "manager_port": 9000,
+                "instances": [],
+            },
+            "nodes": [
+                {"registry_name": bench_step_node(), "name": f"step-{n}"}
+                for n in range(num_nodes)
+            ],
+            "adj": [
+                (f"step-{i}", f"step-{j}") for i, j in make_dag_edges(num_nodes)
+            ],
+            "manager_config": {"logdir": "logs", "port": 9000},
+            "mappings": {},
+        }
+    )
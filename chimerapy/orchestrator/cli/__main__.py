@@ -83,6 +83,7 @@ async def _pipeline_record(manager: Manager) -> None:
 
 async def aorchestrate(config: ChimeraPyPipelineConfig) -> None:
     """Orchestrate the pipeline."""
+    config = config.expand_templates()
     pipeline, created_nodes = config.get_cp_graph_map()
     manager = config.instantiate_manager()
 
@@ -2,6 +2,9 @@ import chimerapy.engine as cpe
 from chimerapy.orchestrator.orchestrator_config import get_config
 from chimerapy.orchestrator.services.cluster_service import ClusterManager
 from chimerapy.orchestrator.services.pipeline_service import Pipelines
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    SQLitePipelineStore,
+)
 
 available_services = {"cluster_manager": None, "pipelines": None, "workers": []}
 
@@ -16,12 +19,33 @@ def create_dev_worker(name):
 def initialize():
     """Initialize the services. ToDo: Configure services via config file."""
     config = get_config()
-    pipelines = Pipelines()
+    pipelines = Pipelines(
+        instantiation_executor=config.node_instantiation_executor,
+        instantiation_workers=config.node_instantiation_workers,
+        node_instantiation_timeout=config.node_instantiation_timeout,
+        instance_pool_size=config.node_instance_pool_size,
+        store=(
+            SQLitePipelineStore(config.pipeline_store_path)
+            if config.pipeline_store_path
+            else None
+        ),
+        snapshot_interval=config.pipeline_store_snapshot_interval,
+        graph_backend=config.pipeline_graph_backend,
+    )
     cluster_manager = ClusterManager(
         pipeline_service=pipelines,
         logdir=config.cluster_manager_logdir,
         port=config.cluster_manager_port,
         max_num_of_workers=config.cluster_manager_max_num_of_workers,
+        updates_queue_size=config.updates_queue_size,
+        updates_overflow_policy=config.updates_overflow_policy,
+        updates_max_rate=config.updates_max_rate,
+        updates_history_size=config.updates_history_size,
+        updates_heartbeat_interval=config.updates_heartbeat_interval,
+        manager_reconnect_attempts=config.manager_reconnect_attempts,
+        manager_reconnect_max_delay=config.manager_reconnect_max_delay,
+        placement_strategy=config.placement_strategy,
+        commit_mode=config.commit_mode,
     )
     available_services["cluster_manager"] = cluster_manager
     available_services["pipelines"] = pipelines
@@ -46,5 +70,9 @@ def teardown():
     if manager and not manager.has_shutdown():
         manager.shutdown()
 
+    pipelines: Pipelines = available_services.get("pipelines")
+    if pipelines:
+        pipelines.shutdown()
+
     for worker in available_services.get("workers", []):
         worker.shutdown()
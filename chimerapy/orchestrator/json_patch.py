@@ -0,0 +1,172 @@
+"""A minimal JSON Patch (RFC 6902) implementation for JSON compatible documents."""
+import copy
+from typing import Any, Dict, List
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch can't be applied to a document."""
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Returns the operations that transform ``old`` into ``new``.
+
+    Objects are diffed key by key, anything else (including lists) is replaced
+    as a whole when it differs.
+    """
+    if old is new:
+        return []
+
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        if old == new and type(old) is type(new):
+            return []
+        return [{"op": "replace", "path": path, "value": new}]
+
+    ops = []
+    for key, old_value in old.items():
+        key_path = f"{path}/{_escape(str(key))}"
+        if key not in new:
+            ops.append({"op": "remove", "path": key_path})
+        else:
+            ops.extend(make_patch(old_value, new[key], key_path))
+
+    for key, new_value in new.items():
+        if key not in old:
+            ops.append(
+                {
+                    "op": "add",
+                    "path": f"{path}/{_escape(str(key))}",
+                    "value": new_value,
+                }
+            )
+
+    return ops
+
+
+def _split(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer {path}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def _resolve(doc: Any, tokens: List[str], path: str) -> Any:
+    for token in tokens:
+        if isinstance(doc, dict) and token in doc:
+            doc = doc[token]
+        elif (
+            isinstance(doc, list) and token.isdigit() and int(token) < len(doc)
+        ):
+            doc = doc[int(token)]
+        else:
+            raise JsonPatchError(f"Path {path} does not exist")
+    return doc
+
+
+def _list_index(container: List, token: str, path: str, insert: bool) -> int:
+    if insert and token == "-":
+        return len(container)
+    if not token.isdigit():
+        raise JsonPatchError(f"Invalid list index in {path}")
+    index = int(token)
+    if index > len(container) or (not insert and index == len(container)):
+        raise JsonPatchError(f"List index out of range in {path}")
+    return index
+
+
+def _add(doc: Any, path: str, value: Any) -> Any:
+    tokens = _split(path)
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1], path)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], path, True), value)
+    else:
+        raise JsonPatchError(f"Path {path} does not exist")
+    return doc
+
+
+def _remove(doc: Any, path: str) -> Any:
+    tokens = _split(path)
+    if not tokens:
+        raise JsonPatchError("Cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1], path)
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent.pop(tokens[-1])
+    elif isinstance(parent, list):
+        return parent.pop(_list_index(parent, tokens[-1], path, False))
+    raise JsonPatchError(f"Path {path} does not exist")
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """JSON equality, which unlike Python's doesn't equate booleans and numbers."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(map(_equal, a, b))
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def _replace(doc: Any, path: str, value: Any) -> Any:
+    _resolve(doc, _split(path), path)
+    if path == "":
+        return value
+    _remove(doc, path)
+    return _add(doc, path, value)
+
+
+def _move(doc: Any, source: str, path: str) -> Any:
+    if path == source:
+        return doc
+    if path.startswith(f"{source}/"):
+        raise JsonPatchError(f"Cannot move {source} into itself")
+    return _add(doc, path, _remove(doc, source))
+
+
+def _apply_op(doc: Any, op: Dict[str, Any]) -> Any:
+    kind, path = op["op"], op["path"]
+    if kind == "add":
+        doc = _add(doc, path, op["value"])
+    elif kind == "remove":
+        _remove(doc, path)
+    elif kind == "replace":
+        doc = _replace(doc, path, op["value"])
+    elif kind == "move":
+        doc = _move(doc, op["from"], path)
+    elif kind == "copy":
+        value = _resolve(doc, _split(op["from"]), op["from"])
+        doc = _add(doc, path, copy.deepcopy(value))
+    elif kind == "test":
+        if not _equal(_resolve(doc, _split(path), path), op["value"]):
+            raise JsonPatchError(f"Test of {path} failed")
+    else:
+        raise JsonPatchError(f"Unsupported operation {kind}")
+    return doc
+
+
+def apply_patch(doc: Any, ops: List[Dict[str, Any]], in_place=False) -> Any:
+    """Applies the patch operations to a document and returns the result.
+
+    Unless ``in_place`` is set, the document is copied first so that a failing
+    patch leaves it untouched.
+    """
+    if not in_place:
+        doc = copy.deepcopy(doc)
+
+    for op in ops:
+        try:
+            doc = _apply_op(doc, op)
+        except (KeyError, TypeError) as e:
+            raise JsonPatchError(f"Invalid operation {op}") from e
+
+    return doc
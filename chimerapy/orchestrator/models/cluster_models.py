@@ -1,5 +1,14 @@
 from enum import Enum
-from typing import Any, ClassVar, Dict, Literal, Optional, Union
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    List,
+    Literal,
+    Optional,
+    Union,
+)
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -14,6 +23,10 @@ from chimerapy.engine.states import (
 )
 
 
+def _path_str(path: Any) -> Optional[str]:
+    return str(path) if path is not None else None
+
+
 class RegisteredMethod(BaseModel):
     name: str
     style: Literal["concurrent", "blocking", "reset"] = "concurrent"
@@ -53,12 +66,8 @@ class NodeState(BaseModel):
     @classmethod
     def from_cp_node_state(cls, node_state: _NodeState):
         node_state_dict = node_state.to_dict()
-        node_state_dict["logdir"] = (
-            str(node_state_dict["logdir"])
-            if node_state_dict["logdir"] is not None
-            else None
-        )
-        return cls(**node_state.to_dict())
+        node_state_dict["logdir"] = _path_str(node_state_dict["logdir"])
+        return cls(**node_state_dict)
 
     model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
 
@@ -99,8 +108,206 @@ class ClusterState(BaseModel):
     ):
         state_dict = state.to_dict()
         state_dict["logdir"] = str(state_dict["logdir"])
+        for worker in state_dict["workers"].values():
+            for node in worker["nodes"].values():
+                node["logdir"] = _path_str(node["logdir"])
         return cls(**state_dict, zeroconf_discovery=zeroconf_discovery)
 
+    @classmethod
+    def from_manager_dict(
+        cls, data: Dict[str, Any], zeroconf_discovery: bool
+    ) -> "ClusterState":
+        """Build the cluster state from a manager state dict, as sent by the manager.
+
+        The (JSON decoded) dict is validated into the models in a single pass,
+        without a round trip through the engine's ``ManagerState``.
+        """
+        return cls.model_validate(
+            {**data, "zeroconf_discovery": zeroconf_discovery}
+        )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class SubscriptionFilter(BaseModel):
+    """The subset of the cluster state a network updates subscriber is interested in.
+
+    Unset filters match everything. Node ``fields`` restrict the nodes to these
+    fields (and their ``id``).
+    """
+
+    workers: Optional[FrozenSet[str]] = Field(
+        default=None, description="The IDs of the workers to include."
+    )
+    nodes: Optional[FrozenSet[str]] = Field(
+        default=None, description="The IDs of the nodes to include."
+    )
+    fields: Optional[
+        FrozenSet[
+            Literal[
+                "name",
+                "port",
+                "fsm",
+                "registered_methods",
+                "logdir",
+                "diagnostics",
+            ]
+        ]
+    ] = Field(default=None, description="The node fields to include.")
+
+    @property
+    def is_empty(self) -> bool:
+        return (
+            self.workers is None and self.nodes is None and self.fields is None
+        )
+
+    def project(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Project a (JSON compatible) cluster state to the filtered subset.
+
+        Workers without matching nodes are left out when filtering on nodes only.
+        """
+        workers = {}
+        for worker_id, worker in state.get("workers", {}).items():
+            if self.workers is not None and worker_id not in self.workers:
+                continue
+            nodes = {
+                node_id: self._project_node(node)
+                for node_id, node in worker.get("nodes", {}).items()
+                if self.nodes is None or node_id in self.nodes
+            }
+            if not nodes and self.workers is None and self.nodes is not None:
+                continue
+            workers[worker_id] = {**worker, "nodes": nodes}
+
+        return {**state, "workers": workers}
+
+    def _project_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        if self.fields is None:
+            return node
+        return {
+            key: value
+            for key, value in node.items()
+            if key == "id" or key in self.fields
+        }
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class WorkerCapacity(BaseModel):
+    """The resources of a worker available to the nodes placed on it.
+
+    The CPU and memory are in the units of the node diagnostics.
+    """
+
+    cpu: Optional[float] = Field(
+        default=None,
+        description="The CPU usage the nodes on the worker can add up to, null for unlimited.",
+    )
+    memory: Optional[float] = Field(
+        default=None,
+        description="The memory usage the nodes on the worker can add up to, null for unlimited.",
+    )
+    nodes: Optional[int] = Field(
+        default=None,
+        description="The maximum number of nodes of the pipeline on the worker, null for unlimited.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class PlacementRequest(BaseModel):
+    """A request to place the nodes of a pipeline on the connected workers."""
+
+    strategy: str = Field(
+        default="least-loaded",
+        description="The placement strategy (round-robin, least-loaded, bin-packing or min-cut).",
+    )
+    pins: Dict[str, str] = Field(
+        default_factory=dict,
+        description="The workers the nodes are pinned to, by node id.",
+    )
+    keep_assigned: bool = Field(
+        default=False,
+        description="If true, the nodes already assigned to a connected worker are pinned to it.",
+    )
+    capacities: Dict[str, WorkerCapacity] = Field(
+        default_factory=dict,
+        description="The capacities of the workers, by worker id.",
+    )
+    default_capacity: WorkerCapacity = Field(
+        default_factory=WorkerCapacity,
+        description="The capacity of the workers without one in capacities.",
+    )
+    dry_run: bool = Field(
+        default=False,
+        description="If true, the plan is returned without assigning the nodes.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class WorkerPlacement(BaseModel):
+    """The nodes of a pipeline placed on a worker, and the estimated load of the worker."""
+
+    nodes: List[str] = Field(
+        default_factory=list, description="The ids of the nodes."
+    )
+    cpu: float = Field(
+        default=0.0, description="The estimated CPU usage of the worker."
+    )
+    memory: float = Field(
+        default=0.0, description="The estimated memory usage of the worker."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class PlacementPlan(BaseModel):
+    """The workers the nodes of a pipeline are placed on."""
+
+    strategy: str = Field(..., description="The placement strategy.")
+    assignments: Dict[str, str] = Field(
+        ..., description="The worker of each node, by node id."
+    )
+    workers: Dict[str, WorkerPlacement] = Field(
+        ..., description="The placement on each connected worker."
+    )
+    cross_worker_traffic: float = Field(
+        default=0.0,
+        description="The expected bytes per second sent between nodes on different workers.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class EdgeTraffic(BaseModel):
+    """The expected traffic of an edge of a pipeline."""
+
+    source: str = Field(..., description="The id of the source node.")
+    sink: str = Field(..., description="The id of the sink node.")
+    traffic: float = Field(
+        ..., description="The expected bytes per second sent along the edge."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
+
+
+class TrafficReport(BaseModel):
+    """The expected network traffic of a pipeline, with its current worker assignments."""
+
+    total: float = Field(
+        ...,
+        description="The expected bytes per second sent along all the edges.",
+    )
+    cross_worker: float = Field(
+        ...,
+        description="The expected bytes per second sent between nodes on different workers.",
+    )
+    cross_worker_edges: List[EdgeTraffic] = Field(
+        default_factory=list,
+        description="The edges between nodes on different (or unassigned) workers, the busiest first.",
+    )
+
     model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
 
 
@@ -116,6 +323,11 @@ class UpdateMessage(BaseModel):
     data: Union[ClusterState, None] = Field(
         default=None, description="The data of the update message."
     )
+    seq: Optional[int] = Field(
+        default=None,
+        description="The sequence number of the update, if it carries a state. "
+        "Set from the frame it is sent in, absent from unnumbered updates.",
+    )
 
     @classmethod
     def from_updates_dict(
@@ -125,9 +337,12 @@ class UpdateMessage(BaseModel):
         zeroconf_discovery: bool,
     ) -> "UpdateMessage":
         if (data := msg.get("data")) is not None:
-            data = ManagerState.from_dict(data)
-            data = ClusterState.from_cp_manager_state(data, zeroconf_discovery)
+            data = ClusterState.from_manager_dict(data, zeroconf_discovery)
 
         return cls(signal=signal, data=data)
 
+    def to_payload(self) -> Dict[str, Any]:
+        """The message as the payload of a frame, which numbers it if needed."""
+        return self.model_dump(mode="json", exclude={"seq"})
+
     model_config: ClassVar[ConfigDict] = ConfigDict(frozen=True, extra="forbid")
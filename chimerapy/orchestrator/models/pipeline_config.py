@@ -3,14 +3,22 @@ from typing import (
     Any,
     ClassVar,
     Dict,
+    Iterable,
     List,
     Literal,
+    NamedTuple,
     Optional,
     Tuple,
     Type,
 )
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 import chimerapy.engine as cpe
 from chimerapy.orchestrator.registry import get_registered_node
@@ -40,6 +48,184 @@ class NodeConfig(BaseModel):
     model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
 
 
+def _node_configs(values: Iterable[Any]) -> List[Any]:
+    """The node configs, a string being the registry name and name of a node."""
+    nodes = []
+
+    for v in values:
+        if isinstance(v, str):
+            nodes.append(NodeConfig(registry_name=v, name=v))
+        elif isinstance(v, dict):
+            nodes.append(NodeConfig(**v))
+        else:
+            nodes.append(v)
+
+    return nodes
+
+
+class TemplateExpansionError(ValueError):
+    """Raised when the replicas of a template can't be expanded."""
+
+
+def _substitute(value: Any, parameters: Dict[str, Any]) -> Any:
+    """Substitutes the ``{parameter}`` placeholders in the strings of ``value``.
+
+    A string that is a single placeholder is replaced by the value of the
+    parameter itself, keeping its type. Literal braces are escaped by doubling
+    them, as with ``str.format``.
+    """
+    if isinstance(value, dict):
+        return {
+            key: _substitute(item, parameters) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_substitute(item, parameters) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    if value[:1] == "{" and value[-1:] == "}" and value[1:-1] in parameters:
+        return parameters[value[1:-1]]
+    try:
+        return value.format_map(parameters)
+    except (KeyError, IndexError, ValueError) as e:
+        raise TemplateExpansionError(
+            f"Cannot substitute the parameters in {value!r}: {e!r}"
+        ) from e
+
+
+class TemplateConfig(BaseModel):
+    """A parameterised subgraph, replicated in a pipeline."""
+
+    name: str = Field(..., description="The name of the template.")
+
+    parameters: Dict[str, Any] = Field(
+        default={},
+        description="The parameters of the template and their default values. The {parameter} placeholders "
+        "in the kwargs of the nodes are substituted, as well as {index} and {prefix}.",
+    )
+
+    nodes: List[NodeConfig] = Field(
+        ..., description="The nodes of the template."
+    )
+
+    adj: List[Tuple[str, str]] = Field(
+        default=[], description="The edges between the nodes of the template."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+    @field_validator("nodes", mode="before")
+    def validate_nodes(cls, values):
+        return _node_configs(values)
+
+
+class Replica(NamedTuple):
+    """A replica of a template, its nodes and edges named with its prefix."""
+
+    index: int
+    worker_id: Optional[str]
+    nodes: List[NodeConfig]
+    edges: List[Tuple[str, str]]
+
+
+class ReplicasConfig(BaseModel):
+    """The replicas of a template: how many, and their names, workers and parameters."""
+
+    count: int = Field(default=1, ge=0, description="The number of replicas.")
+
+    start: int = Field(default=1, description="The index of the first replica.")
+
+    prefix: str = Field(
+        default="{template}-{index}-",
+        description="The prefix of the names of the nodes of each replica, formatted with {template} and {index}.",
+    )
+
+    workers: List[str] = Field(
+        default=[],
+        description="The ids of the workers the replicas are assigned to in turn, formatted with {index} "
+        '(e.g. ["worker-{index}"] for a worker per replica). Empty to leave the nodes unassigned.',
+    )
+
+    parameters: Dict[str, Any] = Field(
+        default={},
+        description="The values of the parameters of the template, formatted with {index}.",
+    )
+
+    links: List[Tuple[str, str]] = Field(
+        default=[],
+        description="The edges of each replica to the rest of the pipeline. The nodes of the template are "
+        "referred to by their name in the template, the others by their name or id in the pipeline.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+    def expand(self, template: TemplateConfig) -> List[Replica]:
+        """The replicas of ``template``, with their parameters substituted."""
+        names = [node.name for node in template.nodes]
+        if len(set(names)) != len(names):
+            raise TemplateExpansionError(
+                f"Template {template.name} has duplicate node names"
+            )
+        if unknown := {n for edge in template.adj for n in edge} - set(names):
+            raise TemplateExpansionError(
+                f"Template {template.name} has edges to unknown nodes {sorted(unknown)}"
+            )
+
+        return [
+            self._replica(template, set(names), index)
+            for index in range(self.start, self.start + self.count)
+        ]
+
+    def _replica(
+        self, template: TemplateConfig, names: set, index: int
+    ) -> Replica:
+        prefix = _substitute(
+            self.prefix, {"template": template.name, "index": index}
+        )
+        parameters = {
+            **template.parameters,
+            **_substitute(self.parameters, {"index": index}),
+            "index": index,
+            "prefix": prefix,
+        }
+
+        def rename(name: str) -> str:
+            return f"{prefix}{name}" if name in names else name
+
+        nodes = []
+        for node in template.nodes:
+            kwargs = _substitute(node.kwargs, parameters)
+            kwargs["name"] = rename(node.name)
+            nodes.append(
+                node.model_copy(
+                    update={"name": kwargs["name"], "kwargs": kwargs}
+                )
+            )
+
+        worker_id = None
+        if self.workers:
+            worker_id = _substitute(
+                self.workers[(index - self.start) % len(self.workers)],
+                {"index": index},
+            )
+
+        return Replica(
+            index=index,
+            worker_id=worker_id,
+            nodes=nodes,
+            edges=[
+                (rename(source), rename(sink))
+                for source, sink in [*template.adj, *self.links]
+            ],
+        )
+
+
+class TemplateReplicasConfig(ReplicasConfig):
+    """The replicas of a template of the pipeline config."""
+
+    template: str = Field(..., description="The name of the template.")
+
+
 class WorkerConfig(BaseModel):
     name: str = Field(..., description="The name of the worker.")
     id: str = Field(default=None, description="The id of the worker.")
@@ -148,6 +334,51 @@ class ChimeraPyPipelineConfig(BaseModel):
         description="The timeouts for the pipeline operation.",
     )
 
+    templates: List[TemplateConfig] = Field(
+        default=[], description="The templates of subgraphs of the pipeline."
+    )
+
+    replicas: List[TemplateReplicasConfig] = Field(
+        default=[],
+        description="The replicas of the templates added to the pipeline.",
+    )
+
+    def get_template(self, name: str) -> TemplateConfig:
+        """The template named ``name``."""
+        for template in self.templates:
+            if template.name == name:
+                return template
+
+        raise TemplateExpansionError(f"Template {name} not found")
+
+    def expand_templates(self) -> "ChimeraPyPipelineConfig":
+        """A copy of the config with the replicas of the templates as plain nodes, edges and mappings."""
+        nodes = list(self.nodes)
+        adj = list(self.adj)
+        mappings = {
+            worker: list(names) for worker, names in self.mappings.items()
+        }
+        for replicas in self.replicas:
+            for replica in replicas.expand(
+                self.get_template(replicas.template)
+            ):
+                nodes.extend(replica.nodes)
+                adj.extend(replica.edges)
+                if replica.worker_id is not None:
+                    mappings.setdefault(replica.worker_id, []).extend(
+                        node.name for node in replica.nodes
+                    )
+
+        return self.model_copy(
+            update={
+                "nodes": nodes,
+                "adj": adj,
+                "mappings": mappings,
+                "templates": [],
+                "replicas": [],
+            }
+        )
+
     def instantiate_manager(self) -> cpe.Manager:
         m = cpe.Manager(
             **self.manager_config.model_dump(
@@ -206,17 +437,18 @@ class ChimeraPyPipelineConfig(BaseModel):
     # Check https://docs.pydantic.dev/dev-v2/migration/#changes-to-validators for more information.
     @field_validator("nodes", mode="before")
     def validate_nodes(cls, values):
-        nodes = []
-
-        for v in values:
-            if isinstance(v, str):
-                nodes.append(NodeConfig(registry_name=v, name=v))
-            elif isinstance(v, dict):
-                nodes.append(NodeConfig(**v))
-            else:
-                nodes.append(v)
-
-        return nodes
+        return _node_configs(values)
+
+    @model_validator(mode="after")
+    def validate_replicas(self):
+        names = [template.name for template in self.templates]
+        if duplicates := {name for name in names if names.count(name) > 1}:
+            raise TemplateExpansionError(
+                f"Duplicate templates {sorted(duplicates)}"
+            )
+        for replicas in self.replicas:
+            self.get_template(replicas.template)
+        return self
 
     model_config: ClassVar[ConfigDict] = ConfigDict(
         arbitrary_types_allowed=True
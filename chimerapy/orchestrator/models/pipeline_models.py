@@ -1,12 +1,24 @@
 import importlib
 import inspect
-from typing import Any, ClassVar, Dict, List, Optional, Type
+from typing import (
+    Annotated,
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Type,
+    Union,
+)
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from chimerapy.engine.node import Node
 from chimerapy.orchestrator.models.pipeline_config import (
     ChimeraPyPipelineConfig,
+    ReplicasConfig,
+    TemplateConfig,
 )
 from chimerapy.orchestrator.models.registry_models import NodeType
 from chimerapy.orchestrator.registry import discovered_nodes, plugin_registry
@@ -48,6 +60,8 @@ class PipelineRequest(BaseModel):
         default=None, description="The description of the pipeline."
     )
 
+    tags: List[str] = Field(default=[], description="The tags of the pipeline.")
+
     config: Optional[ChimeraPyPipelineConfig] = Field(
         default=None,
         description="The configuration of the pipeline.",
@@ -100,6 +114,151 @@ class WebEdge(BaseModel):
     model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
 
 
+class AddNodeOperation(BaseModel):
+    """Add a node to a pipeline, with its kwargs and worker assignment."""
+
+    op: Literal["add-node"] = "add-node"
+
+    node: WebNode = Field(
+        ...,
+        description="The node to add. If set, its id can be used by the next operations of the batch.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class RemoveNodeOperation(BaseModel):
+    """Remove a node, and its edges, from a pipeline."""
+
+    op: Literal["remove-node"] = "remove-node"
+
+    id: str = Field(..., description="The id of the node to remove.")
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class AddEdgeOperation(BaseModel):
+    """Add an edge to a pipeline."""
+
+    op: Literal["add-edge"] = "add-edge"
+
+    source: str = Field(..., description="The id of the source node.")
+
+    sink: str = Field(..., description="The id of the sink node.")
+
+    id: Optional[str] = Field(default=None, description="The id of the edge.")
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class RemoveEdgeOperation(BaseModel):
+    """Remove an edge from a pipeline."""
+
+    op: Literal["remove-edge"] = "remove-edge"
+
+    source: str = Field(..., description="The id of the source node.")
+
+    sink: str = Field(..., description="The id of the sink node.")
+
+    id: Optional[str] = Field(
+        default=None, description="The id of the edge, checked if set."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class UpdateNodeOperation(BaseModel):
+    """Update the name, kwargs or worker assignment of a node in a pipeline.
+
+    Only the fields that are set are updated.
+    """
+
+    op: Literal["update-node"] = "update-node"
+
+    id: str = Field(..., description="The id of the node to update.")
+
+    name: Optional[str] = Field(
+        default=None, description="The new name of the node."
+    )
+
+    kwargs: Optional[Dict[str, Any]] = Field(
+        default=None, description="The new kwargs of the node."
+    )
+
+    worker_id: Optional[str] = Field(
+        default=None,
+        description="The id of the worker to run the node, null to unassign it.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+PipelineOperation = Annotated[
+    Union[
+        AddNodeOperation,
+        RemoveNodeOperation,
+        AddEdgeOperation,
+        RemoveEdgeOperation,
+        UpdateNodeOperation,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class PipelineBatch(BaseModel):
+    """An ordered list of operations to apply to a pipeline at once."""
+
+    operations: List[PipelineOperation] = Field(
+        ..., description="The operations, applied in order."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class ReplicasRequest(BaseModel):
+    """A request to add the replicas of a template to a pipeline."""
+
+    template: TemplateConfig = Field(
+        ..., description="The template to replicate."
+    )
+
+    replicas: ReplicasConfig = Field(
+        default=ReplicasConfig(), description="The replicas to add."
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
+class PipelineDiff(BaseModel):
+    """The changes made to a pipeline by a batch of operations."""
+
+    version: int = Field(..., description="The version of the pipeline.")
+
+    added_nodes: List[WebNode] = Field(
+        default=[], description="The nodes that were added."
+    )
+
+    updated_nodes: List[WebNode] = Field(
+        default=[], description="The nodes that were updated."
+    )
+
+    removed_nodes: List[str] = Field(
+        default=[], description="The ids of the nodes that were removed."
+    )
+
+    added_edges: List[Dict[str, str]] = Field(
+        default=[],
+        description="The edges (source, sink and id) that were added.",
+    )
+
+    removed_edges: List[Dict[str, str]] = Field(
+        default=[],
+        description="The edges (source, sink and id) that were removed.",
+    )
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(extra="forbid")
+
+
 class WrappedNode(BaseModel):
     """A wrapper for a node."""
 
@@ -137,18 +296,27 @@ class WrappedNode(BaseModel):
         default=None, description="The id of the worker that runs this node."
     )
 
+    throughput: Optional[float] = Field(
+        default=None,
+        description="The declared estimate of the bytes per second the node outputs.",
+    )
+
     @property
     def instantiated(self) -> bool:
         return self.instance is not None
 
-    def instantiate(self, **kwargs) -> Node:
-        """Instantiates the node."""
+    def instance_kwargs(self, **kwargs) -> Dict[str, Any]:
+        """The kwargs the node is instantiated with."""
         kwargs = {**self.kwargs, **kwargs}
 
         if "name" not in kwargs:
             kwargs["name"] = self.name or self.NodeClass.__name__
 
-        self.instance = self.NodeClass(**kwargs)
+        return kwargs
+
+    def instantiate(self, **kwargs) -> Node:
+        """Instantiates the node."""
+        self.instance = self.NodeClass(**self.instance_kwargs(**kwargs))
         return self.instance
 
     def clone(self, **kwargs) -> "WrappedNode":
@@ -165,6 +333,7 @@ class WrappedNode(BaseModel):
             kwargs=kwargs,
             package=self.package,
             worker_id=self.worker_id,
+            throughput=self.throughput,
         )
 
     @classmethod
@@ -174,6 +343,7 @@ class WrappedNode(BaseModel):
         node_type: NodeType,
         registry_name: str,
         kwargs: Optional[Dict[str, Any]] = None,
+        throughput: Optional[float] = None,
     ) -> "WrappedNode":
         if kwargs is None:
             kwargs = {}
@@ -184,6 +354,7 @@ class WrappedNode(BaseModel):
             kwargs=kwargs,
             node_type=node_type,
             registry_name=registry_name,
+            throughput=throughput,
         )
 
         return wrapped_node
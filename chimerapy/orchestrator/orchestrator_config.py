@@ -29,6 +29,87 @@ class OrchestratorConfig(BaseSettings):
         description="The number of workers to start in dev mode.",
     )
 
+    node_instantiation_executor: str = Field(
+        default="thread",
+        description="The kind of pool (thread or process) the nodes are constructed in when instantiating a pipeline.",
+    )
+
+    node_instantiation_workers: int = Field(
+        default=4,
+        description="The maximum number of nodes constructed concurrently when instantiating a pipeline.",
+    )
+
+    node_instantiation_timeout: float = Field(
+        default=60.0,
+        description="The maximum time (in seconds) to construct a node when instantiating a pipeline.",
+    )
+
+    node_instance_pool_size: int = Field(
+        default=128,
+        description="The maximum number of node instances kept across pipeline resets to be reused, 0 to disable.",
+    )
+
+    pipeline_store_path: str = Field(
+        default="",
+        description="The path of the SQLite database the pipelines are persisted in, empty to keep them in memory only.",
+    )
+
+    pipeline_store_snapshot_interval: int = Field(
+        default=100,
+        description="The number of edits of a pipeline logged to the store before a snapshot of it is saved.",
+    )
+
+    pipeline_graph_backend: str = Field(
+        default="networkx",
+        description="How the graphs of the pipelines are stored: networkx, or compact to use less memory for very large generated pipelines.",
+    )
+
+    updates_queue_size: int = Field(
+        default=256,
+        description="The maximum number of pending updates per websocket client, 0 for unbounded.",
+    )
+
+    updates_overflow_policy: str = Field(
+        default="coalesce",
+        description="What to do with updates for a websocket client whose queue is full "
+        "(drop-oldest, drop-newest, coalesce or disconnect).",
+    )
+
+    updates_max_rate: float = Field(
+        default=0,
+        description="The default maximum rate (Hz) of network updates sent to a websocket client, 0 for unlimited.",
+    )
+
+    updates_history_size: int = Field(
+        default=128,
+        description="The number of updates kept for websocket clients resuming a stream with last_seq.",
+    )
+
+    updates_heartbeat_interval: float = Field(
+        default=15.0,
+        description="The idle time (in seconds) after which a heartbeat is sent to Server-Sent Events clients, 0 for none.",
+    )
+
+    manager_reconnect_attempts: int = Field(
+        default=0,
+        description="The number of consecutive attempts to reconnect to the manager websocket before giving up, 0 to keep trying.",
+    )
+
+    manager_reconnect_max_delay: float = Field(
+        default=30.0,
+        description="The maximum delay (in seconds) between attempts to reconnect to the manager websocket.",
+    )
+
+    placement_strategy: str = Field(
+        default="",
+        description="The strategy (round-robin, least-loaded, bin-packing or min-cut) placing the unassigned nodes of a pipeline on the workers when it's instantiated, empty to require every node to be assigned.",
+    )
+
+    commit_mode: str = Field(
+        default="full",
+        description="How a pipeline committed again after a reset is deployed: full to redeploy all its nodes, incremental to only redeploy the nodes that changed.",
+    )
+
     def dump_env(self, file=".env"):
         with open(file, "w") as f:
             for field, value in self.model_dump(mode="json").items():
@@ -5,6 +5,8 @@ from typing import Any, Dict, List, Tuple
 
 import importlib_metadata
 
+from chimerapy.orchestrator.utils import uuid
+
 if typing.TYPE_CHECKING:
     from chimerapy.orchestrator.models.pipeline_models import WrappedNode
 
@@ -19,6 +21,8 @@ class DiscoveredNodes:
             PACKAGE: {},
         }
         self._imported_nodes = []
+        self.id = uuid()
+        self.generation = 0
 
     def add_node(
         self,
@@ -42,6 +46,7 @@ class DiscoveredNodes:
                 self._nodes[package] = {}
 
             self._nodes[package][name] = node
+            self.generation += 1
 
     def add_imported_node(self, qualname: str, node: "WrappedNode") -> None:
         """Add a node that was imported from a package."""
@@ -78,7 +83,13 @@ class DiscoveredNodes:
 
     def remove_package(self, package: str):
         """Remove a package from the registry."""
-        self._nodes.pop(package, None)
+        if self._nodes.pop(package, None) is not None:
+            self.generation += 1
+
+    @property
+    def version(self) -> str:
+        """A tag that changes whenever nodes are added to or removed from the registry."""
+        return f"{self.id}-{self.generation}"
 
 
 discovered_nodes = DiscoveredNodes()
@@ -152,6 +163,11 @@ def get_all_nodes() -> List["WrappedNode"]:
     return discovered_nodes.all_nodes()
 
 
+def registry_version() -> str:
+    """Returns the version tag of the registered ChimeraPy Nodes."""
+    return discovered_nodes.version
+
+
 def importable_packages() -> List[str]:
     """Returns all the importable packages for ChimeraPy Nodes."""
     return list(
@@ -4,56 +4,81 @@ from chimerapy.engine import Node
 from chimerapy.orchestrator.models.pipeline_models import NodeType, WrappedNode
 
 
-def source_node(cls=None, *, name=None, add_to_registry=False):
+def source_node(cls=None, *, name=None, add_to_registry=False, throughput=None):
     """Registers a source node."""
     if cls is not None:
         return RegistersChimeraPyNode(
-            name, NodeType.SOURCE, add_to_registry=add_to_registry
+            name,
+            NodeType.SOURCE,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )(cls)
     else:
         return RegistersChimeraPyNode(
-            name, NodeType.SOURCE, add_to_registry=add_to_registry
+            name,
+            NodeType.SOURCE,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )
 
 
-def sink_node(cls=None, *, name=None, add_to_registry=False):
+def sink_node(cls=None, *, name=None, add_to_registry=False, throughput=None):
     """Register a sink node."""
 
     if cls is not None:
         return RegistersChimeraPyNode(
-            name, NodeType.SINK, add_to_registry=add_to_registry
+            name,
+            NodeType.SINK,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )(cls)
     else:
         return RegistersChimeraPyNode(
-            name, NodeType.SINK, add_to_registry=add_to_registry
+            name,
+            NodeType.SINK,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )
 
 
-def step_node(cls=None, *, name=None, add_to_registry=False):
+def step_node(cls=None, *, name=None, add_to_registry=False, throughput=None):
     """Register a step node."""
 
     if cls is not None:
         return RegistersChimeraPyNode(
-            name, NodeType.STEP, add_to_registry=add_to_registry
+            name,
+            NodeType.STEP,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )(cls)
     else:
         return RegistersChimeraPyNode(
-            name, NodeType.STEP, add_to_registry=add_to_registry
+            name,
+            NodeType.STEP,
+            add_to_registry=add_to_registry,
+            throughput=throughput,
         )
 
 
 class RegistersChimeraPyNode:
-    """Registers a ChimeraPy Node."""
+    """Registers a ChimeraPy Node.
+
+    The ``throughput`` is the declared estimate of the bytes per second the
+    node outputs, used to place the nodes it sends data to on its worker when
+    the node has no diagnostics yet.
+    """
 
     def __init__(
         self,
         name: Optional[str],
         node_type: NodeType,
         add_to_registry: bool = False,
+        throughput: Optional[float] = None,
     ) -> None:
         self.name = name
         self.type = node_type
         self.add_to_registry = add_to_registry
+        self.throughput = throughput
 
     def __call__(self, node_class: Type[Node]):
         from chimerapy.orchestrator.registry import discovered_nodes
@@ -70,6 +95,7 @@ class RegistersChimeraPyNode:
             node_class,
             node_type=self.type,
             registry_name=name,
+            throughput=self.throughput,
         )
 
         qualified_name = f"{node_class.__module__}:{node_class.__name__}"
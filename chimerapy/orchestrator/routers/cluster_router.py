@@ -1,44 +1,75 @@
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.websockets import WebSocket, WebSocketDisconnect
-from starlette.websockets import WebSocketState
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.websockets import WebSocket
+from pydantic import ValidationError
 
 from chimerapy.orchestrator.models.cluster_models import (
     ClusterState,
+    PlacementPlan,
+    PlacementRequest,
+    SubscriptionFilter,
+    TrafficReport,
     UpdateMessage,
     UpdateMessageType,
 )
 from chimerapy.orchestrator.routers.error_mappers import get_mapping
+from chimerapy.orchestrator.routers.updates_session import (
+    EventStream,
+    UpdatesSession,
+    accept,
+)
 from chimerapy.orchestrator.services.cluster_service import (
     ClusterManager,
 )
+from chimerapy.orchestrator.services.cluster_service.frames import (
+    Frame,
+    FrameEncoder,
+)
 
 
-async def relay(q: asyncio.Queue, ws: WebSocket, is_sentinel) -> None:
-    """Relay messages from the queue to the websocket."""
-    while True:
-        message = await q.get()
-        if ws.client_state == WebSocketState.DISCONNECTED:
-            break
-        if message is None:
-            break
-        if is_sentinel(message):  # Received Sentinel
-            break
-        try:
-            await ws.send_json(message)
-        except WebSocketDisconnect:
-            break
+def _query_int(websocket: WebSocket, name: str) -> Optional[int]:
+    return _int_or_none(websocket.query_params.get(name))
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
-async def poll(ws: WebSocket) -> None:
-    """Continuously poll the websocket for messages."""
-    while True:
+def _query_filter(query_params: Any) -> SubscriptionFilter:
+    """The subscription filter given as comma separated query parameters."""
+    return SubscriptionFilter.model_validate(
+        {
+            key: value.split(",")
+            for key in SubscriptionFilter.model_fields
+            if (value := query_params.get(key)) is not None
+        }
+    )
+
+
+def _event_stream_response(
+    stream: EventStream, subscribe, unsubscribe
+) -> StreamingResponse:
+    """Stream the events, subscribing only while the response streams."""
+
+    async def events():
         try:
-            await ws.receive_json()  # FixMe: What is the best way of polling?
-        except WebSocketDisconnect:
-            break
+            stream.stats = await subscribe(stream.queue)
+            async for event in stream.events():
+                yield event
+        finally:
+            await unsubscribe(stream.queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 class ClusterRouter(APIRouter):
@@ -62,6 +93,13 @@ class ClusterRouter(APIRouter):
             description="The current state of the cluster",
         )
 
+        self.add_api_route(
+            "/updates/metrics",
+            self.get_updates_metrics,
+            methods=["GET"],
+            response_description="Delivery metrics of the updates websockets",
+        )
+
         self.add_api_route(
             "/instantiate/{pipeline_id}",
             self.instantiate_pipeline,
@@ -69,6 +107,22 @@ class ClusterRouter(APIRouter):
             response_description="Instantiate a pipeline",
         )
 
+        self.add_api_route(
+            "/place/{pipeline_id}",
+            self.place_pipeline,
+            methods=["POST"],
+            response_description="The placement of the nodes of a pipeline on the connected workers",
+            description="Assign the nodes of a pipeline to the connected workers, balancing their estimated load",
+        )
+
+        self.add_api_route(
+            "/traffic/{pipeline_id}",
+            self.get_pipeline_traffic,
+            methods=["GET"],
+            response_description="The expected network traffic of a pipeline",
+            description="The expected bytes per second sent between nodes on different workers, with the current worker assignments of the pipeline",
+        )
+
         self.add_api_route(
             "/actions-fsm",
             self.get_actions_fsm,
@@ -119,67 +173,216 @@ class ClusterRouter(APIRouter):
             response_description="Reset the current pipeline in the cluster",
         )
 
+        # Server-Sent Events routes
+        self.add_api_route(
+            "/updates/events",
+            self.get_cluster_events,
+            methods=["GET"],
+            response_class=StreamingResponse,
+            response_description="A Server-Sent Events stream of the network updates",
+        )
+
+        self.add_api_route(
+            "/pipeline-lifecycle/events",
+            self.get_pipeline_events,
+            methods=["GET"],
+            response_class=StreamingResponse,
+            response_description="A Server-Sent Events stream of the pipeline lifecycle updates",
+        )
+
         # Websocket routes
         self.add_websocket_route("/cluster/updates", self.get_cluster_updates)
         self.add_websocket_route(
             "/cluster/pipeline-lifecycle", self.get_pipeline_updates
         )
 
-    async def get_cluster_updates(self, websocket: WebSocket):  # noqa: C901
-        """Get updates from the cluster manager and relay them to the client websocket."""
-        await websocket.accept()
+    async def get_cluster_updates(self, websocket: WebSocket):
+        """Get updates from the cluster manager and relay them to the client websocket.
 
-        update_queue = asyncio.Queue()
-        relay_task = asyncio.create_task(
-            relay(
-                update_queue,
-                websocket,
-                lambda msg: self.manager.is_sentinel(msg),
-            )
+        With the ``delta=true`` query parameter, the client gets a full snapshot
+        followed by JSON patches against the previous state, each with a ``seq``
+        number. Sending ``{"type": "resync"}`` requests a new snapshot, e.g.
+        after the client detected a gap in the sequence numbers.
+
+        The ``max_rate`` query parameter (in Hz) limits how often updates are
+        sent, conflating bursts to the latest state of the cluster.
+
+        Sending ``{"type": "subscribe", "filters": {...}}`` restricts the updates
+        to some ``workers``, ``nodes`` and node ``fields`` (lists of IDs/names).
+        The same filters are accepted as comma separated query parameters.
+
+        Clients negotiating the ``msgpack`` subprotocol get the updates as
+        msgpack encoded binary frames. Their own messages stay JSON text.
+
+        A reconnecting client can pass the ``seq`` of the last update it got as
+        the ``last_seq`` query parameter, to only get the updates it missed.
+        """
+        binary = await accept(websocket)
+
+        try:
+            view = _query_filter(websocket.query_params)
+        except ValidationError as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+
+        encoder = FrameEncoder(
+            delta=websocket.query_params.get("delta", "").lower()
+            in {"1", "true"},
+            view=view,
+            binary=binary,
         )
-        poll_task = asyncio.create_task(poll(websocket))
-        await self.manager.subscribe_to_network_updates(
-            update_queue,
-            UpdateMessage(
-                data=ClusterState.from_cp_manager_state(
-                    self.manager.get_network().unwrap(),
-                    zeroconf_discovery=self.manager.is_zeroconf_discovery_enabled(),
-                ),
-                signal=UpdateMessageType.NETWORK_UPDATE,
+        try:
+            max_rate = float(
+                websocket.query_params.get(
+                    "max_rate", self.manager.updates_max_rate
+                )
+            )
+        except ValueError:
+            max_rate = self.manager.updates_max_rate
+
+        session = UpdatesSession(
+            websocket,
+            self.manager.is_sentinel,
+            encoder,
+            max_rate,
+            lambda message: self._on_updates_message(
+                message, encoder, session.queue
             ),
         )
-
+        last_seq = _query_int(websocket, "last_seq")
+        if encoder.delta and last_seq is not None:
+            if (base := self.manager.get_network_update(last_seq)) is not None:
+                encoder.resume(base)
+        session.stats = await self.manager.subscribe_to_network_updates(
+            session.queue, self._current_network_update(), last_seq
+        )
         try:
-            done, pending = await asyncio.wait(
-                [relay_task, poll_task], return_when=asyncio.FIRST_COMPLETED
-            )
-            for task in pending:
-                task.cancel()
+            await session.run()
         finally:
-            await self.manager.unsubscribe_from_network_updates(update_queue)
-            if not relay_task.done():
-                relay_task.cancel()
+            await self.manager.unsubscribe_from_network_updates(session.queue)
+
+    def _on_updates_message(
+        self, message: Any, encoder: FrameEncoder, update_queue: asyncio.Queue
+    ) -> None:
+        """Handle a resync or subscribe message of a network updates client."""
+        if not isinstance(message, dict):
+            return
+
+        if message.get("type") == "subscribe":
+            try:
+                encoder.subscribe(
+                    SubscriptionFilter.model_validate(
+                        message.get("filters") or {}
+                    )
+                )
+            except ValidationError as e:
+                self.manager.send_network_update(
+                    update_queue, Frame({"error": str(e)})
+                )
+                return
+        elif message.get("type") == "resync":
+            encoder.resync()
+        else:
+            return
+
+        latest = self.manager.get_latest_network_update()
+        self.manager.send_network_update(
+            update_queue,
+            latest
+            if latest is not None
+            else Frame(self._current_network_update().to_payload()),
+        )
+
+    def _current_network_update(self) -> UpdateMessage:
+        """The current state of the cluster as an update message."""
+        return UpdateMessage(
+            data=ClusterState.from_cp_manager_state(
+                self.manager.get_network().unwrap(),
+                zeroconf_discovery=self.manager.is_zeroconf_discovery_enabled(),
+            ),
+            signal=UpdateMessageType.NETWORK_UPDATE,
+        )
 
     async def get_pipeline_updates(self, websocket: WebSocket):
-        await websocket.accept()
+        """Relay the pipeline lifecycle updates to the client websocket.
 
-        update_queue = asyncio.Queue()
-        relay_task = asyncio.create_task(
-            relay(update_queue, websocket, self.manager.is_sentinel)
+        The client first gets the current lifecycle state, or the updates it
+        missed when resuming with the ``last_seq`` query parameter.
+        """
+        binary = await accept(websocket)
+
+        session = UpdatesSession(
+            websocket, self.manager.is_sentinel, FrameEncoder(binary=binary)
+        )
+        session.stats = await self.manager.subscribe_to_commit_updates(
+            session.queue, _query_int(websocket, "last_seq")
         )
-        poll_task = asyncio.create_task(poll(websocket))
-        await self.manager.subscribe_to_commit_updates(update_queue)
         try:
-            done, pending = await asyncio.wait(
-                [relay_task, poll_task], return_when=asyncio.FIRST_COMPLETED
-            )
-            for task in pending:
-                task.cancel()
-
+            await session.run()
         finally:
-            await self.manager.unsubscribe_from_commit_updates(update_queue)
-            if not relay_task.done():
-                relay_task.cancel()
+            await self.manager.unsubscribe_from_commit_updates(session.queue)
+
+    async def get_cluster_events(
+        self,
+        request: Request,
+        last_event_id: Optional[str] = Header(default=None),
+    ) -> StreamingResponse:
+        """Stream the network updates as Server-Sent Events.
+
+        Each update carrying a state has its ``seq`` as the event ID, so that a
+        reconnecting ``EventSource`` only gets the updates it missed (if they
+        are still buffered) thanks to its ``Last-Event-ID`` header. Clients
+        that can't set the header can pass the ``last_seq`` query parameter.
+        The ``workers``, ``nodes`` and ``fields`` query parameters filter the
+        updates as for the websocket.
+        """
+        try:
+            view = _query_filter(request.query_params)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+
+        stream = EventStream(
+            self.manager.is_sentinel,
+            view,
+            self.manager.updates_heartbeat_interval,
+        )
+        last_seq = self._last_event_id(request, last_event_id)
+        return _event_stream_response(
+            stream,
+            lambda q: self.manager.subscribe_to_network_updates(
+                q, self._current_network_update(), last_seq
+            ),
+            self.manager.unsubscribe_from_network_updates,
+        )
+
+    async def get_pipeline_events(
+        self,
+        request: Request,
+        last_event_id: Optional[str] = Header(default=None),
+    ) -> StreamingResponse:
+        """Stream the pipeline lifecycle updates as Server-Sent Events.
+
+        Replays the updates missed by a reconnecting client as for the network
+        updates stream, and otherwise starts with the current lifecycle state.
+        """
+        stream = EventStream(
+            self.manager.is_sentinel,
+            heartbeat=self.manager.updates_heartbeat_interval,
+        )
+        last_seq = self._last_event_id(request, last_event_id)
+        return _event_stream_response(
+            stream,
+            lambda q: self.manager.subscribe_to_commit_updates(q, last_seq),
+            self.manager.unsubscribe_from_commit_updates,
+        )
+
+    @staticmethod
+    def _last_event_id(
+        request: Request, last_event_id: Optional[str]
+    ) -> Optional[int]:
+        if last_event_id is None:
+            last_event_id = request.query_params.get("last_seq")
+        return _int_or_none(last_event_id)
 
     async def get_manager_state(self) -> ClusterState:
         """Get the current state of the cluster."""
@@ -188,6 +391,10 @@ class ClusterRouter(APIRouter):
             zeroconf_discovery=self.manager.is_zeroconf_discovery_enabled(),
         )
 
+    async def get_updates_metrics(self) -> Dict[str, Any]:
+        """Get the delivery metrics of the updates websockets."""
+        return self.manager.get_updates_metrics()
+
     async def toggle_zeroconf_discovery(self, enable: bool) -> Dict[str, bool]:
         """Enable/Disable zeroconf discovery."""
         try:
@@ -212,6 +419,22 @@ class ClusterRouter(APIRouter):
             lambda err: get_mapping(err).to_fastapi()
         ).unwrap()
 
+    async def place_pipeline(
+        self, pipeline_id: str, request: PlacementRequest
+    ) -> PlacementPlan:
+        """Place the nodes of a pipeline on the connected workers."""
+        result = self.manager.place_pipeline(pipeline_id, request)
+        return result.map_error(
+            lambda err: get_mapping(err).to_fastapi()
+        ).unwrap()
+
+    async def get_pipeline_traffic(self, pipeline_id: str) -> TrafficReport:
+        """Get the expected network traffic of a pipeline."""
+        result = self.manager.get_pipeline_traffic(pipeline_id)
+        return result.map_error(
+            lambda err: get_mapping(err).to_fastapi()
+        ).unwrap()
+
     async def get_actions_fsm(self) -> Dict[str, Any]:
         """Get the actions FSM."""
         return self.manager.get_states_info()
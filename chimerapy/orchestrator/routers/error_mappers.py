@@ -1,6 +1,17 @@
 from fastapi.exceptions import HTTPException
 
+from chimerapy.orchestrator.json_patch import JsonPatchError
+from chimerapy.orchestrator.models.pipeline_config import (
+    TemplateExpansionError,
+)
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    PlacementError,
+)
+from chimerapy.orchestrator.services.pipeline_service.index import (
+    InvalidQueryError,
+)
 from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    BatchOperationError,
     EdgeNotFoundError,
     InvalidNodeError,
     NodeNotFoundError,
@@ -29,12 +40,24 @@ class CustomError:
 
 def get_mapping(err: Exception) -> CustomError:
     """Maps an exception to a CustomError."""
-    if isinstance(
+    if isinstance(err, BatchOperationError):
+        return CustomError(get_mapping(err.error).status_code, str(err))
+    elif isinstance(
         err, (EdgeNotFoundError, NodeNotFoundError, PipelineNotFoundError)
     ):
         return CustomError(404, str(err))
     elif isinstance(err, (InvalidNodeError, NotADagError)):
         return CustomError(500, str(err))
+    elif isinstance(
+        err,
+        (
+            JsonPatchError,
+            InvalidQueryError,
+            TemplateExpansionError,
+            PlacementError,
+        ),
+    ):
+        return CustomError(422, str(err))
     elif isinstance(err, PipelineInstantiationError):
         return CustomError(400, str(err))
     elif isinstance(err, StateTransitionError):
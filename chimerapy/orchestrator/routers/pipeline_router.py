@@ -1,11 +1,15 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 
 from chimerapy.orchestrator.models.pipeline_models import (
     NodeSourceCode,
     NodesPlugin,
+    PipelineBatch,
+    PipelineDiff,
     PipelineRequest,
+    ReplicasRequest,
     WebEdge,
     WebNode,
 )
@@ -13,11 +17,43 @@ from chimerapy.orchestrator.registry import (
     check_registry,
     get_all_nodes,
     importable_packages,
+    registry_version,
 )
 from chimerapy.orchestrator.routers.error_mappers import get_mapping
 from chimerapy.orchestrator.services.pipeline_service import Pipelines
 
 
+def _etag(version: str) -> str:
+    return f'"{version}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already has the representation ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=_cache_headers(etag))
+    return None
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _conditional_json(
+    request: Request, etag: str, content: Callable[[], bytes]
+) -> Response:
+    """The JSON ``content``, or a 304 response without encoding it if unchanged."""
+    if (not_modified := _not_modified(request, etag)) is not None:
+        return not_modified
+    return Response(
+        content(), media_type="application/json", headers=_cache_headers(etag)
+    )
+
+
 class PipelineRouter(APIRouter):
     def __init__(self, pipelines: Pipelines):
         super().__init__(prefix="/pipeline", tags=["pipeline_service"])
@@ -54,6 +90,13 @@ class PipelineRouter(APIRouter):
             response_description="List of all the nodes available to add to a pipeline",
         )
 
+        self.add_api_route(
+            "/instance-pool",
+            self.invalidate_instance_pool,
+            methods=["DELETE"],
+            response_description="The number of node instances dropped",
+        )
+
         # Pipeline operations
         self.add_api_route(
             "/list",
@@ -105,6 +148,22 @@ class PipelineRouter(APIRouter):
             response_description="The removed edge",
         )
 
+        # Apply a batch of operations to a pipeline
+        self.add_api_route(
+            "/batch/{pipeline_id}",
+            self.apply_batch_to,
+            methods=["POST"],
+            response_description="The changes made to the pipeline",
+        )
+
+        # Add the replicas of a template to a pipeline
+        self.add_api_route(
+            "/add-replicas/{pipeline_id}",
+            self.add_replicas_to,
+            methods=["POST"],
+            response_description="The changes made to the pipeline",
+        )
+
         # Delete a pipeline
         self.add_api_route(
             "/remove/{pipeline_id}",
@@ -120,6 +179,12 @@ class PipelineRouter(APIRouter):
             methods=["POST"],
             response_description="The updated pipeline",
         )
+        self.add_api_route(
+            "/update/{pipeline_id}",
+            self.patch_pipeline,
+            methods=["PATCH"],
+            response_description="The updated pipeline",
+        )
 
     async def create_pipeline(
         self, pipeline: PipelineRequest
@@ -129,6 +194,7 @@ class PipelineRouter(APIRouter):
         The pipeline request is a json object with the following structure:
         - **name**: the name of the pipeline
         - **description**: the description of the pipeline
+        - **tags**: the tags of the pipeline
         - **config**: the configuration of the pipeline
 
         Note that a pipeline can be created using a chimerapy orchestrator configuration json (config). Or simply by
@@ -140,7 +206,9 @@ class PipelineRouter(APIRouter):
             )
         else:
             pipeline = self.pipelines.create_pipeline(
-                pipeline.name, description=pipeline.description
+                pipeline.name,
+                description=pipeline.description,
+                tags=pipeline.tags,
             )
 
         return (
@@ -233,6 +301,50 @@ class PipelineRouter(APIRouter):
             .unwrap()
         )
 
+    async def apply_batch_to(
+        self, pipeline_id: str, batch: PipelineBatch
+    ) -> PipelineDiff:
+        """Apply a batch of operations to a pipeline, all or none of them.
+
+        The request body should be a json object with a list of **operations**, each with an **op** field:
+        - **add-node**: add a **node** (a node json, with its kwargs and worker_id), its id can be set to be used by the next operations
+        - **remove-node**: remove the node with the given **id**, and its edges
+        - **add-edge**: add an edge from **source** to **sink** (node ids), with an optional **id**
+        - **remove-edge**: remove the edge from **source** to **sink**
+        - **update-node**: update the **name**, **kwargs** or **worker_id** of the node with the given **id**
+
+        The pipeline is checked for cycles once, after the last operation. If any operation fails, none are applied
+        and the error names the failing operation.
+        The response will return the nodes and edges added, updated and removed by the batch, with the new pipeline version.
+        """
+        return (
+            self.pipelines.apply_batch_to(pipeline_id, batch.operations)
+            .map_error(lambda err: get_mapping(err).to_fastapi())
+            .unwrap()
+        )
+
+    async def add_replicas_to(
+        self, pipeline_id: str, request: ReplicasRequest
+    ) -> PipelineDiff:
+        """Add the replicas of a template (a parameterised subgraph) to a pipeline, all or none of them.
+
+        The request body should be a json object with the following fields:
+        - **template**: the **name**, **parameters** (with their default values), **nodes** and **adj** of the template
+        - **replicas**: the **count** of replicas from the **start** index, the **prefix** of their node names, the
+        **workers** they are assigned to in turn, the values of the **parameters** and the **links** of each replica
+        to the rest of the pipeline
+
+        The {parameter}, {index} and {prefix} placeholders in the kwargs of the nodes are substituted for each replica.
+        The response will return the nodes and edges added, with the new pipeline version.
+        """
+        return (
+            self.pipelines.add_replicas_to(
+                pipeline_id, request.template, request.replicas
+            )
+            .map_error(lambda err: get_mapping(err).to_fastapi())
+            .unwrap()
+        )
+
     async def remove_pipeline(self, pipeline_id: str) -> Dict[str, Any]:
         """Delete a pipeline.
 
@@ -245,11 +357,19 @@ class PipelineRouter(APIRouter):
             .unwrap()
         )
 
-    async def list_nodes(self) -> List[WebNode]:
+    async def list_nodes(
+        self, request: Request, response: Response
+    ) -> List[WebNode]:
         """Get all nodes.
 
         The response will return a list of all nodes (that can be used to create pipelines) as json.
+        It has an ETag, and a 304 response is returned if the nodes didn't change since the client got them.
         """
+        etag = _etag(registry_version())
+        if (not_modified := _not_modified(request, etag)) is not None:
+            return not_modified
+
+        response.headers.update(_cache_headers(etag))
         return [node.to_web_node() for node in get_all_nodes()]
 
     async def install_plugin(self, package: str) -> List[WebNode]:
@@ -262,8 +382,16 @@ class PipelineRouter(APIRouter):
         except Exception as e:
             raise e
 
+        self.pipelines.invalidate_instances()
         return [node.to_web_node() for node in get_all_nodes()]
 
+    async def invalidate_instance_pool(self) -> Dict[str, int]:
+        """Drop the node instances kept to be reused by the next instantiations.
+
+        The nodes of the next instantiations will all be constructed anew.
+        """
+        return {"dropped": self.pipelines.invalidate_instances()}
+
     async def installable_plugins(self) -> List[NodesPlugin]:
         """Get all importable packages.
 
@@ -274,24 +402,81 @@ class PipelineRouter(APIRouter):
             for package_name in importable_packages()
         ]
 
-    async def list_pipelines(self) -> List[Dict[str, Any]]:
-        """Get all pipelines.
-
-        The response will return a list of all pipelines as json.
+    async def list_pipelines(
+        self,
+        request: Request,
+        name: Optional[str] = None,
+        tag: Optional[str] = None,
+        instantiated: Optional[bool] = None,
+        committed: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = Query(default=None, ge=1),
+        fields: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get all pipelines, or a page of them.
+
+        The response will return a list of all pipelines as json, in creation order.
+        - **name**, **tag**, **instantiated** and **committed** only list the pipelines with that name, tag or status
+        - **limit** is the maximum number of pipelines listed, and the next page is linked in the Link header (rel="next")
+        - **cursor** is the cursor of the page to list, as given in the link to it
+        - **fields** is a comma separated list of the fields of the pipelines to return, e.g. id,name
+        It has an ETag, and a 304 response is returned if the pipelines didn't change since the client got them.
         """
-        return self.pipelines.web_json().unwrap()
+        etag = _etag(self.pipelines.web_json_version().unwrap())
+        filters = {
+            field: value
+            for field, value in [
+                ("name", name),
+                ("tag", tag),
+                ("instantiated", instantiated),
+                ("committed", committed),
+            ]
+            if value is not None
+        }
+        if not filters and all(
+            param is None for param in (cursor, limit, fields)
+        ):
+            return _conditional_json(
+                request, etag, lambda: self.pipelines.web_json_bytes().unwrap()
+            )
 
-    async def get_pipeline(self, pipeline_id: str) -> Dict[str, Any]:
+        if (not_modified := _not_modified(request, etag)) is not None:
+            return not_modified
+
+        pipelines, next_cursor = (
+            self.pipelines.list_pipelines(
+                filters,
+                cursor=cursor,
+                limit=limit,
+                fields=fields.split(",") if fields is not None else None,
+            )
+            .map_error(lambda err: get_mapping(err).to_fastapi())
+            .unwrap()
+        )
+        headers = _cache_headers(etag)
+        if next_cursor is not None:
+            next_url = request.url.include_query_params(cursor=next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return JSONResponse(pipelines, headers=headers)
+
+    async def get_pipeline(
+        self, pipeline_id: str, request: Request
+    ) -> Dict[str, Any]:
         """Get a pipeline.
 
         The response will return the pipeline as json. If the pipeline does not exist, a 404 error will be returned.
+        It has an ETag, and a 304 response is returned if the pipeline didn't change since the client got it.
         """
-        return (
-            self.pipelines.get_pipeline(pipeline_id)
-            .map(lambda p: p.to_web_json())
+        version = (
+            self.pipelines.web_json_version(pipeline_id)
             .map_error(lambda err: get_mapping(err).to_fastapi())
             .unwrap()
         )
+        return _conditional_json(
+            request,
+            _etag(version),
+            lambda: self.pipelines.web_json_bytes(pipeline_id).unwrap(),
+        )
 
     async def update_pipeline(
         self, pipeline_id: str, pipeline: Dict[str, Any]
@@ -303,6 +488,35 @@ class PipelineRouter(APIRouter):
         updated = self.pipelines.update_from_web_json(pipeline_id, pipeline)
         return updated.unwrap()
 
+    async def patch_pipeline(
+        self, pipeline_id: str, patch: List[Dict[str, Any]], request: Request
+    ) -> Dict[str, Any]:
+        """Update a pipeline with a JSON Patch (RFC 6902) of its json representation.
+
+        The patch is applied to the pipeline json as returned by the get route, and only the nodes and edges
+        that it changes are updated. With an If-Match header, the patch is only applied if the pipeline still has
+        that ETag, otherwise a 412 error is returned.
+        The response will return the pipeline as json. If the pipeline does not exist, a 404 error will be returned,
+        and a 422 error if the patch can't be applied.
+        """
+        if (if_match := request.headers.get("if-match")) is not None:
+            version = (
+                self.pipelines.web_json_version(pipeline_id)
+                .map_error(lambda err: get_mapping(err).to_fastapi())
+                .unwrap()
+            )
+            tags = {tag.strip() for tag in if_match.split(",")}
+            if not tags & {_etag(version), "*"}:
+                raise HTTPException(
+                    status_code=412, detail="The pipeline has changed"
+                )
+
+        return (
+            self.pipelines.patch_pipeline(pipeline_id, patch)
+            .map_error(lambda err: get_mapping(err).to_fastapi())
+            .unwrap()
+        )
+
     async def get_node_source_code(
         self, registry_name: str, package: str
     ) -> NodeSourceCode:
@@ -0,0 +1,261 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, List, Optional, Union
+
+from fastapi.websockets import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from chimerapy.orchestrator.models.cluster_models import SubscriptionFilter
+from chimerapy.orchestrator.services.cluster_service.frames import (
+    MSGPACK_SUBPROTOCOL,
+    FrameEncoder,
+    conflate,
+    msgpack_available,
+)
+from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    ClientStats,
+)
+
+
+async def accept(ws: WebSocket) -> bool:
+    """Accept the websocket, negotiating the msgpack subprotocol if requested.
+
+    Returns whether the updates should be sent as msgpack (binary) frames, JSON
+    text frames being the fallback when msgpack isn't installed.
+    """
+    requested = ws.scope.get("subprotocols", [])
+    if MSGPACK_SUBPROTOCOL in requested and msgpack_available():
+        await ws.accept(subprotocol=MSGPACK_SUBPROTOCOL)
+        return True
+
+    await ws.accept(subprotocol="json" if "json" in requested else None)
+    return False
+
+
+async def send(ws: WebSocket, data: Union[str, bytes]) -> None:
+    """Send an encoded frame, msgpack encoded frames as binary."""
+    if isinstance(data, bytes):
+        await ws.send_bytes(data)
+    else:
+        await ws.send_text(data)
+
+
+class SessionQueue(asyncio.Queue):
+    """A client queue that notifies its session when an update is put in it."""
+
+    def __init__(self, on_put: Callable[[], None]) -> None:
+        super().__init__()
+        self._on_put = on_put
+
+    def _put(self, item: Any) -> None:
+        super()._put(item)
+        self._on_put()
+
+
+class UpdatesSession:
+    """A websocket client of an updates broadcaster.
+
+    The session runs in the task of the connection itself, which receives
+    the client messages and notices its disconnection. The updates are sent
+    by a sender task started when updates are queued, which ends once the
+    queue is empty: an idle connection only has its own task.
+
+    The session's ``queue`` is to be subscribed to the broadcaster. The session
+    ends when the client disconnects or when the queue yields the sentinel (or
+    None, for clients disconnected by the broadcaster), in which case the
+    sender cancels the pending receive of the connection.
+
+    Parameters
+    ----------
+    ws: WebSocket
+        The (accepted) websocket of the client.
+
+    is_sentinel: Callable[[Any], bool]
+        Whether a queued message is the sentinel of the broadcaster.
+
+    encoder: Optional[FrameEncoder]
+        The encoder of the frames sent to this client.
+
+    max_rate: float
+        The maximum rate (in Hz) of the updates sent, bursts being conflated to
+        the latest cluster state. 0 for unlimited.
+
+    on_message: Optional[Callable[[Any], None]]
+        Called with each (JSON decoded) message received from the client.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        is_sentinel: Callable[[Any], bool],
+        encoder: Optional[FrameEncoder] = None,
+        max_rate: float = 0,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.ws = ws
+        self.is_sentinel = is_sentinel
+        self.encoder = encoder if encoder is not None else FrameEncoder()
+        self.max_rate = max_rate
+        self.on_message = on_message
+        self.stats = ClientStats()
+        self.queue = SessionQueue(self._flush)
+        self.closed = False
+        self._task: Optional[asyncio.Task] = None
+        self._sender: Optional[asyncio.Future] = None
+        self._ended = False
+        self._flush_at = 0.0
+
+    def _flush(self) -> None:
+        """Start sending the queued updates, unless they're being sent."""
+        if (
+            self._sender is None
+            and self._task is not None
+            and not self.closed
+            and not self.queue.empty()
+        ):
+            self._sender = asyncio.ensure_future(self._send_updates())
+
+    def _end(self) -> None:
+        """End the session from the sender, interrupting the receive."""
+        self.closed = self._ended = True
+        self._task.cancel()
+
+    async def run(self) -> None:
+        """Send the updates to the client until either side ends the session."""
+        self._task = asyncio.current_task()
+        self._flush()
+        try:
+            await self._receive()
+        finally:
+            self.closed = True
+            if (sender := self._sender) is not None:
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+
+    async def _receive(self) -> None:
+        while not self.closed:
+            try:
+                message = await self.ws.receive()
+            except asyncio.CancelledError:
+                if self._ended:
+                    return
+                raise
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                message = json.loads(
+                    message.get("text") or message.get("bytes")
+                )
+            except (TypeError, ValueError):
+                continue
+            if self.on_message is not None:
+                self.on_message(message)
+
+    async def _send_updates(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closed and not self.queue.empty():
+                if self.max_rate > 0:
+                    if (wait := self._flush_at - loop.time()) > 0:
+                        await asyncio.sleep(wait)
+                    batch = self._next_batch()
+                    self._flush_at = loop.time() + 1 / self.max_rate
+                else:
+                    batch = [self.queue.get_nowait()]
+
+                if not await self._send_batch(batch):
+                    self._end()
+                    return
+        finally:
+            self._sender = None
+
+    def _next_batch(self) -> List[Any]:
+        """Everything queued, conflated to the latest cluster state."""
+        messages = []
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        batch = conflate(messages)
+        self.stats.conflated += len(messages) - len(batch)
+        return batch
+
+    async def _send_batch(self, batch: List[Any]) -> bool:
+        """Send the messages, returns whether the session goes on."""
+        for message in batch:
+            if message is None or self.is_sentinel(message):
+                return False
+            if self.ws.client_state == WebSocketState.DISCONNECTED:
+                return False
+            data = self.encoder.encode(message)
+            if data is None:
+                continue
+            try:
+                await send(self.ws, data)
+            except WebSocketDisconnect:
+                return False
+            self.stats.emitted += 1
+
+        return True
+
+
+HEARTBEAT = ": heartbeat\n\n"
+
+
+class EventStream:
+    """A Server-Sent Events client of an updates broadcaster.
+
+    The updates are written as ``text/event-stream`` events, numbered updates
+    carrying their ``seq`` as the event ID so that a reconnecting client's
+    ``Last-Event-ID`` can be used to replay what it missed. A comment is sent
+    when no update went out for ``heartbeat`` seconds, keeping proxies from
+    closing the idle connection. There is nothing to receive from the client,
+    the stream ends when the response is cancelled on disconnection or when
+    the queue yields the sentinel (or None).
+
+    Parameters
+    ----------
+    is_sentinel: Callable[[Any], bool]
+        Whether a queued message is the sentinel of the broadcaster.
+
+    view: Optional[SubscriptionFilter]
+        The subset of the cluster state the client subscribed to.
+
+    heartbeat: float
+        The idle time (in seconds) after which a heartbeat is sent, 0 for none.
+    """
+
+    def __init__(
+        self,
+        is_sentinel: Callable[[Any], bool],
+        view: Optional[SubscriptionFilter] = None,
+        heartbeat: float = 15.0,
+    ) -> None:
+        self.is_sentinel = is_sentinel
+        self.view = view if view is not None and not view.is_empty else None
+        self.heartbeat = heartbeat
+        self.stats = ClientStats()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.last_seq: Optional[int] = None
+
+    async def _next(self) -> Any:
+        if self.heartbeat <= 0:
+            return await self.queue.get()
+        try:
+            return await asyncio.wait_for(self.queue.get(), self.heartbeat)
+        except asyncio.TimeoutError:
+            return HEARTBEAT
+
+    async def events(self) -> AsyncIterator[str]:
+        """The events to stream to the client."""
+        while True:
+            message = await self._next()
+            if message is HEARTBEAT:
+                yield HEARTBEAT
+                continue
+            if message is None or self.is_sentinel(message):
+                return
+            if message.is_state:
+                if self.last_seq is not None and message.seq <= self.last_seq:
+                    continue
+                self.last_seq = message.seq
+            yield message.event(self.view)
+            self.stats.emitted += 1
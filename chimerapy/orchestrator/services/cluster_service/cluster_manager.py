@@ -1,13 +1,32 @@
 import asyncio
 import json
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from chimerapy.engine.manager import Manager
 from chimerapy.engine.states import ManagerState
-from chimerapy.orchestrator.models.cluster_models import UpdateMessage
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    PlacementPlan,
+    PlacementRequest,
+    TrafficReport,
+    UpdateMessage,
+)
+from chimerapy.orchestrator.models.pipeline_models import UpdateNodeOperation
 from chimerapy.orchestrator.monads import Err, Ok, Result
+from chimerapy.orchestrator.services.cluster_service.deployment import (
+    Deployment,
+    recommit,
+)
+from chimerapy.orchestrator.services.cluster_service.frames import Frame
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    PlacementEngine,
+)
 from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    ClientStats,
     ClusterUpdatesBroadCaster,
+    OverflowPolicy,
     UpdatesBroadcaster,
 )
 from chimerapy.orchestrator.services.pipeline_service.pipelines import (
@@ -20,6 +39,15 @@ class ClusterManager(FSM):
     def __init__(
         self,
         pipeline_service: PipelineService,
+        updates_queue_size: int = 256,
+        updates_overflow_policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        updates_max_rate: float = 0,
+        manager_reconnect_attempts: int = 0,
+        manager_reconnect_max_delay: float = 30.0,
+        updates_history_size: int = 128,
+        updates_heartbeat_interval: float = 15.0,
+        placement_strategy: str = "",
+        commit_mode: str = "full",
         **manager_kwargs,
     ):
         with (Path(__file__).parent / "states.json").open("r") as f:
@@ -48,11 +76,35 @@ class ClusterManager(FSM):
         self._manager = Manager(**kwargs)
 
         self._network_updates_broadcaster = ClusterUpdatesBroadCaster(
-            self._manager.host, self._manager.port
+            self._manager.host,
+            self._manager.port,
+            max_queue_size=updates_queue_size,
+            overflow_policy=updates_overflow_policy,
+            state_provider=lambda: self._manager.state.to_dict(),
+            reconnect_attempts=manager_reconnect_attempts,
+            max_reconnect_delay=manager_reconnect_max_delay,
+            history_size=updates_history_size,
         )
 
         self._sentinel = "STOP"
-        self._pipeline_updates_broadcaster = UpdatesBroadcaster(self._sentinel)
+        self._pipeline_updates_broadcaster = UpdatesBroadcaster(
+            self._sentinel,
+            max_queue_size=updates_queue_size,
+            overflow_policy=updates_overflow_policy,
+            history_size=updates_history_size,
+        )
+
+        self.updates_max_rate = updates_max_rate
+        self.updates_heartbeat_interval = updates_heartbeat_interval
+
+        self.placement_engine = PlacementEngine()
+        self.placement_strategy = placement_strategy
+
+        if commit_mode not in ("full", "incremental"):
+            raise ValueError(f"Unknown commit mode {commit_mode}")
+        self.commit_mode = commit_mode
+        self.last_commit: Optional[Dict[str, Any]] = None
+        self._deployment: Optional[Deployment] = None
 
         self._pipeline_service = pipeline_service
         self._active_pipeline = None
@@ -88,24 +140,60 @@ class ClusterManager(FSM):
         self._manager.shutdown()
 
     async def subscribe_to_network_updates(
-        self, q: asyncio.Queue, message: UpdateMessage = None
-    ) -> None:
-        """Subscribe to network updates from the cluster manager."""
-        await self._network_updates_broadcaster.add_client(q, message)
+        self,
+        q: asyncio.Queue,
+        message: UpdateMessage = None,
+        last_seq: Optional[int] = None,
+    ) -> ClientStats:
+        """Subscribe to network updates from the cluster manager.
+
+        Resumes from ``last_seq`` if the missed updates are still available,
+        starts with the current state ``message`` otherwise.
+        """
+        return await self._network_updates_broadcaster.add_client(
+            q, message, last_seq
+        )
+
+    def get_latest_network_update(self) -> Optional[Frame]:
+        """Get the latest numbered network update, if any."""
+        return self._network_updates_broadcaster.latest
+
+    def get_network_update(self, seq: int) -> Optional[Frame]:
+        """Get the numbered network update ``seq``, if it is still available."""
+        return self._network_updates_broadcaster.updater.get_frame(seq)
+
+    def send_network_update(self, q: asyncio.Queue, frame: Frame) -> None:
+        """Send a network update to a single subscriber, as its queue allows."""
+        self._network_updates_broadcaster.send(q, frame)
 
     async def unsubscribe_from_network_updates(self, q: asyncio.Queue) -> None:
         """Unsubscribe from network updates from the cluster manager."""
         await self._network_updates_broadcaster.remove_client(q)
 
-    async def subscribe_to_commit_updates(self, q: asyncio.Queue) -> None:
-        """Subscribe to commit updates from the cluster manager."""
-        await self._pipeline_updates_broadcaster.add_client(q)
-        self.put_commit_update()
+    async def subscribe_to_commit_updates(
+        self, q: asyncio.Queue, last_seq: Optional[int] = None
+    ) -> ClientStats:
+        """Subscribe to commit updates from the cluster manager.
+
+        Resumes from ``last_seq`` if the missed updates are still available,
+        starts with the current lifecycle state otherwise.
+        """
+        broadcaster = self._pipeline_updates_broadcaster
+        return await broadcaster.add_client(
+            q, last_seq, broadcaster.snapshot(self._commit_update())
+        )
 
     async def unsubscribe_from_commit_updates(self, q: asyncio.Queue) -> None:
         """Unsubscribe from commit updates from the cluster manager."""
         await self._pipeline_updates_broadcaster.remove_client(q)
 
+    def get_updates_metrics(self) -> Dict[str, Any]:
+        """Get the delivery metrics of the updates broadcasters."""
+        return {
+            "network": self._network_updates_broadcaster.metrics(),
+            "pipeline": self._pipeline_updates_broadcaster.metrics(),
+        }
+
     def has_shutdown(self) -> bool:
         """Check if the manager has shutdown."""
         return self._manager.has_shutdown
@@ -157,19 +245,68 @@ class ClusterManager(FSM):
             active_pipeline = self._pipeline_service.get_pipeline(
                 pipeline_id
             ).unwrap()
+            if (
+                self.placement_strategy
+                and not active_pipeline.can_instantiate()
+            ):
+                self.place_pipeline(
+                    pipeline_id,
+                    PlacementRequest(
+                        strategy=self.placement_strategy, keep_assigned=True
+                    ),
+                ).unwrap()
+            self.transitioning = True
             result = await self._pipeline_service.instantiate_pipeline(
-                pipeline_id
+                pipeline_id, self.put_instantiation_progress
             )
             _ = result.unwrap()
             self._active_pipeline = active_pipeline
-            self.transition("/instantiate")
             self.transitioning = False
+            self.transition("/instantiate")
             self.put_commit_update()
             return Ok(True)
         except Exception as e:
             self.transitioning = False
             return Err(e)
 
+    def place_pipeline(
+        self, pipeline_id: str, request: PlacementRequest
+    ) -> Result[PlacementPlan, Exception]:
+        """Assign the nodes of a pipeline to the connected workers, as planned by the placement engine."""
+        try:
+            pipeline = self._pipeline_service.get_pipeline(pipeline_id).unwrap()
+            plan = self.placement_engine.plan(
+                pipeline, self._cluster_state(), request
+            )
+            operations = [
+                UpdateNodeOperation(id=node_id, worker_id=worker_id)
+                for node_id, worker_id in plan.assignments.items()
+                if pipeline.nodes[node_id]["wrapped_node"].worker_id
+                != worker_id
+            ]
+            if operations and not request.dry_run:
+                self._pipeline_service.apply_batch_to(
+                    pipeline_id, operations
+                ).unwrap()
+            return Ok(plan)
+        except Exception as e:
+            return Err(e)
+
+    def get_pipeline_traffic(
+        self, pipeline_id: str
+    ) -> Result[TrafficReport, Exception]:
+        """The expected network traffic of a pipeline, with its current worker assignments."""
+        return self._pipeline_service.get_pipeline(pipeline_id).map(
+            lambda pipeline: self.placement_engine.report(
+                pipeline, self._cluster_state()
+            )
+        )
+
+    def _cluster_state(self) -> ClusterState:
+        return ClusterState.from_cp_manager_state(
+            self._manager.state, self.is_zeroconf_discovery_enabled()
+        )
+
     async def commit_pipeline(self) -> Result[bool, Exception]:
         """Commit the active pipeline."""
         can, reason = self.can_transition("/commit")
@@ -193,12 +330,56 @@ class ClusterManager(FSM):
         return Ok(True)
 
     async def _commit_active_pipeline(self):
-        """Commit the active pipeline."""
-        await self._manager.async_reset(keep_workers=True)
-        graph = self._active_pipeline.chimerapy_graph
-        worker_graph_mapping = self._active_pipeline.worker_graph_mapping()
-        result = await self._manager.async_commit(graph, worker_graph_mapping)
-        self._active_pipeline.committed = True
+        """Commit the active pipeline.
+
+        In the incremental commit mode, a pipeline committed again after a
+        reset only has the nodes that changed since redeployed (see
+        ``Deployment``).
+        """
+        start = time.perf_counter()
+        pipeline = self._active_pipeline
+        # Only known again once the commit succeeds: after a failed one, the
+        # nodes left on the workers are reset by the next (full) commit
+        deployment = self._deployment
+        self._deployment = None
+        if (
+            self.commit_mode == "incremental"
+            and deployment is not None
+            and deployment.pipeline_id == pipeline.id
+        ):
+            plan = deployment.diff(pipeline, self._manager.workers)
+            pipeline.adopt_instances(
+                {node_id: node.instance for node_id, node in plan.kept.items()},
+                self._pipeline_service.instance_pool,
+            )
+            result = await recommit(self._manager, pipeline, plan)
+            stats = {
+                "mode": "incremental",
+                "created": len(plan.created),
+                "destroyed": len(plan.destroyed),
+                "kept": len(plan.kept),
+            }
+        else:
+            await self._manager.async_reset(keep_workers=True)
+            result = await self._manager.async_commit(
+                pipeline.chimerapy_graph, pipeline.worker_graph_mapping()
+            )
+            stats = {
+                "mode": "full",
+                "created": pipeline.number_of_nodes(),
+                "destroyed": 0 if deployment is None else len(deployment.nodes),
+                "kept": 0,
+            }
+
+        self.last_commit = {
+            **stats,
+            "pipeline_id": pipeline.id,
+            "success": bool(result),
+            "duration": time.perf_counter() - start,
+        }
+        if result:
+            self._deployment = Deployment.of(pipeline)
+            pipeline.committed = True
         return result
 
     async def preview_pipeline(self) -> Result[bool, Exception]:
@@ -308,9 +489,20 @@ class ClusterManager(FSM):
         return Ok(True)
 
     async def _reset_active_pipeline(self):
-        """Reset the active pipeline."""
-        await self._manager.async_reset(keep_workers=True)
-        self._active_pipeline.destroy()
+        """Reset the active pipeline.
+
+        In the incremental commit mode, the committed nodes are stopped but
+        kept on the workers (with their instances) until the next commit.
+        """
+        pool = self._pipeline_service.instance_pool
+        if self.commit_mode == "incremental" and self._deployment is not None:
+            if self.current_state.name in ("PREVIEWING", "RECORDING"):
+                await self._manager.async_stop()
+            pool = None
+        else:
+            await self._manager.async_reset(keep_workers=True)
+            self._deployment = None
+        self._active_pipeline.destroy(pool)
         self._active_pipeline = None
 
     def transition_if_success(self, result, transition):
@@ -326,23 +518,34 @@ class ClusterManager(FSM):
 
     def put_commit_update(self):
         """Put a pipeline/commit update."""
+        asyncio.create_task(
+            self._pipeline_updates_broadcaster.put_update(self._commit_update())
+        )
+
+    def put_instantiation_progress(self, progress: Dict[str, Any]) -> None:
+        """Put a pipeline instantiation progress update."""
         asyncio.create_task(
             self._pipeline_updates_broadcaster.put_update(
-                {
-                    "data": {
-                        "fsm": self.get_states_info(),
-                        "pipeline": self._active_pipeline.to_web_json()
-                        if self._active_pipeline
-                        else None,
-                    }
-                }
+                {"signal": "INSTANTIATION_PROGRESS", **progress}
             )
         )
 
+    def _commit_update(self) -> Dict[str, Any]:
+        """The current lifecycle state, as sent to the pipeline updates clients."""
+        return {
+            "data": {
+                "fsm": self.get_states_info(),
+                "pipeline": self._active_pipeline.to_web_json()
+                if self._active_pipeline
+                else None,
+            }
+        }
+
     def get_states_info(self):
         """Return the FSM states info."""
         info = self.to_dict()
         info["active_pipeline_id"] = (
             self._active_pipeline.id if self._active_pipeline else None
         )
+        info["last_commit"] = self.last_commit
         return info
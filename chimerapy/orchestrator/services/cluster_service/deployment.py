@@ -0,0 +1,214 @@
+import asyncio
+import json
+from typing import Any, Collection, Dict, List, NamedTuple, Set, Tuple
+
+import chimerapy.engine as cpe
+from chimerapy.engine.eventbus import Event
+from chimerapy.engine.manager import Manager
+from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+
+
+class DeployedNode(NamedTuple):
+    """A node of a pipeline committed to the cluster."""
+
+    instance: cpe.Node
+    worker_id: str
+    fingerprint: Tuple[Any, ...]
+
+
+class RecommitPlan(NamedTuple):
+    """The changes to the nodes committed to the cluster for a new instantiation of their pipeline."""
+
+    kept: Dict[str, DeployedNode]
+    destroyed: Dict[str, DeployedNode]
+    created: List[str]
+    workers: Set[str]
+
+
+def fingerprint(pipeline: Pipeline, node_id: str) -> Tuple[Any, ...]:
+    """What a node is deployed with: its class, kwargs, worker and inputs."""
+    wrapped_node = pipeline.nodes[node_id]["wrapped_node"]
+    inputs = tuple(
+        sorted(
+            (
+                source,
+                pipeline.nodes[source]["wrapped_node"].instance_kwargs()[
+                    "name"
+                ],
+            )
+            for source in pipeline.predecessors(node_id)
+        )
+    )
+    return (
+        wrapped_node.registry_name,
+        wrapped_node.package,
+        json.dumps(
+            wrapped_node.instance_kwargs(), sort_keys=True, default=repr
+        ),
+        wrapped_node.worker_id,
+        inputs,
+        pipeline.out_degree(node_id) > 0,
+    )
+
+
+class Deployment:
+    """The nodes of a pipeline committed to the cluster.
+
+    A new instantiation of the pipeline is compared with the deployment to
+    only redeploy the nodes that changed (their class, kwargs, worker or
+    inputs), the new nodes and, because of how the engine connects them:
+
+    * the nodes downstream of a redeployed node, which publishes on a new
+      port its subscribers must connect to;
+    * all the nodes of a worker with a redeployed node, as a worker sets up
+      the connections of all its nodes at once.
+
+    The other nodes keep running on their workers with the instances they
+    were committed with.
+
+    Parameters
+    ----------
+    pipeline_id: str
+        The id of the committed pipeline.
+
+    nodes: Dict[str, DeployedNode]
+        The deployed nodes, by node id in the pipeline.
+    """
+
+    def __init__(self, pipeline_id: str, nodes: Dict[str, DeployedNode]):
+        self.pipeline_id = pipeline_id
+        self.nodes = nodes
+
+    @classmethod
+    def of(cls, pipeline: Pipeline) -> "Deployment":
+        """The deployment of an instantiated pipeline, once committed."""
+        return cls(
+            pipeline.id,
+            {
+                node_id: DeployedNode(
+                    wrapped_node.instance,
+                    wrapped_node.worker_id,
+                    fingerprint(pipeline, node_id),
+                )
+                for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+            },
+        )
+
+    def diff(
+        self, pipeline: Pipeline, workers: Collection[str]
+    ) -> RecommitPlan:
+        """The nodes to keep, destroy and create to commit the pipeline.
+
+        The nodes deployed on workers that are no longer connected are
+        considered gone.
+        """
+        deployed = {
+            node_id: node
+            for node_id, node in self.nodes.items()
+            if node.worker_id in workers
+        }
+        redeployed = {
+            node_id
+            for node_id in pipeline.nodes
+            if node_id not in deployed
+            or deployed[node_id].fingerprint != fingerprint(pipeline, node_id)
+        }
+        redeployed = self._closure(pipeline, redeployed)
+
+        kept = {
+            node_id: node
+            for node_id, node in deployed.items()
+            if node_id in pipeline.nodes and node_id not in redeployed
+        }
+        return RecommitPlan(
+            kept=kept,
+            destroyed={
+                node_id: node
+                for node_id, node in deployed.items()
+                if node_id not in kept
+            },
+            created=[
+                node_id for node_id in pipeline.nodes if node_id in redeployed
+            ],
+            workers={
+                pipeline.nodes[node_id]["wrapped_node"].worker_id
+                for node_id in redeployed
+            },
+        )
+
+    @staticmethod
+    def _closure(pipeline: Pipeline, redeployed: Set[str]) -> Set[str]:
+        """The nodes to redeploy with the ``redeployed`` ones, as the engine connects them."""
+        by_worker: Dict[str, List[str]] = {}
+        for node_id, wrapped_node in pipeline.nodes(data="wrapped_node"):
+            by_worker.setdefault(wrapped_node.worker_id, []).append(node_id)
+
+        closure: Set[str] = set()
+        pending = list(redeployed)
+        while pending:
+            node_id = pending.pop()
+            if node_id in closure:
+                continue
+            closure.add(node_id)
+            worker_id = pipeline.nodes[node_id]["wrapped_node"].worker_id
+            pending.extend(pipeline.successors(node_id))
+            pending.extend(by_worker.pop(worker_id, ()))
+        return closure
+
+
+async def recommit(
+    manager: Manager, pipeline: Pipeline, plan: RecommitPlan
+) -> bool:
+    """Commit an instantiated pipeline to the cluster, only redeploying its nodes as planned.
+
+    The steps of ``Manager.async_commit``, restricted to the destroyed and
+    created nodes and the workers whose connections are set up again. The
+    kept nodes must have their deployed instances (see
+    ``Pipeline.adopt_instances``). These steps use the internals of the
+    engine's manager, those of the chimerapy-engine version pinned.
+
+    It stops at the first step that fails, leaving the nodes deployed on the
+    workers unknown: the next commit must then be a full one.
+    """
+    destroyed = await asyncio.gather(
+        *(
+            manager._async_request_node_destruction(
+                node.worker_id, node.instance.id
+            )
+            for node in plan.destroyed.values()
+        )
+    )
+    if not all(destroyed):
+        return False
+
+    mapping = pipeline.worker_graph_mapping()
+    manager._register_graph(pipeline.chimerapy_graph)
+    manager.worker_handler._map_graph(mapping)
+    await manager.eventbus.asend(Event("save_meta"))
+    created = await asyncio.gather(
+        *(
+            manager._async_request_node_creation(
+                wrapped_node.worker_id, wrapped_node.instance.id
+            )
+            for wrapped_node in (
+                pipeline.nodes[node_id]["wrapped_node"]
+                for node_id in plan.created
+            )
+        )
+    )
+    if not all(created):
+        return False
+
+    tables = await asyncio.gather(
+        *(manager._async_request_node_pub_table(w) for w in mapping)
+    )
+    if not all(tables):
+        return False
+
+    connected = await asyncio.gather(
+        *(
+            manager._async_request_connection_creation(worker_id)
+            for worker_id in plan.workers
+        )
+    )
+    return all(connected)
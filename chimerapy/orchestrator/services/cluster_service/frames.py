@@ -0,0 +1,208 @@
+import itertools
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from chimerapy.orchestrator.json_patch import make_patch
+from chimerapy.orchestrator.models.cluster_models import SubscriptionFilter
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+
+def dumps(payload: Any) -> str:
+    """Compact JSON encoding, as used by starlette's ``send_json``."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def packb(payload: Any) -> bytes:
+    """MessagePack encoding, for the clients of the msgpack subprotocol."""
+    return msgpack.packb(payload)
+
+
+def msgpack_available() -> bool:
+    """Whether the (optional) msgpack package is installed."""
+    return msgpack is not None
+
+
+def _encode(payload: Any, binary: bool) -> Union[str, bytes]:
+    return packb(payload) if binary else dumps(payload)
+
+
+class Frame:
+    """An update message that is encoded once, however many clients it goes to.
+
+    Frames carrying a state are numbered, so that clients can resume a stream
+    and so that a frame can be sent as a diff against the state of an earlier
+    one. The state can be projected to the subset a client subscribed to,
+    each projection being computed (and encoded) once for all the clients
+    sharing its filter.
+
+    Parameters
+    ----------
+    payload: Dict[str, Any]
+        The JSON compatible update message.
+
+    seq: Optional[int]
+        The sequence number of the frame, if it carries a state.
+    """
+
+    __slots__ = ("payload", "seq", "uid", "_cache")
+
+    _uids = itertools.count()
+
+    def __init__(self, payload: Dict[str, Any], seq: Optional[int] = None):
+        self.payload = payload
+        self.seq = seq
+        self.uid = next(self._uids)
+        self._cache: Dict[Any, Any] = {}
+
+    @property
+    def is_state(self) -> bool:
+        """Whether the frame carries a (numbered) state."""
+        return self.seq is not None
+
+    def data(self, view: Optional[SubscriptionFilter] = None) -> Any:
+        """The data of the payload, projected to the ``view`` if any."""
+        data = self.payload.get("data")
+        if view is None or not isinstance(data, dict):
+            return data
+
+        if (projected := self._cache.get(("data", view))) is None:
+            projected = self._cache[("data", view)] = view.project(data)
+        return projected
+
+    def text(
+        self, view: Optional[SubscriptionFilter] = None, binary: bool = False
+    ) -> Union[str, bytes]:
+        """The JSON (or msgpack if ``binary``) encoded payload, with its ``seq`` if numbered."""
+        key = ("full", view, binary)
+        if (text := self._cache.get(key)) is None:
+            payload = self.payload
+            if view is not None and isinstance(payload.get("data"), dict):
+                payload = {**payload, "data": self.data(view)}
+            if self.is_state:
+                payload = {**payload, "seq": self.seq}
+            text = self._cache[key] = _encode(payload, binary)
+        return text
+
+    def event(self, view: Optional[SubscriptionFilter] = None) -> str:
+        """The payload as a Server-Sent Event, with its ``seq`` as the event ID."""
+        key = ("event", view)
+        if (event := self._cache.get(key)) is None:
+            data = f"data: {self.text(view)}\n\n"
+            event = self._cache[key] = (
+                f"id: {self.seq}\n{data}" if self.is_state else data
+            )
+        return event
+
+    def delta_text(
+        self,
+        base: "Frame",
+        view: Optional[SubscriptionFilter] = None,
+        binary: bool = False,
+    ) -> Union[str, bytes]:
+        """The encoded patch from the state of the ``base`` frame to this one.
+
+        Patches are cached per base, view and encoding, so clients that last
+        received the same frame share the encoding.
+        """
+        key = (base.uid, view, binary)
+        if (text := self._cache.get(key)) is None:
+            if (patch := self._cache.get((base.uid, view))) is None:
+                patch = self._cache[(base.uid, view)] = {
+                    "signal": self.payload["signal"],
+                    "seq": self.seq,
+                    "base_seq": base.seq,
+                    "patch": make_patch(base.data(view), self.data(view)),
+                }
+            text = self._cache[key] = _encode(patch, binary)
+        return text
+
+    def __repr__(self) -> str:
+        return f"<Frame {self.seq}: {self.payload!r}>"
+
+
+class FrameEncoder:
+    """Chooses the encoding of each frame sent to a single client.
+
+    Numbered frames that are not newer than the last one sent (e.g. replayed
+    after a snapshot) are skipped. In delta mode, a client first receives a
+    full snapshot and then patches against the last state it was sent, each
+    carrying the sequence number of the frame and of its base. Frames skipped
+    in between (dropped by backpressure or conflated) are folded into the next
+    patch.
+
+    Parameters
+    ----------
+    delta: bool
+        Whether the client asked for delta encoded updates.
+
+    view: Optional[SubscriptionFilter]
+        The subset of the cluster state the client subscribed to.
+
+    binary: bool
+        Whether the client negotiated the msgpack subprotocol.
+    """
+
+    def __init__(
+        self,
+        delta: bool = False,
+        view: Optional[SubscriptionFilter] = None,
+        binary: bool = False,
+    ) -> None:
+        self.delta = delta
+        self.binary = binary
+        self.view = None
+        self.last: Optional[Frame] = None
+        self.subscribe(view)
+
+    def subscribe(self, view: Optional[SubscriptionFilter]) -> None:
+        """Change the subset of the state sent, starting with a new snapshot."""
+        self.view = view if view is not None and not view.is_empty else None
+        self.resync()
+
+    def resync(self) -> None:
+        """Send a full snapshot with the next frame."""
+        self.last = None
+
+    def resume(self, frame: Frame) -> None:
+        """Continue from a frame the client received before reconnecting."""
+        self.last = frame
+
+    def encode(self, frame: Frame) -> Optional[Union[str, bytes]]:
+        """The text (or bytes) to send for a frame, None if the client already has it."""
+        if not frame.is_state:
+            if "data" in frame.payload:
+                self.resync()
+            return frame.text(self.view, self.binary)
+
+        base, self.last = self.last, frame
+        if base is not None and frame.seq <= base.seq:
+            self.last = base
+            return None
+
+        if not self.delta or base is None:
+            return frame.text(self.view, self.binary)
+        return frame.delta_text(base, self.view, self.binary)
+
+
+def conflate(frames: List[Any]) -> List[Any]:
+    """Keep only the latest state frame of a batch, anything else in order.
+
+    Every state frame is a full cluster state, so the latest one holds the
+    latest state of each worker and node.
+    """
+    latest = None
+    for frame in frames:
+        if isinstance(frame, Frame) and frame.is_state:
+            latest = frame
+
+    return [
+        frame
+        for frame in frames
+        if not (isinstance(frame, Frame) and frame.is_state) or frame is latest
+    ]
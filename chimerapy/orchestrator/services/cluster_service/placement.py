@@ -0,0 +1,629 @@
+from abc import ABC, abstractmethod
+from heapq import heapify, heappop, heappush
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from chimerapy.engine import config as cpe_config
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    EdgeTraffic,
+    NodeDiagnostics,
+    PlacementPlan,
+    PlacementRequest,
+    TrafficReport,
+    WorkerCapacity,
+    WorkerPlacement,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    NodeNotFoundError,
+    Pipeline,
+)
+
+Traffic = Dict[Tuple[str, str], float]
+
+
+class PlacementError(Exception):
+    """Raised when the nodes of a pipeline cannot be placed on the workers."""
+
+
+class NodeDemand(NamedTuple):
+    """The estimated resources a node uses."""
+
+    id: str
+    cpu: float
+    memory: float
+
+
+class WorkerLoad:
+    """The estimated load of a worker while nodes are placed on it.
+
+    Parameters
+    ----------
+    id: str
+        The id of the worker.
+
+    capacity: WorkerCapacity
+        The resources available to the nodes placed on the worker.
+
+    cpu: float
+        The CPU usage of the worker before placing nodes on it.
+
+    memory: float
+        The memory usage of the worker before placing nodes on it.
+    """
+
+    __slots__ = ("id", "capacity", "cpu", "memory", "nodes")
+
+    def __init__(
+        self,
+        id: str,
+        capacity: WorkerCapacity,
+        cpu: float = 0.0,
+        memory: float = 0.0,
+    ) -> None:
+        self.id = id
+        self.capacity = capacity
+        self.cpu = cpu
+        self.memory = memory
+        self.nodes: List[str] = []
+
+    def fits(self, node: NodeDemand, count: int = 1) -> bool:
+        """Whether the node (or ``count`` nodes of its total demand) can be placed on the worker without exceeding its capacity."""
+        capacity = self.capacity
+        return (
+            (capacity.cpu is None or self.cpu + node.cpu <= capacity.cpu)
+            and (
+                capacity.memory is None
+                or self.memory + node.memory <= capacity.memory
+            )
+            and (
+                capacity.nodes is None
+                or len(self.nodes) + count <= capacity.nodes
+            )
+        )
+
+    def add(self, node: NodeDemand) -> None:
+        self.cpu += node.cpu
+        self.memory += node.memory
+        self.nodes.append(node.id)
+
+    def remove(self, node: NodeDemand) -> None:
+        self.cpu -= node.cpu
+        self.memory -= node.memory
+        self.nodes.remove(node.id)
+
+    def to_placement(self) -> WorkerPlacement:
+        return WorkerPlacement(
+            nodes=self.nodes, cpu=self.cpu, memory=self.memory
+        )
+
+
+class PlacementStrategy(ABC):
+    """Assigns nodes to workers, adding them to the loads of the workers."""
+
+    @abstractmethod
+    def place(
+        self,
+        nodes: List[NodeDemand],
+        workers: List[WorkerLoad],
+        traffic: Optional[Traffic] = None,
+    ) -> Dict[str, str]:
+        """The id of the worker of each node, by node id.
+
+        The ``traffic`` is the expected bytes per second of each edge
+        ``(source, sink)`` of the pipeline, the nodes already on the workers
+        included. Raises a PlacementError if a node doesn't fit on any worker.
+        """
+
+    @staticmethod
+    def _unplaceable(node: NodeDemand) -> PlacementError:
+        return PlacementError(
+            f"Node {node.id} (cpu={node.cpu}, memory={node.memory}) "
+            f"does not fit on any worker"
+        )
+
+    @staticmethod
+    def _by_demand(nodes: Iterable[NodeDemand]) -> List[NodeDemand]:
+        """The nodes, the most demanding first."""
+        return sorted(nodes, key=lambda node: (-node.cpu, -node.memory))
+
+
+class RoundRobinPlacement(PlacementStrategy):
+    """Assigns the nodes to the workers in turn, skipping the full workers."""
+
+    def place(
+        self,
+        nodes: List[NodeDemand],
+        workers: List[WorkerLoad],
+        traffic: Optional[Traffic] = None,
+    ) -> Dict[str, str]:
+        assignments = {}
+        turn = 0
+        for node in nodes:
+            for offset in range(len(workers)):
+                worker = workers[(turn + offset) % len(workers)]
+                if worker.fits(node):
+                    break
+            else:
+                raise self._unplaceable(node)
+
+            worker.add(node)
+            assignments[node.id] = worker.id
+            turn = (turn + offset + 1) % len(workers)
+        return assignments
+
+
+class LeastLoadedPlacement(PlacementStrategy):
+    """Assigns each node, the most demanding first, to the worker it fits on with the least CPU, then memory, usage."""
+
+    def place(
+        self,
+        nodes: List[NodeDemand],
+        workers: List[WorkerLoad],
+        traffic: Optional[Traffic] = None,
+    ) -> Dict[str, str]:
+        heap = [self._key(worker, i) for i, worker in enumerate(workers)]
+        heapify(heap)
+        assignments = {}
+        for node in self._by_demand(nodes):
+            full = []
+            while heap:
+                key = heappop(heap)
+                if workers[key[-1]].fits(node):
+                    break
+                full.append(key)
+            else:
+                raise self._unplaceable(node)
+
+            worker = workers[key[-1]]
+            worker.add(node)
+            assignments[node.id] = worker.id
+            heappush(heap, self._key(worker, key[-1]))
+            for key in full:
+                heappush(heap, key)
+        return assignments
+
+    @staticmethod
+    def _key(worker: WorkerLoad, index: int) -> Tuple[float, float, int, int]:
+        return worker.cpu, worker.memory, len(worker.nodes), index
+
+
+class BinPackingPlacement(PlacementStrategy):
+    """Assigns each node, the most demanding first, to the first worker it fits on (first fit decreasing).
+
+    The nodes are packed on as few workers as their capacities allow.
+    """
+
+    def place(
+        self,
+        nodes: List[NodeDemand],
+        workers: List[WorkerLoad],
+        traffic: Optional[Traffic] = None,
+    ) -> Dict[str, str]:
+        assignments = {}
+        for node in self._by_demand(nodes):
+            worker = next((w for w in workers if w.fits(node)), None)
+            if worker is None:
+                raise self._unplaceable(node)
+
+            worker.add(node)
+            assignments[node.id] = worker.id
+        return assignments
+
+
+class MinCutPlacement(PlacementStrategy):
+    """Places the nodes exchanging the most data on the same worker, minimizing the traffic between workers.
+
+    A min-cut heuristic in two phases, as in multilevel graph partitioning:
+    the ends of the busiest edges are merged into groups while a group fits
+    on a worker, and each group, the most demanding first, goes to the worker
+    it exchanges the most traffic with (the least loaded one on ties), its
+    nodes being placed one by one if it fits nowhere. The nodes are then moved
+    to the worker they exchange the most traffic with while it reduces the
+    traffic between workers and the worker has room.
+
+    Besides the capacities, the CPU usage of a worker is kept within
+    ``imbalance`` times the mean usage of the workers, so that the nodes don't
+    all end up on one worker when the capacities are unlimited.
+
+    Parameters
+    ----------
+    imbalance: float
+        The maximum CPU usage of a worker, relative to the mean.
+
+    passes: int
+        The maximum number of passes moving the nodes between workers.
+    """
+
+    def __init__(self, imbalance: float = 1.25, passes: int = 10) -> None:
+        self.imbalance = imbalance
+        self.passes = passes
+
+    def place(
+        self,
+        nodes: List[NodeDemand],
+        workers: List[WorkerLoad],
+        traffic: Optional[Traffic] = None,
+    ) -> Dict[str, str]:
+        traffic = traffic or {}
+        demands = {node.id: node for node in nodes}
+        located = {
+            node_id: worker for worker in workers for node_id in worker.nodes
+        }
+        neighbours = self._neighbours(traffic, demands, located)
+        total = sum(w.cpu for w in workers) + sum(n.cpu for n in nodes)
+        limit = self.imbalance * total / len(workers)
+
+        for group in self._groups(demands, traffic, limit):
+            self._place_group(group, workers, located, neighbours, limit)
+        self._refine(demands, workers, located, neighbours, limit)
+        return {node_id: located[node_id].id for node_id in demands}
+
+    @staticmethod
+    def _neighbours(
+        traffic: Traffic,
+        demands: Dict[str, NodeDemand],
+        located: Dict[str, WorkerLoad],
+    ) -> Dict[str, Dict[str, float]]:
+        """The traffic between each node to place and its neighbours, in both directions."""
+        neighbours: Dict[str, Dict[str, float]] = {}
+        for (source, sink), rate in traffic.items():
+            for node_id, other in ((source, sink), (sink, source)):
+                if node_id in demands and (
+                    other in demands or other in located
+                ):
+                    rates = neighbours.setdefault(node_id, {})
+                    rates[other] = rates.get(other, 0.0) + rate
+        return neighbours
+
+    @staticmethod
+    def _groups(
+        demands: Dict[str, NodeDemand], traffic: Traffic, limit: float
+    ) -> List[List[NodeDemand]]:
+        """The nodes merged along the busiest edges, the most demanding groups first."""
+        parent = {node_id: node_id for node_id in demands}
+        members = {node_id: [node] for node_id, node in demands.items()}
+        cpu = {node_id: node.cpu for node_id, node in demands.items()}
+
+        def find(node_id: str) -> str:
+            while parent[node_id] != node_id:
+                parent[node_id] = parent[parent[node_id]]
+                node_id = parent[node_id]
+            return node_id
+
+        edges = sorted(
+            (
+                (edge, rate)
+                for edge, rate in traffic.items()
+                if rate > 0 and edge[0] in demands and edge[1] in demands
+            ),
+            key=lambda item: -item[1],
+        )
+        for (source, sink), _ in edges:
+            a, b = find(source), find(sink)
+            if a == b or cpu[a] + cpu[b] > limit:
+                continue
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            parent[b] = a
+            cpu[a] += cpu.pop(b)
+            members[a].extend(members.pop(b))
+
+        return sorted(
+            members.values(), key=lambda group: -sum(n.cpu for n in group)
+        )
+
+    @staticmethod
+    def _affinity(
+        node_ids: Collection[str],
+        neighbours: Dict[str, Dict[str, float]],
+        located: Dict[str, WorkerLoad],
+    ) -> Dict[str, float]:
+        """The traffic between the nodes and each worker, by worker id."""
+        affinity: Dict[str, float] = {}
+        for node_id in node_ids:
+            for other, rate in neighbours.get(node_id, {}).items():
+                worker = located.get(other)
+                if worker is not None and other not in node_ids:
+                    affinity[worker.id] = affinity.get(worker.id, 0.0) + rate
+        return affinity
+
+    def _place_group(
+        self,
+        group: List[NodeDemand],
+        workers: List[WorkerLoad],
+        located: Dict[str, WorkerLoad],
+        neighbours: Dict[str, Dict[str, float]],
+        limit: float,
+    ) -> None:
+        ids = {node.id for node in group}
+        total = NodeDemand(
+            "", sum(n.cpu for n in group), sum(n.memory for n in group)
+        )
+        candidates = [
+            worker
+            for worker in workers
+            if worker.fits(total, len(group))
+            and worker.cpu + total.cpu <= limit
+        ]
+        if not candidates:
+            for node in group:
+                self._place_node(node, workers, located, neighbours, limit)
+            return
+
+        affinity = self._affinity(ids, neighbours, located)
+        worker = max(candidates, key=lambda w: (affinity.get(w.id, 0), -w.cpu))
+        for node in group:
+            worker.add(node)
+            located[node.id] = worker
+
+    def _place_node(
+        self,
+        node: NodeDemand,
+        workers: List[WorkerLoad],
+        located: Dict[str, WorkerLoad],
+        neighbours: Dict[str, Dict[str, float]],
+        limit: float,
+    ) -> None:
+        candidates = [worker for worker in workers if worker.fits(node)]
+        if not candidates:
+            raise self._unplaceable(node)
+
+        candidates = [
+            worker for worker in candidates if worker.cpu + node.cpu <= limit
+        ] or candidates
+        affinity = self._affinity({node.id}, neighbours, located)
+        worker = max(candidates, key=lambda w: (affinity.get(w.id, 0), -w.cpu))
+        worker.add(node)
+        located[node.id] = worker
+
+    def _refine(
+        self,
+        demands: Dict[str, NodeDemand],
+        workers: List[WorkerLoad],
+        located: Dict[str, WorkerLoad],
+        neighbours: Dict[str, Dict[str, float]],
+        limit: float,
+    ) -> None:
+        by_id = {worker.id: worker for worker in workers}
+        for _ in range(self.passes):
+            moved = False
+            for node_id, node in demands.items():
+                current = located[node_id]
+                affinity = self._affinity({node_id}, neighbours, located)
+                gain = affinity.get(current.id, 0.0)
+                for worker_id in sorted(affinity, key=lambda w: -affinity[w]):
+                    if affinity[worker_id] <= gain:
+                        break
+                    target = by_id[worker_id]
+                    if target.fits(node) and target.cpu + node.cpu <= limit:
+                        current.remove(node)
+                        target.add(node)
+                        located[node_id] = target
+                        moved = True
+                        break
+            if not moved:
+                return
+
+
+STRATEGIES: Dict[str, Type[PlacementStrategy]] = {
+    "round-robin": RoundRobinPlacement,
+    "least-loaded": LeastLoadedPlacement,
+    "bin-packing": BinPackingPlacement,
+    "min-cut": MinCutPlacement,
+}
+
+
+class PlacementEngine:
+    """Plans the placement of the nodes of a pipeline on the connected workers.
+
+    The demand of a node is estimated from the latest diagnostics of the node
+    instantiated with the same name in the cluster (e.g. in a previous run of
+    the pipeline). The nodes without diagnostics are assumed to use as much
+    as the mean of the others, or ``default_cpu`` if none has any. The nodes
+    of the cluster that aren't in the pipeline make up the initial load of
+    their workers.
+
+    Each edge of a node is expected to carry the bytes per second the node
+    outputs: the payload size in its diagnostics over the diagnostics
+    interval or, without diagnostics, the throughput declared when its class
+    was registered.
+
+    Parameters
+    ----------
+    strategies: Optional[Dict[str, Type[PlacementStrategy]]]
+        Additional placement strategies, by name.
+
+    default_cpu: float
+        The CPU usage of a node when no node has diagnostics.
+
+    diagnostics_interval: Optional[float]
+        The interval (in seconds) covered by the diagnostics of a node, the
+        ``diagnostics.interval`` of the engine configuration if None.
+    """
+
+    def __init__(
+        self,
+        strategies: Optional[Dict[str, Type[PlacementStrategy]]] = None,
+        default_cpu: float = 1.0,
+        diagnostics_interval: Optional[float] = None,
+    ) -> None:
+        self.strategies = {**STRATEGIES, **(strategies or {})}
+        self.default_cpu = default_cpu
+        self.diagnostics_interval = diagnostics_interval or float(
+            cpe_config.get("diagnostics.interval")
+        )
+
+    def plan(
+        self, pipeline: Pipeline, state: ClusterState, request: PlacementRequest
+    ) -> PlacementPlan:
+        """The placement of the nodes of ``pipeline``, as requested."""
+        if request.strategy not in self.strategies:
+            raise PlacementError(
+                f"Unknown placement strategy {request.strategy}"
+            )
+        if not state.workers:
+            raise PlacementError("No connected workers to place the nodes on")
+
+        names = self._names(pipeline)
+        diagnostics = self._diagnostics(state)
+        demands = self._demands(names, diagnostics)
+        traffic = self.traffic(pipeline, state)
+        workers = self._workers(set(names.values()), state, request)
+        pins = self._pins(pipeline, state, request)
+
+        by_id = {worker.id: worker for worker in workers}
+        for node_id, worker_id in pins.items():
+            by_id[worker_id].add(demands[node_id])
+
+        assignments = self.strategies[request.strategy]().place(
+            [demand for demand in demands.values() if demand.id not in pins],
+            workers,
+            traffic,
+        )
+        assignments = {**pins, **assignments}
+        return PlacementPlan(
+            strategy=request.strategy,
+            assignments=assignments,
+            workers={worker.id: worker.to_placement() for worker in workers},
+            cross_worker_traffic=sum(
+                rate
+                for (source, sink), rate in traffic.items()
+                if assignments[source] != assignments[sink]
+            ),
+        )
+
+    def traffic(self, pipeline: Pipeline, state: ClusterState) -> Traffic:
+        """The expected bytes per second of each edge of the pipeline."""
+        diagnostics = self._diagnostics(state)
+        rates = {}
+        for node_id, name in self._names(pipeline).items():
+            node_diagnostics = diagnostics.get(name)
+            if node_diagnostics is not None and node_diagnostics.num_of_steps:
+                rates[node_id] = (
+                    node_diagnostics.payload_size
+                    * 1024
+                    / self.diagnostics_interval
+                )
+            else:
+                throughput = pipeline.nodes[node_id]["wrapped_node"].throughput
+                rates[node_id] = throughput or 0.0
+        return {
+            (source, sink): rates[source] for source, sink in pipeline.edges
+        }
+
+    def report(self, pipeline: Pipeline, state: ClusterState) -> TrafficReport:
+        """The expected traffic of the pipeline, with the current worker assignments.
+
+        The edges with an unassigned end count as crossing workers.
+        """
+        workers = {
+            node_id: wrapped_node.worker_id
+            for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+        }
+        traffic = self.traffic(pipeline, state)
+        crossing = sorted(
+            (
+                EdgeTraffic(source=source, sink=sink, traffic=rate)
+                for (source, sink), rate in traffic.items()
+                if workers[source] is None or workers[source] != workers[sink]
+            ),
+            key=lambda edge: -edge.traffic,
+        )
+        return TrafficReport(
+            total=sum(traffic.values()),
+            cross_worker=sum(edge.traffic for edge in crossing),
+            cross_worker_edges=crossing,
+        )
+
+    @staticmethod
+    def _names(pipeline: Pipeline) -> Dict[str, str]:
+        """The names the nodes of the pipeline are instantiated with, by id."""
+        return {
+            node_id: wrapped_node.instance_kwargs()["name"]
+            for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+        }
+
+    @staticmethod
+    def _diagnostics(state: ClusterState) -> Dict[str, NodeDiagnostics]:
+        """The diagnostics of the nodes of the cluster, by name."""
+        return {
+            node.name: node.diagnostics
+            for worker in state.workers.values()
+            for node in worker.nodes.values()
+        }
+
+    def _demands(
+        self, names: Dict[str, str], diagnostics: Dict[str, NodeDiagnostics]
+    ) -> Dict[str, NodeDemand]:
+        """The estimated demand of each node of the pipeline, by id."""
+        known = [
+            diagnostics[name] for name in names.values() if name in diagnostics
+        ]
+        default_cpu, default_memory = self.default_cpu, 0.0
+        if known:
+            default_cpu = sum(d.cpu_usage for d in known) / len(known)
+            default_memory = sum(d.memory_usage for d in known) / len(known)
+
+        demands = {}
+        for node_id, name in names.items():
+            if name in diagnostics:
+                cpu = diagnostics[name].cpu_usage
+                memory = diagnostics[name].memory_usage
+            else:
+                cpu, memory = default_cpu, default_memory
+            demands[node_id] = NodeDemand(node_id, cpu, memory)
+        return demands
+
+    @staticmethod
+    def _workers(
+        names: set, state: ClusterState, request: PlacementRequest
+    ) -> List[WorkerLoad]:
+        """The connected workers, loaded with the nodes not in the pipeline."""
+        workers = []
+        for worker_id in sorted(state.workers):
+            others = [
+                node.diagnostics
+                for node in state.workers[worker_id].nodes.values()
+                if node.name not in names
+            ]
+            workers.append(
+                WorkerLoad(
+                    worker_id,
+                    request.capacities.get(worker_id, request.default_capacity),
+                    cpu=sum(d.cpu_usage for d in others),
+                    memory=sum(d.memory_usage for d in others),
+                )
+            )
+        return workers
+
+    @staticmethod
+    def _pins(
+        pipeline: Pipeline, state: ClusterState, request: PlacementRequest
+    ) -> Dict[str, str]:
+        """The workers of the pinned nodes, by node id."""
+        pins = {}
+        if request.keep_assigned:
+            pins = {
+                node_id: wrapped_node.worker_id
+                for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+                if wrapped_node.worker_id in state.workers
+            }
+
+        for node_id, worker_id in request.pins.items():
+            if node_id not in pipeline.nodes:
+                raise NodeNotFoundError(node_id)
+            if worker_id not in state.workers:
+                raise PlacementError(
+                    f"Node {node_id} is pinned to {worker_id}, which is not connected"
+                )
+            pins[node_id] = worker_id
+        return pins
@@ -1,54 +1,282 @@
 import asyncio
 import json
-from typing import Any, Dict, Optional, Set
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
 
 from websockets import connect
-from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
+from websockets.exceptions import (
+    ConnectionClosedError,
+    ConnectionClosedOK,
+    WebSocketException,
+)
 
 from chimerapy.engine.networking.enums import GENERAL_MESSAGE, MANAGER_MESSAGE
 from chimerapy.orchestrator.models.cluster_models import (
     UpdateMessage,
     UpdateMessageType,
 )
+from chimerapy.orchestrator.services.cluster_service.frames import Frame
 from chimerapy.orchestrator.utils import uuid
 
 
+class OverflowPolicy(str, Enum):
+    """What to do when a client queue is full."""
+
+    DROP_OLDEST = "drop-oldest"
+    DROP_NEWEST = "drop-newest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class ClientStats:
+    """Delivery statistics for a single client queue."""
+
+    __slots__ = ("id", "delivered", "dropped", "emitted", "conflated")
+
+    def __init__(self) -> None:
+        self.id = uuid()
+        self.delivered = 0
+        self.dropped = 0
+        self.emitted = 0
+        self.conflated = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "emitted": self.emitted,
+            "conflated": self.conflated,
+        }
+
+
+class ConnectionHealth:
+    """Health of the connection to the manager's websocket."""
+
+    __slots__ = (
+        "connected",
+        "connects",
+        "disconnects",
+        "reconnect_attempts",
+        "last_connected_at",
+        "last_disconnected_at",
+        "last_error",
+    )
+
+    def __init__(self) -> None:
+        self.connected = False
+        self.connects = 0
+        self.disconnects = 0
+        self.reconnect_attempts = 0
+        self.last_connected_at: Optional[float] = None
+        self.last_disconnected_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
 class UpdatesBroadcaster:
     """An asyncio.Queue based updates broadcaster.
 
+    Client queues are bounded by ``max_queue_size`` irrespective of their own
+    ``maxsize``, so that a client that stops reading can't grow the memory of
+    the process. What happens to an update for a full queue is decided by the
+    ``overflow_policy``.
+
     Parameters
     ----------
     sentinel: str
         The sentinel to be used to stop the broadcaster.
+
+    max_queue_size: int
+        The maximum number of pending updates per client, 0 for unbounded.
+
+    overflow_policy: OverflowPolicy
+        The policy to apply when a client queue is full. Coalescing by
+        default, as everywhere else: the updates are states, so a lagging
+        client only needs the latest one.
+
+    history_size: int
+        The number of numbered frames kept for clients resuming the stream.
     """
 
-    def __init__(self, sentinel: str = "SHUTDOWN"):
+    def __init__(
+        self,
+        sentinel: str = "SHUTDOWN",
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        history_size: int = 128,
+    ):
         self._sentinel = sentinel
-        self._clients: Set[asyncio.Queue] = set()
+        self._clients: Dict[asyncio.Queue, ClientStats] = {}
         self.update_queue: Optional[asyncio.Queue] = None
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.received = 0
+        self.seq = 0
+        self.latest: Optional[Frame] = None
+        self.history: Deque[Frame] = deque(maxlen=history_size)
 
     async def initialize(self) -> None:
         """Initialize the broadcaster."""
         self.update_queue = asyncio.Queue()
 
-    async def add_client(self, q: asyncio.Queue) -> None:
-        """Add a client queue to the broadcaster."""
-        self._clients.add(q)
+    async def add_client(
+        self,
+        q: asyncio.Queue,
+        last_seq: Optional[int] = None,
+        snapshot: Optional[Frame] = None,
+    ) -> ClientStats:
+        """Add a client queue to the broadcaster.
+
+        Parameters
+        ----------
+        q: asyncio.Queue
+            The client queue.
+
+        last_seq: Optional[int]
+            The sequence number of the last frame a reconnecting client got.
+            The frames it missed are replayed, if they are still in the history.
+
+        snapshot: Optional[Frame]
+            The current state, sent to the client alone if it doesn't resume.
+        """
+        missed = self.missed_since(last_seq) if last_seq is not None else None
+        if missed is None and snapshot is not None:
+            missed = [snapshot]
+        for frame in missed or []:
+            q.put_nowait(frame)
+
+        stats = self._clients[q] = ClientStats()
+        return stats
+
+    def missed_since(self, last_seq: int) -> Optional[List[Frame]]:
+        """The frames after ``last_seq``, None if some aren't in the history anymore.
+
+        Frames still waiting to be broadcast aren't included, as the client
+        gets them from the broadcast.
+        """
+        broadcast = self.latest.seq if self.latest is not None else 0
+        if last_seq > self.seq:  # From before a restart
+            return None
+        if last_seq >= broadcast:
+            return []
+        if not self.history or self.history[0].seq > last_seq + 1:
+            return None
+        return [frame for frame in self.history if frame.seq > last_seq]
+
+    def get_frame(self, seq: int) -> Optional[Frame]:
+        """The numbered frame ``seq``, if it is still in the history."""
+        if self.history and self.history[0].seq <= seq:
+            for frame in reversed(self.history):
+                if frame.seq == seq:
+                    return frame
+        return None
+
+    def snapshot(self, payload: Dict[str, Any]) -> Frame:
+        """A frame with the current state, numbered as the latest frame."""
+        if payload.get("data") is None:
+            return Frame(payload)
+        return Frame(payload, seq=self.seq)
 
     async def remove_client(self, q: asyncio.Queue) -> None:
         """Remove a client queue from the broadcaster."""
-        self._clients.remove(q)
+        self._clients.pop(q, None)
 
-    async def put_update(self, msg: Dict[str, Any]) -> None:
+    async def put_update(self, msg: Union[Dict[str, Any], Frame]) -> None:
         """Put an update to the broadcaster."""
         if self.update_queue is None:
             await self.initialize()
+        if not isinstance(msg, Frame):
+            msg = Frame(msg)
+        if msg.seq is None and msg.payload.get("data") is not None:
+            self.seq += 1
+            msg.seq = self.seq
         await self.update_queue.put(msg)
 
+    def send(self, q: asyncio.Queue, msg: Frame) -> None:
+        """Send a message to a single client queue, applying the overflow policy.
+
+        Ignored if the queue isn't (or isn't anymore) a client.
+        """
+        if q in self._clients:
+            self._deliver(q, msg)
+
     def enqueue_sentinel(self) -> None:
         """Enqueue the sentinel message to stop the broadcaster."""
         self.update_queue.put_nowait(self._sentinel)
 
+    def dropped(self, q: asyncio.Queue) -> int:
+        """The number of updates dropped for a client queue."""
+        stats = self._clients.get(q)
+        return stats.dropped if stats is not None else 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Delivery metrics for this broadcaster and its clients."""
+        clients: List[Dict[str, Any]] = []
+        for q, stats in self._clients.items():
+            client = stats.to_dict()
+            client["pending"] = q.qsize()
+            clients.append(client)
+
+        return {
+            "received": self.received,
+            "emitted": sum(stats.emitted for stats in self._clients.values()),
+            "seq": self.seq,
+            "history": len(self.history),
+            "max_queue_size": self.max_queue_size,
+            "overflow_policy": self.overflow_policy.value,
+            "clients": clients,
+        }
+
+    def _is_full(self, q: asyncio.Queue) -> bool:
+        return q.full() or (
+            self.max_queue_size > 0 and q.qsize() >= self.max_queue_size
+        )
+
+    @staticmethod
+    def _drain(q: asyncio.Queue) -> int:
+        drained = 0
+        while not q.empty():
+            q.get_nowait()
+            drained += 1
+        return drained
+
+    def _deliver(self, q: asyncio.Queue, msg: Any) -> None:
+        """Deliver a message to a client queue, applying the overflow policy."""
+        stats = self._clients[q]
+        if not self._is_full(q):
+            q.put_nowait(msg)
+            stats.delivered += 1
+            return
+
+        if msg == self._sentinel:  # The sentinel is never dropped
+            q.get_nowait()
+            stats.dropped += 1
+            q.put_nowait(msg)
+            return
+
+        policy = self.overflow_policy
+        if policy is OverflowPolicy.DROP_NEWEST:
+            stats.dropped += 1
+        elif policy is OverflowPolicy.DROP_OLDEST:
+            q.get_nowait()
+            stats.dropped += 1
+            q.put_nowait(msg)
+            stats.delivered += 1
+        elif policy is OverflowPolicy.COALESCE:
+            stats.dropped += self._drain(q)
+            q.put_nowait(msg)
+            stats.delivered += 1
+        elif policy is OverflowPolicy.DISCONNECT:
+            stats.dropped += self._drain(q) + 1
+            q.put_nowait(None)  # Relays stop on None
+            self._clients.pop(q)
+
     async def start_broadcast(self) -> None:
         """Start the updates broadcaster"""
         if self.update_queue is None:
@@ -56,8 +284,12 @@ class UpdatesBroadcaster:
 
         while True:
             msg = await self.update_queue.get()
-            for q in self._clients:
-                q.put_nowait(msg)
+            self.received += 1
+            if isinstance(msg, Frame) and msg.is_state:
+                self.latest = msg
+                self.history.append(msg)
+            for q in list(self._clients):
+                self._deliver(q, msg)
             if msg == self._sentinel:
                 break
 
@@ -73,15 +305,56 @@ class ClusterUpdatesBroadCaster:
     port : int
         The port of the cluster manager.
 
+    max_queue_size : int
+        The maximum number of pending updates per client, 0 for unbounded.
+
+    overflow_policy : OverflowPolicy
+        The policy to apply when a client queue is full.
+
+    state_provider : Optional[Callable[[], Dict[str, Any]]]
+        Returns the current manager state dict, sent to the clients after a
+        reconnection to resync them with the updates missed in between.
+
+    reconnect_attempts : int
+        The number of consecutive failed attempts to reconnect to the manager
+        before giving up, 0 to keep trying.
+
+    reconnect_delay : float
+        The initial delay (in seconds) before reconnecting. It doubles after each
+        failed attempt, up to ``max_reconnect_delay``, and is jittered.
+
+    max_reconnect_delay : float
+        The maximum delay (in seconds) before reconnecting.
+
+    history_size : int
+        The number of network updates kept for clients resuming the stream.
     """
 
     _sentinel = "SHUTDOWN"
 
-    def __init__(self, host: str, port: int):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        state_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+        reconnect_attempts: int = 0,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        history_size: int = 128,
+    ):
         self.host = host
         self.port = port
         self.manager_update_socket = None
-        self.updater = UpdatesBroadcaster(self._sentinel)
+        self.state_provider = state_provider
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.health = ConnectionHealth()
+        self.updater = UpdatesBroadcaster(
+            self._sentinel, max_queue_size, overflow_policy, history_size
+        )
         self.updater_loop_task = None
         self.zeroconf_enabled = False
 
@@ -91,12 +364,7 @@ class ClusterUpdatesBroadCaster:
 
     async def initialize(self) -> None:
         """Initialize the update broadcaster."""
-        self.manager_update_socket = await connect(
-            f"ws://{self.host}:{self.port}/ws"
-        )
-        await self.manager_update_socket.send(
-            json.dumps(self.connect_payload(str(id(self))))
-        )
+        await self._connect()
 
         await self.updater.initialize()
         self.updater_loop_task = asyncio.create_task(
@@ -104,55 +372,130 @@ class ClusterUpdatesBroadCaster:
         )
 
     async def add_client(
-        self, q: asyncio.Queue, message: UpdateMessage = None
-    ) -> None:
-        """Add a client queue to the broadcaster."""
-        await self.updater.add_client(q)
+        self,
+        q: asyncio.Queue,
+        message: UpdateMessage = None,
+        last_seq: Optional[int] = None,
+    ) -> ClientStats:
+        """Add a client queue to the broadcaster.
+
+        A client resuming from ``last_seq`` gets the updates it missed, others
+        get the current state ``message`` (if any).
+        """
+        return await self.updater.add_client(
+            q,
+            last_seq,
+            self.updater.snapshot(message.to_payload())
+            if message is not None
+            else None,
+        )
 
-        if message is not None:
-            await q.put(message.model_dump(mode="json"))
+    @property
+    def latest(self) -> Optional[Frame]:
+        """The latest numbered network update broadcast, if any."""
+        return self.updater.latest
 
     async def remove_client(self, q: asyncio.Queue) -> None:
         """Remove a client queue from the broadcaster."""
         await self.updater.remove_client(q)
 
+    def send(self, q: asyncio.Queue, msg: Frame) -> None:
+        """Send a message to a single client queue, applying the overflow policy."""
+        self.updater.send(q, msg)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Delivery metrics for the connected clients and the manager connection."""
+        return {**self.updater.metrics(), "connection": self.health.to_dict()}
+
     async def enqueue_sentinel(self) -> None:
         """Enqueue a sentinel value to all client queues."""
         self.updater.enqueue_sentinel()
 
     async def broadcast_updates(self) -> None:
-        """Broadcast updates to all clients."""
+        """Broadcast updates to all clients, reconnecting to the manager if needed."""
         while True:
             try:
-                msg = await self.manager_update_socket.recv()
-                msg = json.loads(msg)
-                if self.is_cluster_update_message(msg):
-                    msg = UpdateMessage.from_updates_dict(
-                        msg,
-                        UpdateMessageType.NETWORK_UPDATE,
-                        self.zeroconf_enabled,
-                    )
-                elif self.is_cluster_shutdown_message(msg):
-                    msg = UpdateMessage.from_updates_dict(
-                        msg, UpdateMessageType.SHUTDOWN, self.zeroconf_enabled
-                    )
-                else:
-                    msg = None
-                if msg is not None:
-                    msg_dict = msg.model_dump(mode="json")
-                    await self.updater.put_update(msg_dict)
-                if msg and msg.signal is UpdateMessageType.SHUTDOWN:
-                    break
-            except ConnectionClosedOK:
+                await self._relay_manager_updates()
                 break
-            except ConnectionClosedError:
-                await self.enqueue_error()
+            except ConnectionClosedOK:
                 break
+            except ConnectionClosedError as e:
+                self._disconnected(e)
+                if not await self._reconnect():
+                    await self.enqueue_error()
+                    break
 
         await self.enqueue_sentinel()
 
         if self.updater_loop_task is not None:
-            self.updater_loop_task.cancel()
+            # The loop stops at the sentinel, once the pending updates are out
+            await self.updater_loop_task
+
+    async def _relay_manager_updates(self) -> None:
+        """Relay the updates of the manager until it shuts down."""
+        while True:
+            msg = await self.manager_update_socket.recv()
+            msg = json.loads(msg)
+            if self.is_cluster_update_message(msg):
+                msg = UpdateMessage.from_updates_dict(
+                    msg,
+                    UpdateMessageType.NETWORK_UPDATE,
+                    self.zeroconf_enabled,
+                )
+            elif self.is_cluster_shutdown_message(msg):
+                msg = UpdateMessage.from_updates_dict(
+                    msg, UpdateMessageType.SHUTDOWN, self.zeroconf_enabled
+                )
+            else:
+                msg = None
+            if msg is not None:
+                await self.updater.put_update(self._to_frame(msg))
+            if msg and msg.signal is UpdateMessageType.SHUTDOWN:
+                return
+
+    async def _connect(self) -> None:
+        """Connect to the manager's websocket and register as a client."""
+        self.manager_update_socket = await connect(
+            f"ws://{self.host}:{self.port}/ws"
+        )
+        await self.manager_update_socket.send(
+            json.dumps(self.connect_payload(str(id(self))))
+        )
+        self.health.connected = True
+        self.health.connects += 1
+        self.health.last_connected_at = time.time()
+
+    def _disconnected(self, error: Exception) -> None:
+        self.health.connected = False
+        self.health.disconnects += 1
+        self.health.last_disconnected_at = time.time()
+        self.health.last_error = repr(error)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """The (full jitter) exponential backoff delay before a reconnection attempt."""
+        return random.uniform(
+            0,
+            min(self.max_reconnect_delay, self.reconnect_delay * 2**attempt),
+        )
+
+    async def _reconnect(self) -> bool:
+        """Reconnect to the manager, then resync the clients with its current state."""
+        attempt = 0
+        while not self.reconnect_attempts or attempt < self.reconnect_attempts:
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
+            self.health.reconnect_attempts += 1
+            try:
+                await self._connect()
+            except (OSError, WebSocketException) as e:
+                self.health.last_error = repr(e)
+                continue
+
+            if self.state_provider is not None:
+                await self.put_update({"data": self.state_provider()})
+            return True
+
+        return False
 
     async def enqueue_error(self) -> None:
         """Enqueue an error message to all client queues."""
@@ -165,7 +508,11 @@ class ClusterUpdatesBroadCaster:
             UpdateMessageType.NETWORK_UPDATE,
             self.zeroconf_enabled,
         )
-        await self.updater.put_update(update_msg.model_dump(mode="json"))
+        await self.updater.put_update(self._to_frame(update_msg))
+
+    def _to_frame(self, msg: UpdateMessage) -> Frame:
+        """Encode an update message, numbered by the broadcaster if it carries a cluster state."""
+        return Frame(msg.to_payload())
 
     @staticmethod
     def is_cluster_update_message(msg: Dict[str, Any]) -> bool:
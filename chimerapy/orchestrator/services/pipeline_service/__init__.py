@@ -1,2 +1,3 @@
+from .compact_pipeline import CompactPipeline
 from .pipeline import Pipeline
 from .pipelines import Pipelines
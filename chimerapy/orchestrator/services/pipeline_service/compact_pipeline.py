@@ -0,0 +1,323 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Type
+
+import networkx as nx
+
+import chimerapy.engine as cpe
+from chimerapy.orchestrator.models.pipeline_models import WrappedNode
+from chimerapy.orchestrator.models.registry_models import NodeType
+from chimerapy.orchestrator.registry import get_registered_node
+from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+from chimerapy.orchestrator.services.pipeline_service.topological_order import (
+    TopologicalOrder,
+)
+from chimerapy.orchestrator.utils import uuid
+
+
+class NodeRecord:
+    """A node of a CompactPipeline, with the attributes and methods of a WrappedNode.
+
+    The node class, type, registry name and package are read from the
+    registered node the record was cloned from, shared by all its clones.
+    """
+
+    __slots__ = (
+        "id",
+        "template",
+        "name",
+        "kwargs",
+        "worker_id",
+        "throughput",
+        "instance",
+    )
+
+    def __init__(
+        self,
+        template: WrappedNode,
+        id: Optional[str] = None,
+        name: Optional[str] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        worker_id: Optional[str] = None,
+        throughput: Optional[float] = None,
+    ) -> None:
+        self.template = template
+        self.id = id or uuid()
+        self.name = name
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.worker_id = worker_id
+        self.throughput = throughput
+        self.instance: Optional[cpe.Node] = None
+
+    @classmethod
+    def from_template(cls, template: WrappedNode, **kwargs) -> "NodeRecord":
+        """A new record of a registered node, as ``WrappedNode.clone``."""
+        return cls(
+            template,
+            name=template.name,
+            kwargs=kwargs or template.kwargs,
+            worker_id=template.worker_id,
+            throughput=template.throughput,
+        )
+
+    @classmethod
+    def from_wrapped_node(cls, wrapped_node: WrappedNode) -> "NodeRecord":
+        """The equivalent record of a WrappedNode, with its id and instance."""
+        record = cls(
+            get_registered_node(
+                wrapped_node.registry_name, package=wrapped_node.package
+            ),
+            id=wrapped_node.id,
+            name=wrapped_node.name,
+            kwargs=wrapped_node.kwargs,
+            worker_id=wrapped_node.worker_id,
+            throughput=wrapped_node.throughput,
+        )
+        record.instance = wrapped_node.instance
+        return record
+
+    @property
+    def NodeClass(self) -> Type[cpe.Node]:
+        return self.template.NodeClass
+
+    @property
+    def node_type(self) -> Optional[NodeType]:
+        return self.template.node_type
+
+    @property
+    def registry_name(self) -> str:
+        return self.template.registry_name
+
+    @property
+    def package(self) -> Optional[str]:
+        return self.template.package
+
+    @property
+    def instantiated(self) -> bool:
+        return self.instance is not None
+
+    # The WrappedNode methods only use the attributes above
+    instance_kwargs = WrappedNode.instance_kwargs
+    instantiate = WrappedNode.instantiate
+    to_web_node = WrappedNode.to_web_node
+
+    def clone(self, **kwargs) -> "NodeRecord":
+        """A new record of the same node, as ``WrappedNode.clone``."""
+        return NodeRecord(
+            self.template,
+            name=self.name,
+            kwargs=kwargs or self.kwargs,
+            worker_id=self.worker_id,
+            throughput=self.throughput,
+        )
+
+    def to_wrapped_node(self) -> WrappedNode:
+        """The equivalent WrappedNode, with the record's id and instance."""
+        return WrappedNode(
+            id=self.id,
+            name=self.name,
+            NodeClass=self.NodeClass,
+            node_type=self.node_type,
+            registry_name=self.registry_name,
+            kwargs=self.kwargs,
+            package=self.package,
+            worker_id=self.worker_id,
+            throughput=self.throughput,
+            instance=self.instance,
+        )
+
+    def __repr__(self) -> str:
+        return f"<NodeRecord: {self.NodeClass.__name__}>"
+
+
+class _SlotsMapping(MutableMapping):
+    """A mapping whose only keys are the ``__slots__`` of its class."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(
+                f"{type(self).__name__} can only hold {', '.join(self.__slots__)}"
+            )
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self.__slots__ or not hasattr(self, key):
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class NodeData(_SlotsMapping):
+    """The attributes of a node of a CompactPipeline: its wrapped node only."""
+
+    __slots__ = ("wrapped_node",)
+
+
+class EdgeData(_SlotsMapping):
+    """The attributes of an edge of a CompactPipeline: its id only."""
+
+    __slots__ = ("id",)
+
+
+class InternedDict(dict):
+    """A dict interning its string keys, so that each node id is stored once.
+
+    The ids of the nodes an edge joins are otherwise kept as the strings the
+    edge was added with, a copy each when they come from a JSON document.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if isinstance(key, str):
+            key = sys.intern(str(key))
+        super().__setitem__(key, value)
+
+
+class CSRGraph(NamedTuple):
+    """The adjacency of a pipeline as compressed sparse row arrays.
+
+    The nodes are numbered in the order of the pipeline, the successors of
+    node ``i`` being ``targets[offsets[i]:offsets[i + 1]]``.
+    """
+
+    nodes: List[str]
+    offsets: array
+    targets: array
+
+    def successors(self, index: int) -> array:
+        """The indices of the successors of the node at ``index``."""
+        return self.targets[self.offsets[index] : self.offsets[index + 1]]
+
+    def topological_order(self) -> Optional[List[int]]:
+        """The indices of the nodes in a topological order, None if there is a cycle."""
+        indegrees = [0] * len(self.nodes)
+        for target in self.targets:
+            indegrees[target] += 1
+
+        order = [
+            node for node, indegree in enumerate(indegrees) if not indegree
+        ]
+        offsets, targets = self.offsets.tolist(), self.targets.tolist()
+        for node in order:  # Extended as the nodes are visited
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                indegrees[target] -= 1
+                if not indegrees[target]:
+                    order.append(target)
+
+        return order if len(order) == len(self.nodes) else None
+
+
+class CompactPipeline(Pipeline):
+    """A Pipeline storing its graph compactly, for very large generated pipelines.
+
+    It has the API of a Pipeline, and is used as one, through the storage
+    hooks of networkx: its nodes are ``__slots__`` records sharing the
+    attributes of the registered node they were cloned from instead of
+    WrappedNode models, the attributes of its nodes and edges are slotted
+    mappings instead of dicts, and the node ids are interned. Whole graph
+    traversals, like reordering the nodes after a batch edit, run on its CSR
+    arrays (see ``to_csr``). ``to_networkx`` exports it to a regular Pipeline.
+    """
+
+    node_dict_factory = InternedDict
+    adjlist_outer_dict_factory = InternedDict
+    adjlist_inner_dict_factory = InternedDict
+    node_attr_dict_factory = NodeData
+    edge_attr_dict_factory = EdgeData
+
+    def _clone_node(
+        self, node_name: str, package: Optional[str] = None, **kwargs
+    ) -> NodeRecord:
+        return NodeRecord.from_template(
+            get_registered_node(node_name, package=package), **kwargs
+        )
+
+    def to_csr(self) -> CSRGraph:
+        """The adjacency of the pipeline, as CSR arrays of node indices."""
+        succ = self._succ
+        nodes = list(succ)
+        index = dict(zip(nodes, range(len(nodes))))
+        targets = array(
+            "l", [index[sink] for node in nodes for sink in succ[node]]
+        )
+        offsets, total = array("l", [0]), 0
+        for node in nodes:
+            total += len(succ[node])
+            offsets.append(total)
+        return CSRGraph(nodes, offsets, targets)
+
+    def _reset_order(self) -> None:
+        csr = self.to_csr()
+        order = csr.topological_order()
+        if order is None:
+            super()._reset_order()  # Finds the cycle and raises
+            return
+
+        self._order = TopologicalOrder()
+        for node in order:
+            self._order.add_node(csr.nodes[node])
+
+    def is_dag(self) -> bool:
+        """Returns True if the pipeline_service is a DAG, False otherwise."""
+        return self.to_csr().topological_order() is not None
+
+    def to_networkx(self) -> Pipeline:
+        """A regular Pipeline with the same id, attributes, nodes and edges."""
+        pipeline = Pipeline(self.name, self.description, self.tags)
+        pipeline.id = self.id
+        pipeline.created_at = self.created_at
+        for node_id, record in self.nodes(data="wrapped_node"):
+            nx.DiGraph.add_node(
+                pipeline, node_id, wrapped_node=record.to_wrapped_node()
+            )
+        nx.DiGraph.add_edges_from(pipeline, self.edges(data=True))
+        pipeline._reset_order()
+        pipeline.instantiated = self.instantiated
+        pipeline.committed = self.committed
+        pipeline.chimerapy_graph = self.chimerapy_graph
+        return pipeline
+
+    @classmethod
+    def from_networkx(cls, pipeline: Pipeline) -> "CompactPipeline":
+        """A compact copy of a Pipeline, with the same id, attributes, nodes and edges."""
+        compact = cls(pipeline.name, pipeline.description, pipeline.tags)
+        compact.id = pipeline.id
+        compact.created_at = pipeline.created_at
+        for node_id, wrapped_node in pipeline.nodes(data="wrapped_node"):
+            nx.DiGraph.add_node(
+                compact,
+                node_id,
+                wrapped_node=NodeRecord.from_wrapped_node(wrapped_node),
+            )
+        nx.DiGraph.add_edges_from(compact, pipeline.edges(data=True))
+        compact._reset_order()
+        compact.instantiated = pipeline.instantiated
+        compact.committed = pipeline.committed
+        compact.chimerapy_graph = pipeline.chimerapy_graph
+        return compact
+
+    def __repr__(self) -> str:
+        return f"CompactPipeline<{self.name}>"
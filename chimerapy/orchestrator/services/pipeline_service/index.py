@@ -0,0 +1,184 @@
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+        Pipeline,
+    )
+
+Key = Tuple[float, str]
+
+
+class InvalidQueryError(ValueError):
+    """Raised when a listing of the pipelines has an invalid cursor, filter or field."""
+
+
+def encode_cursor(key: Key) -> str:
+    """An opaque cursor resuming a listing after the pipeline ``key``."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode()
+
+
+def decode_cursor(cursor: str) -> Key:
+    """The key of the pipeline a listing resumes after."""
+    try:
+        created_at, pipeline_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("utf-8"))
+        )
+        return float(created_at), str(pipeline_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidQueryError(f"Invalid cursor {cursor}") from e
+
+
+class PipelineIndex:
+    """Secondary indexes of pipelines, ordered by creation time.
+
+    Each value of an indexed field (the name, the tags and the instantiated
+    and committed statuses of the pipelines) has the sorted list of the
+    ``(created_at, id)`` keys of the pipelines with that value, so that a page
+    of a listing filtered on a field is found by bisection. The pipelines
+    update their entry when their web attributes change (see
+    ``Pipeline.index``).
+    """
+
+    FIELDS = ("name", "tag", "instantiated", "committed")
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._keys: List[Key] = []
+        self._entries: Dict[
+            str, Tuple[Key, Dict[str, Tuple[Hashable, ...]]]
+        ] = {}
+        self._buckets: Dict[Tuple[str, Hashable], List[Key]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, pipeline_id: str) -> bool:
+        return pipeline_id in self._entries
+
+    @staticmethod
+    def _values(pipeline: "Pipeline") -> Dict[str, Tuple[Hashable, ...]]:
+        return {
+            "name": (pipeline.name,),
+            "tag": tuple(pipeline.tags),
+            "instantiated": (pipeline.instantiated,),
+            "committed": (pipeline.committed,),
+        }
+
+    def _insert(self, field: str, value: Hashable, key: Key) -> None:
+        insort(self._buckets.setdefault((field, value), []), key)
+
+    def _discard(self, field: str, value: Hashable, key: Key) -> None:
+        bucket = self._buckets[(field, value)]
+        del bucket[bisect_left(bucket, key)]
+        if not bucket:
+            del self._buckets[(field, value)]
+
+    def add(self, pipeline: "Pipeline") -> None:
+        """Index a pipeline."""
+        key = (pipeline.created_at, pipeline.id)
+        values = self._values(pipeline)
+        with self._lock:
+            insort(self._keys, key)
+            for field, field_values in values.items():
+                for value in field_values:
+                    self._insert(field, value, key)
+            self._entries[pipeline.id] = (key, values)
+
+    def remove(self, pipeline_id: str) -> None:
+        """Remove a pipeline from the indexes, if it's indexed."""
+        with self._lock:
+            if (entry := self._entries.pop(pipeline_id, None)) is None:
+                return
+
+            key, values = entry
+            del self._keys[bisect_left(self._keys, key)]
+            for field, field_values in values.items():
+                for value in field_values:
+                    self._discard(field, value, key)
+
+    def update(self, pipeline: "Pipeline") -> None:
+        """Reindex the fields of a pipeline that changed."""
+        entry = self._entries.get(pipeline.id)
+        if entry is None:
+            return
+
+        key, old_values = entry
+        if key != (pipeline.created_at, pipeline.id):
+            self.remove(pipeline.id)
+            self.add(pipeline)
+            return
+
+        values = self._values(pipeline)
+        with self._lock:
+            for field, field_values in values.items():
+                old = set(old_values[field])
+                new = set(field_values)
+                for value in old - new:
+                    self._discard(field, value, key)
+                for value in new - old:
+                    self._insert(field, value, key)
+            self._entries[pipeline.id] = (key, values)
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Hashable]] = None,
+        after: Optional[Key] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], Optional[Key]]:
+        """The ids of the pipelines matching the filters, in creation order.
+
+        Parameters
+        ----------
+        filters: Optional[Dict[str, Hashable]]
+            The value each field in ``FIELDS`` must have (or contain, for the
+            tags).
+
+        after: Optional[Key]
+            The key of the pipeline to resume the listing after.
+
+        limit: Optional[int]
+            The maximum number of ids, None for all of them.
+
+        Returns
+        -------
+        Tuple[List[str], Optional[Key]]
+            The ids, and the key to resume after if the listing was cut at
+            ``limit`` before the last candidate.
+        """
+        filters = filters or {}
+        if unknown := set(filters) - set(self.FIELDS):
+            raise InvalidQueryError(f"Unknown filters {sorted(unknown)}")
+
+        with self._lock:
+            candidates = min(
+                (self._buckets.get(item, []) for item in filters.items()),
+                key=len,
+                default=self._keys,
+            )
+            start = 0 if after is None else bisect_right(candidates, after)
+            ids: List[str] = []
+            for position in range(start, len(candidates)):
+                if limit is not None and len(ids) == limit:
+                    return ids, candidates[position - 1]
+
+                key = candidates[position]
+                if self._matches(key[1], filters):
+                    ids.append(key[1])
+
+        return ids, None
+
+    def _matches(self, pipeline_id: str, filters: Dict[str, Any]) -> bool:
+        values = self._entries[pipeline_id][1]
+        return all(value in values[field] for field, value in filters.items())
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Type
+
+from chimerapy.engine.node import Node
+
+
+def freeze(value: Any) -> Hashable:
+    """A hashable equivalent of a JSON like value.
+
+    Types are kept, so that e.g. ``1`` and ``True`` don't share a key.
+
+    Raises
+    ------
+    TypeError
+        If the value holds something that isn't hashable.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(v)) for key, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    hash(value)
+    return type(value).__name__, value
+
+
+InstanceKey = Tuple[Type[Node], Hashable]
+
+
+class NodeInstancePool:
+    """A least recently used pool of node instances, to skip reconstructing nodes.
+
+    The instances of a destroyed pipeline are released to the pool, keyed on
+    their node class and the kwargs (name included) they were constructed
+    with, and acquired back when a node with the same class and kwargs is
+    instantiated. An instance is held by a single wrapped node at a time, so
+    the pool may keep several instances for a key. The nodes are only sent
+    (pickled) to the workers, so the instances kept here are as constructed.
+
+    Parameters
+    ----------
+    capacity: int
+        The maximum number of instances kept, the least recently released
+        being evicted first. 0 disables the pool.
+    """
+
+    def __init__(self, capacity: int = 128) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._instances: "OrderedDict[InstanceKey, List[Node]]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def key(
+        node_class: Type[Node], kwargs: Dict[str, Any]
+    ) -> Optional[InstanceKey]:
+        """The key of the instances of a node, None if its kwargs aren't hashable."""
+        try:
+            return node_class, freeze(kwargs)
+        except TypeError:
+            return None
+
+    def acquire(
+        self, node_class: Type[Node], kwargs: Dict[str, Any]
+    ) -> Optional[Node]:
+        """Take an instance constructed with the kwargs out of the pool, if any."""
+        key = self.key(node_class, kwargs)
+        with self._lock:
+            instances = self._instances.get(key) if key is not None else None
+            if not instances:
+                self.misses += 1
+                return None
+
+            instance = instances.pop()
+            if not instances:
+                del self._instances[key]
+            self._size -= 1
+            self.hits += 1
+            return instance
+
+    def release(
+        self, node_class: Type[Node], kwargs: Dict[str, Any], instance: Node
+    ) -> None:
+        """Put an instance back in the pool, evicting the least recently used ones."""
+        key = self.key(node_class, kwargs)
+        if key is None or self.capacity <= 0:
+            return
+
+        with self._lock:
+            self._instances.setdefault(key, []).append(instance)
+            self._instances.move_to_end(key)
+            self._size += 1
+            while self._size > self.capacity:
+                oldest = next(iter(self._instances))
+                instances = self._instances[oldest]
+                instances.pop(0)
+                if not instances:
+                    del self._instances[oldest]
+                self._size -= 1
+
+    def invalidate(self, node_class: Optional[Type[Node]] = None) -> int:
+        """Drop the instances of a node class, or all of them, returns how many were dropped."""
+        with self._lock:
+            keys = [
+                key
+                for key in self._instances
+                if node_class is None or key[0] is node_class
+            ]
+            dropped = 0
+            for key in keys:
+                dropped += len(self._instances.pop(key))
+            self._size -= dropped
+            return dropped
+
+    def __len__(self) -> int:
+        return self._size
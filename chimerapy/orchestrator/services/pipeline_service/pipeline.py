@@ -1,16 +1,54 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import time
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
 import networkx as nx
 
 import chimerapy.engine as cpe
 from chimerapy.orchestrator.models.pipeline_config import (
     ChimeraPyPipelineConfig,
+    ReplicasConfig,
+    TemplateConfig,
+    TemplateExpansionError,
+)
+from chimerapy.orchestrator.models.pipeline_models import (
+    AddEdgeOperation,
+    AddNodeOperation,
+    PipelineDiff,
+    PipelineOperation,
+    RemoveEdgeOperation,
+    RemoveNodeOperation,
+    UpdateNodeOperation,
+    WebNode,
+    WrappedNode,
 )
-from chimerapy.orchestrator.models.pipeline_models import WebNode, WrappedNode
 from chimerapy.orchestrator.models.registry_models import NodeType
 from chimerapy.orchestrator.registry import get_registered_node
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+)
+from chimerapy.orchestrator.services.pipeline_service.topological_order import (
+    TopologicalOrder,
+)
 from chimerapy.orchestrator.utils import uuid
 
+if TYPE_CHECKING:
+    from chimerapy.orchestrator.services.pipeline_service.index import (
+        PipelineIndex,
+    )
+
 
 class NotADagError(ValueError):
     def __init__(self, edge: Dict[str, WrappedNode]) -> None:
@@ -42,6 +80,16 @@ class InvalidNodeError(ValueError):
         super().__init__(msg)
 
 
+class BatchOperationError(Exception):
+    """An error that occurs when an operation of a batch cannot be applied."""
+
+    def __init__(self, index: int, op: str, error: Exception) -> None:
+        self.index = index
+        self.op = op
+        self.error = error
+        super().__init__(f"Operation {index} ({op}) failed: {error}")
+
+
 class PipelineInstantiationError(Exception):
     """An error that occurs when a pipeline cannot be instantiated."""
 
@@ -49,18 +97,217 @@ class PipelineInstantiationError(Exception):
         super().__init__(msg)
 
 
+class NodeInstantiationError(PipelineInstantiationError):
+    """An error that occurs when some nodes of a pipeline cannot be instantiated."""
+
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__(
+            "Cannot instantiate the pipeline, failed nodes: "
+            + ", ".join(f"{node}: {error}" for node, error in errors.items())
+        )
+
+
+def _construct_node(node_class: Type[cpe.Node], kwargs: Dict[str, Any]):
+    """Constructs a node, in an executor (so it must be picklable)."""
+    return node_class(**kwargs)
+
+
+def _acquire_instance(
+    pool: Optional[NodeInstancePool], wrapped_node: WrappedNode
+) -> Optional[cpe.Node]:
+    """An instance of the node from the pool, if any."""
+    if pool is None:
+        return None
+    return pool.acquire(wrapped_node.NodeClass, wrapped_node.instance_kwargs())
+
+
+async def _submit_node(
+    loop: asyncio.AbstractEventLoop,
+    executor: Optional[Executor],
+    wrapped_node: WrappedNode,
+    node_timeout: Optional[float],
+    slots: Optional[asyncio.Semaphore],
+) -> cpe.Node:
+    """Constructs the node in the executor once it has a slot.
+
+    The timeout starts once the node is submitted. The slot is held until
+    the construction ends, even after a timeout, as it keeps its worker
+    busy until then.
+    """
+
+    def release(future: asyncio.Future) -> None:
+        if not future.cancelled():
+            future.exception()  # Retrieved, even if nobody awaits it anymore
+        slots.release()
+
+    if slots is not None:
+        await slots.acquire()
+    future = loop.run_in_executor(
+        executor,
+        _construct_node,
+        wrapped_node.NodeClass,
+        wrapped_node.instance_kwargs(),
+    )
+    if slots is not None:
+        future.add_done_callback(release)
+    return await asyncio.wait_for(asyncio.shield(future), node_timeout)
+
+
+async def instantiate_nodes(
+    pipeline_id: str,
+    wrapped_nodes: List[WrappedNode],
+    executor: Optional[Executor] = None,
+    node_timeout: Optional[float] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    pool: Optional[NodeInstancePool] = None,
+    max_workers: Optional[int] = None,
+) -> List[cpe.Node]:
+    """Constructs the nodes concurrently in an executor, returns their instances.
+
+    See ``Pipeline.instantiate_async`` for the parameters.
+
+    Raises
+    ------
+    NodeInstantiationError
+        If any node failed or timed out, with the error of each of them.
+    """
+    loop = asyncio.get_running_loop()
+    progress = {
+        "pipeline_id": pipeline_id,
+        "completed": 0,
+        "total": len(wrapped_nodes),
+    }
+    errors: Dict[str, str] = {}
+    slots = asyncio.Semaphore(max_workers) if max_workers else None
+
+    async def construct(wrapped_node: WrappedNode):
+        status = "instantiated"
+        try:
+            instance = _acquire_instance(pool, wrapped_node)
+            if instance is not None:
+                status = "reused"
+                return instance
+            return await _submit_node(
+                loop, executor, wrapped_node, node_timeout, slots
+            )
+        except asyncio.TimeoutError:
+            status = "failed"
+            errors[wrapped_node.id] = f"Timed out after {node_timeout}s"
+        except Exception as e:
+            status = "failed"
+            errors[wrapped_node.id] = f"{type(e).__name__}: {e}"
+        finally:
+            progress["completed"] += 1
+            if on_progress is not None:
+                on_progress(
+                    {
+                        **progress,
+                        "node_id": wrapped_node.id,
+                        "status": status,
+                        "error": errors.get(wrapped_node.id),
+                    }
+                )
+
+    instances = await asyncio.gather(
+        *(construct(wrapped_node) for wrapped_node in wrapped_nodes)
+    )
+    if errors:
+        for wrapped_node, instance in zip(wrapped_nodes, instances):
+            if instance is not None and pool is not None:
+                pool.release(
+                    wrapped_node.NodeClass,
+                    wrapped_node.instance_kwargs(),
+                    instance,
+                )
+        raise NodeInstantiationError(errors)
+
+    return instances
+
+
+def build_chimerapy_graph(
+    instances: Dict[str, cpe.Node], edges: Iterable[Tuple[str, str]]
+) -> cpe.Graph:
+    """The ChimeraPy graph of the node instances (by node id) and edges."""
+    cp_graph = cpe.Graph()
+    for instance in instances.values():
+        cp_graph.add_node(instance)
+
+    for source, sink in edges:
+        cp_graph.add_edge(instances[source], instances[sink])
+
+    return cp_graph
+
+
 class Pipeline(nx.DiGraph):
-    """A directed graph representing a ChimeraPy pipeline without instantiated nodes."""
+    """A directed graph representing a ChimeraPy pipeline without instantiated nodes.
+
+    The pipeline keeps a ``version`` that each mutation through its methods
+    (or assignment to its web attributes) bumps, and caches its web JSON until
+    the next one. Nodes must therefore be updated through the pipeline.
 
-    def __init__(self, name: str, description: str = "A pipeline") -> None:
+    The ``index`` of a pipeline, if set, is updated when its web attributes
+    change, and the ``tags`` are kept as a tuple without duplicates.
+    """
+
+    _WEB_ATTRIBUTES = frozenset(
+        {
+            "name",
+            "description",
+            "tags",
+            "created_at",
+            "instantiated",
+            "committed",
+        }
+    )
+
+    WEB_FIELDS = (
+        "id",
+        "name",
+        "instantiated",
+        "committed",
+        "description",
+        "tags",
+        "created_at",
+        "nodes",
+        "edges",
+    )
+
+    index: Optional["PipelineIndex"] = None
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "A pipeline",
+        tags: Iterable[str] = (),
+    ) -> None:
+        self.version = 0
+        self._web_cache: Dict[str, Any] = {}
+        self._order = TopologicalOrder()
         super().__init__()
         self.id = uuid()
         self.name = name
         self.instantiated = False
         self.committed = False
         self.description = description or "A pipeline"
+        self.tags = tags
+        self.created_at = time.time()
         self.chimerapy_graph = None
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "tags":
+            value = tuple(dict.fromkeys(value))
+        super().__setattr__(name, value)
+        if name in self._WEB_ATTRIBUTES:
+            self.touch()
+            if self.index is not None:
+                self.index.update(self)
+
+    def touch(self) -> None:
+        """Bump the version of the pipeline, invalidating its cached web JSON."""
+        self.version += 1
+        self._web_cache.clear()
+
     def add_node(
         self,
         node_name: str,
@@ -68,14 +315,20 @@ class Pipeline(nx.DiGraph):
         **kwargs: Dict[str, Any],
     ) -> WrappedNode:
         """Adds a node to the pipeline_service."""
-        wrapped_node = get_registered_node(
-            node_name, package=node_package
-        ).clone(**kwargs)
+        wrapped_node = self._clone_node(node_name, node_package, **kwargs)
 
         super().add_node(wrapped_node.id, wrapped_node=wrapped_node)
+        self._order.add_node(wrapped_node.id)
+        self.touch()
 
         return wrapped_node
 
+    def _clone_node(
+        self, node_name: str, package: Optional[str] = None, **kwargs
+    ) -> WrappedNode:
+        """A new node of the pipeline, cloned from the registered one."""
+        return get_registered_node(node_name, package=package).clone(**kwargs)
+
     def remove_node(self, node_id: str) -> WrappedNode:
         """Removes a node from the pipeline_service."""
         if node_id not in self.nodes:
@@ -83,42 +336,23 @@ class Pipeline(nx.DiGraph):
 
         wrapped_node = self.nodes[node_id]["wrapped_node"]
         super().remove_node(node_id)
+        self._order.remove_node(node_id)
+        self.touch()
         return wrapped_node
 
     def add_edge(
         self, source: str, sink: str, *, edge_id: str = None
     ) -> Dict[str, WrappedNode]:
-        """Adds an edge to the pipeline_service."""
-        for node in (source, sink):
-            if node not in self.nodes:
-                raise NodeNotFoundError(node)
-
-        edge = {}
-        for node_id, data in self.nodes(data=True):
-            wrapped_node: WrappedNode = data["wrapped_node"]
-            if node_id == source:
-                node_type = wrapped_node.node_type
-
-                if node_type not in {NodeType.SOURCE, NodeType.STEP}:
-                    raise InvalidNodeError(
-                        f"{node_id}:{wrapped_node.NodeClass.__name__}",
-                        "Expected a source or step node, found a sink node",
-                    )
-
-                edge["source"] = wrapped_node
-
-            elif node_id == sink:
-                node_type = wrapped_node.node_type
-
-                if node_type not in {NodeType.SINK, NodeType.STEP}:
-                    raise InvalidNodeError(
-                        f"{node_id}:{wrapped_node.NodeClass.__name__}",
-                        "Expected a sink or step node, found a source node",
-                    )
-
-                edge["sink"] = wrapped_node
+        """Adds an edge to the pipeline_service.
 
+        Cycles are detected incrementally, maintaining a topological order of
+        the nodes as edges are added.
+        """
+        edge = self._edge_ends(source, sink)
         if not self.has_edge(source, sink):
+            if not self._order.add_edge(source, sink, self._succ, self._pred):
+                raise NotADagError(edge)
+
             super().add_edge(
                 source,
                 sink,
@@ -126,51 +360,194 @@ class Pipeline(nx.DiGraph):
                     "id": edge_id or uuid(),
                 },
             )
-
-        if not self.is_dag():
-            super().remove_edge(source, sink)
-            raise NotADagError(edge)
+            self.touch()
 
         return edge
 
+    def _edge_ends(self, source: str, sink: str) -> Dict[str, WrappedNode]:
+        """The ends of an edge, checking that they can be connected."""
+        for node in (source, sink):
+            if node not in self.nodes:
+                raise NodeNotFoundError(node)
+
+        src_wrapped_node: WrappedNode = self.nodes[source]["wrapped_node"]
+        if src_wrapped_node.node_type not in {NodeType.SOURCE, NodeType.STEP}:
+            raise InvalidNodeError(
+                f"{source}:{src_wrapped_node.NodeClass.__name__}",
+                "Expected a source or step node, found a sink node",
+            )
+
+        dst_wrapped_node: WrappedNode = self.nodes[sink]["wrapped_node"]
+        if dst_wrapped_node.node_type not in {NodeType.SINK, NodeType.STEP}:
+            raise InvalidNodeError(
+                f"{sink}:{dst_wrapped_node.NodeClass.__name__}",
+                "Expected a sink or step node, found a source node",
+            )
+
+        return {"source": src_wrapped_node, "sink": dst_wrapped_node}
+
     def remove_edge(
         self, source: str, sink: str, *, edge_id: str = None
     ) -> Dict[str, WrappedNode]:
         """Removes an edge from the pipeline_service."""
+        self._edge_data(source, sink, edge_id)
+        super().remove_edge(source, sink)
+        self.touch()
+
+        return {
+            "source": self.nodes[source]["wrapped_node"],
+            "sink": self.nodes[sink]["wrapped_node"],
+        }
+
+    def _edge_data(
+        self, source: str, sink: str, edge_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """The data of an existing edge, checking its id if given."""
         for node in (source, sink):
             if node not in self.nodes:
                 raise NodeNotFoundError(node)
 
-        src_wrapped_node = self.nodes[source]["wrapped_node"]
-        dst_wrapped_node = self.nodes[sink]["wrapped_node"]
+        if not self.has_edge(source, sink):
+            raise EdgeNotFoundError(edge_id)
 
-        if self.has_edge(source, sink):
-            if (
-                edge_id is not None
-                and not self.edges[(source, sink)]["id"] == edge_id
-            ):
-                raise ValueError(
-                    f"Edge {source} -> {sink} does not have id {edge_id}"
+        data = self.edges[(source, sink)]
+        if edge_id is not None and not data["id"] == edge_id:
+            raise ValueError(
+                f"Edge {source} -> {sink} does not have id {edge_id}"
+            )
+        return data
+
+    def apply_batch(self, operations: List[PipelineOperation]) -> PipelineDiff:
+        """Applies the operations in order, all or none of them.
+
+        The graph is only checked for cycles once, after the last operation.
+        """
+        return PipelineBatchEditor(self).apply(operations)
+
+    def add_replicas(
+        self, template: TemplateConfig, replicas: ReplicasConfig
+    ) -> PipelineDiff:
+        """Adds the replicas of a template to the pipeline, as a single batch.
+
+        The links of the replicas refer to the other nodes of the pipeline by
+        id, or by name (the name their instance is created with) if no other
+        node has it.
+        """
+        expanded = replicas.expand(template)
+        ids = {
+            node.name: uuid() for replica in expanded for node in replica.nodes
+        }
+        operations: List[PipelineOperation] = [
+            AddNodeOperation(
+                node=WebNode(
+                    id=ids[node.name],
+                    name=node.name,
+                    registry_name=node.registry_name,
+                    package=node.package,
+                    kwargs=node.kwargs,
+                    worker_id=replica.worker_id,
                 )
+            )
+            for replica in expanded
+            for node in replica.nodes
+        ]
+        if len(ids) != len(operations):
+            raise TemplateExpansionError(
+                f"The replicas of {template.name} have duplicate node names"
+            )
 
-            super().remove_edge(source, sink)
-        else:
-            raise EdgeNotFoundError(edge_id)
+        names = self._node_ids_by_name()
+        operations.extend(
+            AddEdgeOperation(
+                source=ids.get(source) or self._link_end(source, names),
+                sink=ids.get(sink) or self._link_end(sink, names),
+            )
+            for replica in expanded
+            for source, sink in replica.edges
+        )
+        try:
+            return self.apply_batch(operations)
+        except BatchOperationError as e:
+            raise e.error from e
 
-        return {"source": src_wrapped_node, "sink": dst_wrapped_node}
+    def _node_ids_by_name(self) -> Dict[str, List[str]]:
+        names: Dict[str, List[str]] = {}
+        for node_id, wrapped_node in self.nodes(data="wrapped_node"):
+            name = wrapped_node.kwargs.get("name", wrapped_node.name)
+            names.setdefault(name, []).append(node_id)
+        return names
+
+    def _link_end(self, node: str, names: Dict[str, List[str]]) -> str:
+        """The id of the node of the pipeline a link refers to, by id or unique name."""
+        if node in self.nodes:
+            return node
+        if len(ids := names.get(node, [])) != 1:
+            raise TemplateExpansionError(
+                f"Link to {node}: no node has this id, and "
+                f"{len(ids)} nodes have this name"
+            )
+        return ids[0]
+
+    def _reset_order(self) -> None:
+        """Rebuilds the topological order, raising a NotADagError on a cycle."""
+        try:
+            nodes = list(nx.topological_sort(self))
+        except nx.NetworkXUnfeasible:
+            source, sink = nx.find_cycle(self)[0][:2]
+            raise NotADagError(  # noqa: B904
+                {
+                    "source": self.nodes[source]["wrapped_node"],
+                    "sink": self.nodes[sink]["wrapped_node"],
+                }
+            )
+
+        self._order = TopologicalOrder()
+        for node in nodes:
+            self._order.add_node(node)
 
     def is_dag(self) -> bool:
         """Returns True if the pipeline_service is a DAG, False otherwise."""
         return nx.is_directed_acyclic_graph(self)
 
     def to_web_json(self) -> Dict[str, Any]:
-        """Returns a JSON representation of the pipeline_service for the web interface."""
+        """Returns a JSON representation of the pipeline_service for the web interface.
+
+        The representation is cached until the next mutation and shared by all
+        the callers, it must not be modified.
+        """
+        if (web_json := self._web_cache.get("json")) is None:
+            web_json = self._web_cache["json"] = self._build_web_json()
+        return web_json
+
+    def to_web_json_bytes(self) -> bytes:
+        """Returns the JSON encoded web representation, cached as ``to_web_json``."""
+        if (encoded := self._web_cache.get("bytes")) is None:
+            encoded = self._web_cache["bytes"] = json.dumps(
+                self.to_web_json(), separators=(",", ":")
+            ).encode("utf-8")
+        return encoded
+
+    def web_fields(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """The given ``WEB_FIELDS`` of the web JSON, without building it unless the nodes or edges are requested."""
+        web_fields = {}
+        for field in fields:
+            if field in ("nodes", "edges"):
+                web_fields[field] = self.to_web_json()[field]
+            elif field == "tags":
+                web_fields[field] = list(self.tags)
+            else:
+                web_fields[field] = getattr(self, field)
+        return web_fields
+
+    def _build_web_json(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "name": self.name,
             "instantiated": self.instantiated,
             "committed": self.committed,
             "description": self.description,
+            "tags": list(self.tags),
+            "created_at": self.created_at,
             "nodes": [
                 data["wrapped_node"].to_web_node().model_dump(mode="json")
                 for node_id, data in self.nodes(data=True)
@@ -182,53 +559,238 @@ class Pipeline(nx.DiGraph):
         }
 
     def update_from_web_json(self, web_json: Dict[str, Any]) -> Dict[str, Any]:
-        """Update a pipeline from its web json representation."""
+        """Update a pipeline from its web json representation.
+
+        The document is compared with the current web json, and only the nodes
+        and edges that changed are updated, added or removed, atomically.
+        """
         assert self.id == web_json["id"], "Pipeline id mismatch"
+
+        operations = self._web_json_operations(web_json)
+        if operations:
+            try:
+                self.apply_batch(operations)
+            except BatchOperationError as e:
+                raise e.error from e
+
         # Check the name of the pipeline
         if web_json["name"] != self.name:
             self.name = web_json["name"]
 
         # Check the description of the pipeline
-        if web_json.get("description") != self.description:
+        if web_json.get("description", self.description) != self.description:
             self.description = web_json["description"]
 
-        # Update Nodes
+        # Check the tags of the pipeline
+        if tuple(web_json.get("tags", self.tags)) != self.tags:
+            self.tags = web_json["tags"]
+
+        return self.to_web_json()
+
+    def _web_json_operations(
+        self, web_json: Dict[str, Any]
+    ) -> List[PipelineOperation]:
+        """The operations that turn the current web json into ``web_json``.
+
+        The nodes are compared as validated web nodes, on the fields the
+        document sets. New nodes without an id are given one, and the edges
+        can refer to them by name.
+        """
+        current = self.to_web_json()
+        nodes = {
+            node["id"]: WebNode.model_validate(node)
+            for node in current["nodes"]
+        }
+        edges = {
+            (edge["source"], edge["sink"]): edge for edge in current["edges"]
+        }
+        new_nodes: Dict[str, WebNode] = {}
+        named: Dict[str, str] = {}
         for node in web_json["nodes"]:
-            wrapped_node = self.nodes[node["id"]]["wrapped_node"]
-            wrapped_node.update_from_web_node(WebNode.model_validate(node))
+            web_node = WebNode.model_validate(node)
+            if web_node.id is None:
+                web_node.id = uuid()
+                named[web_node.name] = web_node.id
+            new_nodes[web_node.id] = web_node
 
-        # Verify Edges, ToDo: Update edges after chimerapy update
+        def end(node_id):
+            return (
+                node_id if node_id in new_nodes else named.get(node_id, node_id)
+            )
+
+        new_edges = {}
         for edge in web_json["edges"]:
-            assert self.has_edge(edge["source"], edge["sink"]), "Edge not found"
+            edge = {
+                **edge,
+                "source": end(edge.get("source")),
+                "sink": end(edge.get("sink")),
+            }
+            new_edges[(edge["source"], edge["sink"])] = edge
 
-        return self.to_web_json()
+        operations: List[PipelineOperation] = [
+            RemoveEdgeOperation(source=source, sink=sink)
+            for (source, sink), edge in edges.items()
+            if (source, sink) not in new_edges
+            or new_edges[(source, sink)].get("id", edge["id"]) != edge["id"]
+        ]
+        operations.extend(
+            RemoveNodeOperation(id=node_id)
+            for node_id in nodes
+            if node_id not in new_nodes
+        )
+        for node_id, web_node in new_nodes.items():
+            if node_id not in nodes:
+                operations.append(AddNodeOperation(node=web_node))
+            elif update := self._update_operation(nodes[node_id], web_node):
+                operations.append(update)
+        operations.extend(
+            AddEdgeOperation.model_validate({"op": "add-edge", **edge})
+            for key, edge in new_edges.items()
+            if key not in edges
+            or edge.get("id", edges[key]["id"]) != edges[key]["id"]
+        )
+        return operations
+
+    @staticmethod
+    def _update_operation(
+        current: WebNode, web_node: WebNode
+    ) -> Optional[UpdateNodeOperation]:
+        """The update of a node from its ``current`` web node, if it changed."""
+        fields = web_node.model_fields_set
+        for field in ("registry_name", "package"):
+            if field in fields and getattr(web_node, field) != getattr(
+                current, field
+            ):
+                raise InvalidNodeError(
+                    web_node.id, f"its {field} can't be changed"
+                )
+
+        updates = {
+            field: getattr(web_node, field)
+            for field in ("name", "kwargs", "worker_id")
+            if field in fields
+            and getattr(web_node, field) != getattr(current, field)
+            and (field == "worker_id" or getattr(web_node, field) is not None)
+        }
+        return (
+            UpdateNodeOperation(id=web_node.id, **updates) if updates else None
+        )
+
+    def instantiate(
+        self, pool: Optional[NodeInstancePool] = None
+    ) -> Dict[str, Any]:
+        """Instantiates the pipeline, reusing the instances of the ``pool`` if any."""
+        self._check_can_instantiate()
+        for node_id, data in self.nodes(data=True):  # noqa: B007
+            wrapped_node: WrappedNode = data["wrapped_node"]
+            instance = _acquire_instance(pool, wrapped_node)
+            if instance is not None:
+                wrapped_node.instance = instance
+            else:
+                wrapped_node.instantiate()
 
-    def instantiate(self) -> Dict[str, Any]:
-        """Instantiates the pipeline."""
+        return self._build_chimerapy_graph()
+
+    async def instantiate_async(
+        self,
+        executor: Optional[Executor] = None,
+        node_timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        pool: Optional[NodeInstancePool] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Instantiates the pipeline, constructing its nodes concurrently in an executor.
+
+        Parameters
+        ----------
+        executor: Optional[Executor]
+            The thread or process pool the nodes are constructed in, the event
+            loop's default executor if None. With a process pool, the nodes
+            are pickled back to this process.
+
+        node_timeout: Optional[float]
+            The maximum time (in seconds) to construct a node, None for no
+            limit. It starts once the node is submitted to the executor. The
+            construction of a node that timed out isn't cancelled, but its
+            result is discarded.
+
+        on_progress: Optional[Callable[[Dict[str, Any]], Any]]
+            Called with a progress event as each node is constructed or fails.
+
+        pool: Optional[NodeInstancePool]
+            The pool of instances reused instead of constructing the nodes
+            they were constructed for. The instances acquired from it are
+            released back if the instantiation fails.
+
+        max_workers: Optional[int]
+            The maximum number of nodes submitted to the executor at once,
+            its number of workers, so that no node waits in its queue. None
+            to submit all of them at once.
+
+        Raises
+        ------
+        NodeInstantiationError
+            If any node failed or timed out, with the error of each of them.
+            No node is instantiated then.
+        """
+        self._check_can_instantiate()
+        wrapped_nodes: List[WrappedNode] = [
+            data["wrapped_node"] for node_id, data in self.nodes(data=True)
+        ]
+        instances = await instantiate_nodes(
+            self.id,
+            wrapped_nodes,
+            executor,
+            node_timeout,
+            on_progress,
+            pool,
+            max_workers,
+        )
+        for wrapped_node, instance in zip(wrapped_nodes, instances):
+            wrapped_node.instance = instance
+
+        return self._build_chimerapy_graph()
+
+    def _check_can_instantiate(self) -> None:
         if not self.can_instantiate():
             raise PipelineInstantiationError(
                 "Cannot instantiate the pipeline, some nodes don't have worker ids"
             )
 
+        if self.instantiated:
+            raise PipelineInstantiationError("Pipeline already instantiated")
+
+    def _build_chimerapy_graph(self) -> Dict[str, Any]:
+        """Builds the ChimeraPy graph of the instantiated nodes."""
+        self.chimerapy_graph = build_chimerapy_graph(
+            {
+                node_id: data["wrapped_node"].instance
+                for node_id, data in self.nodes(data=True)
+            },
+            self.edges,
+        )
+        self.instantiated = True
+        return self.to_web_json()
+
+    def adopt_instances(
+        self,
+        instances: Dict[str, cpe.Node],
+        pool: Optional[NodeInstancePool] = None,
+    ) -> None:
+        """Replaces the instances of the nodes (by id) with already deployed ones, releasing the replaced instances to the ``pool`` if any."""
         if not self.instantiated:
-            cp_graph = cpe.Graph()
-            node_to_cp_node = {}
-            for node_id, data in self.nodes(data=True):
-                wrapped_node: WrappedNode = data["wrapped_node"]
-                node = wrapped_node.instantiate()
-                cp_graph.add_node(node)
-                node_to_cp_node[node_id] = node
-
-            for source, sink, data in self.edges(data=True):  # noqa: B007
-                cp_graph.add_edge(
-                    node_to_cp_node[source], node_to_cp_node[sink]
-                )
+            raise ValueError("Pipeline not instantiated")
 
-            self.instantiated = True
-            self.chimerapy_graph = cp_graph
-            return self.to_web_json()
-        else:
-            raise PipelineInstantiationError("Pipeline already instantiated")
+        for node_id, instance in instances.items():
+            wrapped_node: WrappedNode = self.nodes[node_id]["wrapped_node"]
+            if wrapped_node.instance is not None and pool is not None:
+                pool.release(
+                    wrapped_node.NodeClass,
+                    wrapped_node.instance_kwargs(),
+                    wrapped_node.instance,
+                )
+            wrapped_node.instance = instance
+        self._build_chimerapy_graph()
 
     def worker_graph_mapping(self) -> Dict[str, List[str]]:
         worker_graph_mapping = {}
@@ -256,18 +818,49 @@ class Pipeline(nx.DiGraph):
                 return False
         return True
 
-    def destroy(self) -> None:
-        """Destroys the pipeline instance."""
+    def destroy(self, pool: Optional[NodeInstancePool] = None) -> None:
+        """Destroys the pipeline instance, releasing the node instances to the ``pool`` if any."""
         self.instantiated = False
         self.committed = False
         self.chimerapy_graph = None
         for node_id, data in self.nodes(data=True):  # noqa: B007
             wrapped_node: WrappedNode = data["wrapped_node"]
+            if wrapped_node.instance is not None and pool is not None:
+                pool.release(
+                    wrapped_node.NodeClass,
+                    wrapped_node.instance_kwargs(),
+                    wrapped_node.instance,
+                )
             wrapped_node.instance = None
 
     def __repr__(self) -> str:
         return f"Pipeline<{self.name}>"
 
+    @classmethod
+    def from_web_json(cls, web_json: Dict[str, Any]) -> "Pipeline":
+        """Creates a pipeline from its web json representation, keeping its ids."""
+        pipeline = cls(
+            web_json["name"],
+            web_json.get("description"),
+            tags=web_json.get("tags", ()),
+        )
+        pipeline.id = web_json["id"]
+        pipeline.created_at = web_json.get("created_at", pipeline.created_at)
+        operations: List[PipelineOperation] = [
+            AddNodeOperation(node=WebNode.model_validate(node))
+            for node in web_json["nodes"]
+        ]
+        operations.extend(
+            AddEdgeOperation.model_validate({"op": "add-edge", **edge})
+            for edge in web_json["edges"]
+        )
+        try:
+            pipeline.apply_batch(operations)
+        except BatchOperationError as e:
+            raise e.error from e
+
+        return pipeline
+
     @classmethod
     def from_pipeline_config(
         cls, config: ChimeraPyPipelineConfig
@@ -292,4 +885,213 @@ class Pipeline(nx.DiGraph):
             source, sink = edge
             pipeline.add_edge(node_to_names[source].id, node_to_names[sink].id)
 
+        for replicas in config.replicas:
+            pipeline.add_replicas(
+                config.get_template(replicas.template), replicas
+            )
+
         return pipeline
+
+
+class PipelineBatchEditor:
+    """Applies a batch of operations to a pipeline, atomically.
+
+    The operations are applied to the graph in order, recording how to undo
+    each of them. Cycles are only checked once, after the last operation, and
+    any failure rolls the pipeline back to its state before the batch, in the
+    same order, so that its version and cached web JSON stay valid.
+
+    Parameters
+    ----------
+    pipeline: Pipeline
+        The pipeline to edit.
+    """
+
+    def __init__(self, pipeline: Pipeline) -> None:
+        self.pipeline = pipeline
+        self._undo_log: List[Callable[[], Any]] = []
+        self._graph_order: Optional[Tuple[List[str], Dict, Dict]] = None
+        self._handlers = {
+            "add-node": self._add_node,
+            "remove-node": self._remove_node,
+            "add-edge": self._add_edge,
+            "remove-edge": self._remove_edge,
+            "update-node": self._update_node,
+        }
+
+    def apply(self, operations: List[PipelineOperation]) -> PipelineDiff:
+        """Applies the operations, returning the changes they made together."""
+        pipeline = self.pipeline
+        before = pipeline.to_web_json()
+        order = pipeline._order
+        try:
+            for index, operation in enumerate(operations):
+                try:
+                    self._handlers[operation.op](operation)
+                except Exception as e:
+                    raise BatchOperationError(index, operation.op, e) from e
+            pipeline._reset_order()
+        except Exception:
+            self.rollback()
+            pipeline._order = order
+            raise
+
+        pipeline.touch()
+        return self._diff(before, pipeline.to_web_json(), pipeline.version)
+
+    def rollback(self) -> None:
+        """Undoes the operations applied, in reverse order."""
+        while self._undo_log:
+            self._undo_log.pop()()
+        if self._graph_order is not None:
+            self._restore_graph_order()
+
+    def _save_graph_order(self) -> None:
+        """Saves the order of the nodes and edges, before the first removal.
+
+        Undoing a removal adds the node or edge back last, so the order
+        saved is restored once a batch is rolled back.
+        """
+        if self._graph_order is None:
+            pipeline = self.pipeline
+            self._graph_order = (
+                list(pipeline._node),
+                {
+                    node_id: list(succ)
+                    for node_id, succ in pipeline._succ.items()
+                },
+                {
+                    node_id: list(pred)
+                    for node_id, pred in pipeline._pred.items()
+                },
+            )
+
+    def _restore_graph_order(self) -> None:
+        nodes, succ, pred = self._graph_order
+        pipeline = self.pipeline
+
+        def reorder(mapping, keys):
+            items = [(key, mapping[key]) for key in keys]
+            mapping.clear()
+            mapping.update(items)
+
+        reorder(pipeline._node, nodes)
+        reorder(pipeline._succ, nodes)
+        reorder(pipeline._pred, nodes)
+        for node_id in nodes:
+            reorder(pipeline._succ[node_id], succ[node_id])
+            reorder(pipeline._pred[node_id], pred[node_id])
+
+    def _add_node(self, operation: AddNodeOperation) -> None:
+        node, pipeline = operation.node, self.pipeline
+        if node.id is not None and node.id in pipeline.nodes:
+            raise InvalidNodeError(
+                node.id, "A node with this id already exists"
+            )
+
+        wrapped_node = pipeline._clone_node(
+            node.registry_name, node.package, **(node.kwargs or {})
+        )
+        wrapped_node.name = node.name
+        wrapped_node.worker_id = node.worker_id
+        if node.id is not None:
+            wrapped_node.id = node.id
+
+        nx.DiGraph.add_node(
+            pipeline, wrapped_node.id, wrapped_node=wrapped_node
+        )
+        self._undo_log.append(
+            lambda: nx.DiGraph.remove_node(pipeline, wrapped_node.id)
+        )
+
+    def _remove_node(self, operation: RemoveNodeOperation) -> None:
+        node_id, pipeline = operation.id, self.pipeline
+        if node_id not in pipeline.nodes:
+            raise NodeNotFoundError(node_id)
+
+        self._save_graph_order()
+        data = dict(pipeline.nodes[node_id])
+        edges = [
+            *pipeline.in_edges(node_id, data=True),
+            *pipeline.out_edges(node_id, data=True),
+        ]
+        nx.DiGraph.remove_node(pipeline, node_id)
+
+        def undo():
+            nx.DiGraph.add_node(pipeline, node_id, **data)
+            nx.DiGraph.add_edges_from(pipeline, edges)
+
+        self._undo_log.append(undo)
+
+    def _add_edge(self, operation: AddEdgeOperation) -> None:
+        source, sink, pipeline = operation.source, operation.sink, self.pipeline
+        pipeline._edge_ends(source, sink)
+        if pipeline.has_edge(source, sink):
+            return
+
+        nx.DiGraph.add_edge(pipeline, source, sink, id=operation.id or uuid())
+        self._undo_log.append(
+            lambda: nx.DiGraph.remove_edge(pipeline, source, sink)
+        )
+
+    def _remove_edge(self, operation: RemoveEdgeOperation) -> None:
+        source, sink, pipeline = operation.source, operation.sink, self.pipeline
+        data = dict(pipeline._edge_data(source, sink, operation.id))
+        self._save_graph_order()
+        nx.DiGraph.remove_edge(pipeline, source, sink)
+        self._undo_log.append(
+            lambda: nx.DiGraph.add_edge(pipeline, source, sink, **data)
+        )
+
+    def _update_node(self, operation: UpdateNodeOperation) -> None:
+        if operation.id not in self.pipeline.nodes:
+            raise NodeNotFoundError(operation.id)
+
+        wrapped_node = self.pipeline.nodes[operation.id]["wrapped_node"]
+        if wrapped_node.instantiated:
+            raise RuntimeError("Cannot update instantiated node.")
+
+        # worker_id can be unset with null, the others are ignored when null
+        updates = {
+            field: getattr(operation, field)
+            for field in operation.model_fields_set - {"op", "id"}
+            if field == "worker_id" or getattr(operation, field) is not None
+        }
+        previous = {field: getattr(wrapped_node, field) for field in updates}
+        for field, value in updates.items():
+            setattr(wrapped_node, field, value)
+
+        def undo():
+            for field, value in previous.items():
+                setattr(wrapped_node, field, value)
+
+        self._undo_log.append(undo)
+
+    @staticmethod
+    def _diff(
+        before: Dict[str, Any], after: Dict[str, Any], version: int
+    ) -> PipelineDiff:
+        """The changes between two web JSON representations of a pipeline."""
+        old_nodes = {node["id"]: node for node in before["nodes"]}
+        new_nodes = {node["id"]: node for node in after["nodes"]}
+        old_edges = {tuple(edge.values()): edge for edge in before["edges"]}
+        new_edges = {tuple(edge.values()): edge for edge in after["edges"]}
+
+        return PipelineDiff(
+            version=version,
+            added_nodes=[
+                node for id_, node in new_nodes.items() if id_ not in old_nodes
+            ],
+            updated_nodes=[
+                node
+                for id_, node in new_nodes.items()
+                if id_ in old_nodes and old_nodes[id_] != node
+            ],
+            removed_nodes=[id_ for id_ in old_nodes if id_ not in new_nodes],
+            added_edges=[
+                edge for key, edge in new_edges.items() if key not in old_edges
+            ],
+            removed_edges=[
+                edge for key, edge in old_edges.items() if key not in new_edges
+            ],
+        )
@@ -1,11 +1,59 @@
-from typing import Any, Dict, List, Optional, Tuple
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
+from chimerapy.orchestrator.json_patch import apply_patch
 from chimerapy.orchestrator.models.pipeline_config import (
     ChimeraPyPipelineConfig,
+    ReplicasConfig,
+    TemplateConfig,
+)
+from chimerapy.orchestrator.models.pipeline_models import (
+    AddEdgeOperation,
+    AddNodeOperation,
+    PipelineBatch,
+    PipelineDiff,
+    PipelineOperation,
+    WrappedNode,
 )
-from chimerapy.orchestrator.models.pipeline_models import WrappedNode
 from chimerapy.orchestrator.monads import Err, Ok, Result
-from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+from chimerapy.orchestrator.services.pipeline_service.compact_pipeline import (
+    CompactPipeline,
+)
+from chimerapy.orchestrator.services.pipeline_service.index import (
+    InvalidQueryError,
+    PipelineIndex,
+    decode_cursor,
+    encode_cursor,
+)
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    Pipeline,
+    PipelineBatchEditor,
+)
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    PipelineMetadata,
+    PipelineStore,
+)
+from chimerapy.orchestrator.utils import uuid
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BACKENDS: Dict[str, Type[Pipeline]] = {
+    "networkx": Pipeline,
+    "compact": CompactPipeline,
+}
 
 
 class PipelineNotFoundError(Exception):
@@ -16,39 +64,331 @@ class PipelineNotFoundError(Exception):
 
 
 class Pipelines:
-    """A service for managing pipelines."""
+    """A service for managing pipelines.
+
+    Parameters
+    ----------
+    instantiation_executor: str
+        The kind of pool the nodes are constructed in when a pipeline is
+        instantiated, "thread" or "process".
+
+    instantiation_workers: int
+        The maximum number of nodes constructed concurrently.
+
+    node_instantiation_timeout: Optional[float]
+        The maximum time (in seconds) to construct a node, None for no limit.
+
+    instance_pool_size: int
+        The maximum number of node instances kept from destroyed pipelines
+        to be reused by the next instantiations, 0 to always construct the
+        nodes.
+
+    store: Optional[PipelineStore]
+        The store the pipelines are persisted in, None to keep them in memory
+        only. The stored pipelines are listed from their metadata and loaded
+        on first access, each edit is logged to the store before it's
+        acknowledged. A pipeline that fails to load is logged and quarantined.
+
+    snapshot_interval: int
+        The number of logged edits of a pipeline after which a snapshot of it
+        is saved, compacting its log.
 
-    def __init__(self) -> None:
+    graph_backend: str
+        How the graphs of the pipelines are stored, "networkx" for regular
+        Pipelines or "compact" for CompactPipelines, which take less memory
+        for very large generated pipelines.
+    """
+
+    def __init__(
+        self,
+        instantiation_executor: str = "thread",
+        instantiation_workers: int = 4,
+        node_instantiation_timeout: Optional[float] = None,
+        instance_pool_size: int = 128,
+        store: Optional[PipelineStore] = None,
+        snapshot_interval: int = 100,
+        graph_backend: str = "networkx",
+    ) -> None:
+        if instantiation_executor not in {"thread", "process"}:
+            raise ValueError(
+                f"Unknown instantiation executor {instantiation_executor}"
+            )
+        if graph_backend not in GRAPH_BACKENDS:
+            raise ValueError(f"Unknown graph backend {graph_backend}")
         self._pipelines = {}
+        self.index = PipelineIndex()
+        self.id = uuid()
+        self.version = 0
+        self.instantiation_executor = instantiation_executor
+        self.instantiation_workers = instantiation_workers
+        self.node_instantiation_timeout = node_instantiation_timeout
+        self._executor: Optional[Executor] = None
+        self.instance_pool = NodeInstancePool(instance_pool_size)
+        self.store = store
+        self.snapshot_interval = snapshot_interval
+        self.graph_backend = graph_backend
+        self._pipeline_class = GRAPH_BACKENDS[graph_backend]
+        self._stored: Dict[str, PipelineMetadata] = {}
+        for metadata in store.metadata() if store is not None else ():
+            self._stored[metadata.id] = metadata
+            self.index.add(metadata)
+
+    @property
+    def executor(self) -> Executor:
+        """The pool the nodes are constructed in, created on first use."""
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if self.instantiation_executor == "process"
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_class(
+                max_workers=self.instantiation_workers
+            )
+        return self._executor
+
+    def invalidate_instances(self, node_class=None) -> int:
+        """Drop the pooled instances of a node class (or all of them), returns how many were dropped."""
+        return self.instance_pool.invalidate(node_class)
+
+    def shutdown(self) -> None:
+        """Shutdown the instantiation pool, without waiting for running constructions, and close the store."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        if self.store is not None:
+            self.store.close()
+
+    def _load(self, pipeline_id: str) -> None:
+        """Restore a stored pipeline, from its snapshot and the edits logged since."""
+        if (stored := self.store.load(pipeline_id)) is None:
+            self._unlist(pipeline_id)
+            raise PipelineNotFoundError(pipeline_id)
+
+        try:
+            document, edits = stored
+            pipeline = self._pipeline_class.from_web_json(document)
+            self._replay(
+                pipeline, [operation for edit in edits for operation in edit]
+            )
+        except Exception as e:
+            logger.error(
+                "Quarantining pipeline %s, which fails to load",
+                pipeline_id,
+                exc_info=e,
+            )
+            self.store.quarantine(pipeline_id, repr(e))
+            self._unlist(pipeline_id)
+            raise
+
+        self.index.remove(pipeline_id)
+        del self._stored[pipeline_id]
+        self._index_pipeline(pipeline)
+
+    def _unlist(self, pipeline_id: str) -> None:
+        """Forget a stored pipeline that can't be loaded."""
+        self._stored.pop(pipeline_id, None)
+        self.index.remove(pipeline_id)
+        self.version += 1
+
+    def _loaded(self, pipeline_id: str) -> bool:
+        """Whether the pipeline is loaded, loading it if it's stored."""
+        if pipeline_id in self._stored:
+            try:
+                self._load(pipeline_id)
+            except Exception:
+                return False
+        return pipeline_id in self._pipelines
+
+    @staticmethod
+    def _replay(pipeline: Pipeline, operations: List[Dict[str, Any]]) -> None:
+        """Apply logged operations, the runs of batch operations as single batches."""
+        batch = []
+        for operation in [*operations, None]:
+            if operation is not None and operation["op"] != "update-pipeline":
+                batch.append(operation)
+                continue
+
+            if batch:
+                pipeline.apply_batch(
+                    PipelineBatch.model_validate(
+                        {"operations": batch}
+                    ).operations
+                )
+                batch = []
+            if operation is not None:
+                pipeline.name = operation["name"]
+                pipeline.description = operation["description"]
+                pipeline.tags = operation.get("tags", pipeline.tags)
+
+    def _load_all(self) -> None:
+        """Restore the stored pipelines not loaded yet, quarantining those that fail to."""
+        for pipeline_id in list(self._stored):
+            self._loaded(pipeline_id)
+
+    def _record(
+        self, pipeline: Pipeline, operations: List[Dict[str, Any]]
+    ) -> None:
+        """Log an edit of a pipeline, saving a snapshot every ``snapshot_interval`` edits."""
+        if self.store is None or not operations:
+            return
+
+        if self.store.append(pipeline.id, operations) >= self.snapshot_interval:
+            # The edit is logged already, the snapshot is retried on the next
+            try:
+                self.store.save(pipeline.id, pipeline.to_web_json())
+            except Exception:
+                logger.exception(
+                    "Failed to save a snapshot of pipeline %s", pipeline.id
+                )
+
+    @staticmethod
+    def _edit_operations(
+        before: Dict[str, Any], after: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """The logged operations that turn the web json ``before`` into ``after``."""
+        diff = PipelineBatchEditor._diff(before, after, 0)
+        operations = [
+            *({"op": "remove-edge", **edge} for edge in diff.removed_edges),
+            *({"op": "remove-node", "id": id_} for id_ in diff.removed_nodes),
+            *(
+                {"op": "add-node", "node": node.model_dump(mode="json")}
+                for node in diff.added_nodes
+            ),
+            *(
+                {
+                    "op": "update-node",
+                    **node.model_dump(
+                        mode="json",
+                        include={"id", "name", "kwargs", "worker_id"},
+                    ),
+                }
+                for node in diff.updated_nodes
+            ),
+            *({"op": "add-edge", **edge} for edge in diff.added_edges),
+        ]
+        if (before["name"], before["description"], before["tags"]) != (
+            after["name"],
+            after["description"],
+            after["tags"],
+        ):
+            operations.append(
+                {
+                    "op": "update-pipeline",
+                    "name": after["name"],
+                    "description": after["description"],
+                    "tags": after["tags"],
+                }
+            )
+        return operations
+
+    def _edit(
+        self, pipeline_id: str, edit: Callable[[Pipeline], Any]
+    ) -> Result[Any, Exception]:
+        """Apply an edit to a pipeline, logging the changes it made.
+
+        The changes are diffed from the web json of the pipeline before and
+        after the edit, only built when there is a store to log them to. The
+        edit is undone if it can't be logged.
+        """
+
+        def apply(pipeline: Pipeline) -> Any:
+            if self.store is None:
+                return edit(pipeline)
+
+            before = pipeline.to_web_json()
+            result = edit(pipeline)
+            after = pipeline.to_web_json()
+            if after is not before:
+                try:
+                    self._record(pipeline, self._edit_operations(before, after))
+                except Exception:
+                    pipeline.update_from_web_json(before)
+                    raise
+            return result
+
+        return self.get_pipeline(pipeline_id).map(apply)
+
+    def _logged_edit(
+        self,
+        pipeline_id: str,
+        edit: Callable[
+            [Pipeline], Tuple[Any, List[Dict[str, Any]], Callable[[], Any]]
+        ],
+    ) -> Result[Any, Exception]:
+        """Apply an edit that returns its result, its logged operations and its undo.
+
+        The edit is only logged if it changed the pipeline, and undone if it
+        can't be logged.
+        """
+
+        def apply(pipeline: Pipeline) -> Any:
+            version = pipeline.version
+            result, operations, undo = edit(pipeline)
+            if self.store is not None and pipeline.version != version:
+                try:
+                    self._record(pipeline, operations)
+                except Exception:
+                    undo()
+                    raise
+            return result
+
+        return self.get_pipeline(pipeline_id).map(apply)
 
     def get_pipeline(self, pipeline_id: str) -> Result[Pipeline, Exception]:
-        """Get a pipeline_service by its ID."""
+        """Get a pipeline_service by its ID, loading it from the store on first access."""
+        if pipeline_id in self._stored:
+            try:
+                self._load(pipeline_id)
+            except Exception as e:
+                return Err(e)
+
         if pipeline_id not in self._pipelines:
             return Err(PipelineNotFoundError(pipeline_id))
 
         return Ok(self._pipelines[pipeline_id])
 
     def create_pipeline(
-        self, name: str, description: str = None
+        self, name: str, description: str = None, tags: Iterable[str] = ()
     ) -> Result[Pipeline, Exception]:
         """Create a new pipeline_service."""
-        pipeline = Pipeline(name=name, description=description)
-        self._pipelines[pipeline.id] = pipeline
+        pipeline = self._pipeline_class(
+            name=name, description=description, tags=tags
+        )
+        self._add_pipeline(pipeline)
         return Ok(pipeline)
 
     def create_pipeline_from_config(
         self, pipeline_config: ChimeraPyPipelineConfig
     ) -> Result[Pipeline, Exception]:
         """Create a new pipeline from a ChimeraPyPipelineConfig."""
-        pipeline = Pipeline.from_pipeline_config(pipeline_config)
-        self._pipelines[pipeline.id] = pipeline
+        pipeline = self._pipeline_class.from_pipeline_config(pipeline_config)
+        self._add_pipeline(pipeline)
         return Ok(pipeline)
 
+    def _index_pipeline(self, pipeline: Pipeline) -> None:
+        self._pipelines[pipeline.id] = pipeline
+        self.index.add(pipeline)
+        pipeline.index = self.index
+
+    def _add_pipeline(self, pipeline: Pipeline) -> None:
+        if self.store is not None:
+            self.store.save(pipeline.id, pipeline.to_web_json())
+        self._index_pipeline(pipeline)
+        self.version += 1
+
+    def _pop_pipeline(self, pipeline: Pipeline) -> Pipeline:
+        if self.store is not None:
+            self.store.delete(pipeline.id)
+        self.version += 1
+        self.index.remove(pipeline.id)
+        pipeline.index = None
+        return self._pipelines.pop(pipeline.id)
+
     def remove_pipeline(self, pipeline_id: str) -> Result[Pipeline, Exception]:
         """Delete a pipeline_service."""
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: self._pipelines.pop(p.id)
-        )
+        return self.get_pipeline(pipeline_id).map(self._pop_pipeline)
 
     def add_node_to(
         self,
@@ -58,51 +398,178 @@ class Pipelines:
         **kwargs,
     ) -> Result[WrappedNode, Exception]:
         """Add a node to a pipeline_service."""
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: p.add_node(node_id, node_package, **kwargs)
-        )
+
+        def edit(pipeline: Pipeline):
+            wrapped_node = pipeline.add_node(node_id, node_package, **kwargs)
+            web_node = wrapped_node.to_web_node().model_dump(mode="json")
+            return (
+                wrapped_node,
+                [{"op": "add-node", "node": web_node}],
+                lambda: pipeline.remove_node(wrapped_node.id),
+            )
+
+        return self._logged_edit(pipeline_id, edit)
 
     def add_edge_to(
         self, pipeline_id, edge: Tuple[str, str], edge_id: str = None
     ) -> Result[Dict[str, WrappedNode], Exception]:
         """Add an edge to a pipeline_service."""
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: p.add_edge(edge[0], edge[1], edge_id=edge_id)
-        )
+        source, sink = edge
+
+        def edit(pipeline: Pipeline):
+            ends = pipeline.add_edge(source, sink, edge_id=edge_id)
+            added = {"source": source, "sink": sink, **pipeline.edges[edge]}
+            return (
+                ends,
+                [{"op": "add-edge", **added}],
+                lambda: pipeline.remove_edge(source, sink),
+            )
+
+        return self._logged_edit(pipeline_id, edit)
 
     def remove_edge_from(
         self, pipeline_id, edge: Tuple[str, str], edge_id: str = None
     ) -> Result[Dict[str, WrappedNode], Exception]:
         """Remove an edge from a pipeline_service."""
+        source, sink = edge
 
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: p.remove_edge(edge[0], edge[1], edge_id=edge_id)
-        )
+        def edit(pipeline: Pipeline):
+            removed_id = (
+                pipeline.edges[source, sink]["id"]
+                if pipeline.has_edge(source, sink)
+                else edge_id
+            )
+            ends = pipeline.remove_edge(source, sink, edge_id=edge_id)
+            return (
+                ends,
+                [
+                    {
+                        "op": "remove-edge",
+                        "source": source,
+                        "sink": sink,
+                        "id": removed_id,
+                    }
+                ],
+                lambda: pipeline.add_edge(source, sink, edge_id=removed_id),
+            )
+
+        return self._logged_edit(pipeline_id, edit)
 
     def remove_node_from(
         self, pipeline_id, node_id
     ) -> Result[WrappedNode, Exception]:
         """Remove a node from a pipeline_service."""
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: p.remove_node(node_id)
+
+        def edit(pipeline: Pipeline):
+            edges = []
+            if node_id in pipeline:
+                edges = [
+                    AddEdgeOperation(source=source, sink=sink, id=data["id"])
+                    for source, sink, data in (
+                        *pipeline.in_edges(node_id, data=True),
+                        *pipeline.out_edges(node_id, data=True),
+                    )
+                ]
+            wrapped_node = pipeline.remove_node(node_id)
+            web_node = wrapped_node.to_web_node()
+            return (
+                wrapped_node,
+                [{"op": "remove-node", "id": node_id}],
+                lambda: pipeline.apply_batch(
+                    [AddNodeOperation(node=web_node), *edges]
+                ),
+            )
+
+        return self._logged_edit(pipeline_id, edit)
+
+    def apply_batch_to(
+        self, pipeline_id, operations: List[PipelineOperation]
+    ) -> Result[PipelineDiff, Exception]:
+        """Apply a batch of operations to a pipeline_service, atomically."""
+        return self._edit(pipeline_id, lambda p: p.apply_batch(operations))
+
+    def add_replicas_to(
+        self,
+        pipeline_id: str,
+        template: TemplateConfig,
+        replicas: ReplicasConfig,
+    ) -> Result[PipelineDiff, Exception]:
+        """Add the replicas of a template to a pipeline_service, atomically."""
+        return self._edit(
+            pipeline_id, lambda p: p.add_replicas(template, replicas)
         )
 
     def get_pipelines_by_name(
         self, name: str
     ) -> Result[List[Pipeline], Exception]:
         """Get pipeline(s) by name."""
-        pipelines = []
-        for pipeline in self._pipelines.values():
-            if pipeline.name == name:
-                pipelines.append(pipeline)
+        ids, _ = self.index.query({"name": name})
+        return Ok(
+            [
+                self._pipelines[pipeline_id]
+                for pipeline_id in ids
+                if self._loaded(pipeline_id)
+            ]
+        )
 
-        return Ok(pipelines)
+    def list_pipelines(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Result[Tuple[List[Dict[str, Any]], Optional[str]], Exception]:
+        """A page of the pipelines, in creation order, from the indexes.
+
+        The stored pipelines are listed from their metadata, only those in
+        the page are loaded, and only if their nodes or edges are requested.
+
+        Parameters
+        ----------
+        filters: Optional[Dict[str, Any]]
+            The name, tag, instantiated or committed status of the pipelines.
+
+        cursor: Optional[str]
+            The cursor of the previous page, None for the first one.
+
+        limit: Optional[int]
+            The maximum number of pipelines in the page, None for all of them.
+
+        fields: Optional[List[str]]
+            The fields of the web JSON of each pipeline in the page, None for
+            all of them.
+
+        Returns
+        -------
+        Result[Tuple[List[Dict[str, Any]], Optional[str]], Exception]
+            The (projected) web JSON of the pipelines, and the cursor of the
+            next page, None if it's the last one.
+        """
+        fields = list(fields or Pipeline.WEB_FIELDS)
+        if unknown := set(fields) - set(Pipeline.WEB_FIELDS):
+            return Err(InvalidQueryError(f"Unknown fields {sorted(unknown)}"))
+
+        try:
+            after = decode_cursor(cursor) if cursor is not None else None
+            ids, last = self.index.query(filters, after=after, limit=limit)
+        except InvalidQueryError as e:
+            return Err(e)
+
+        loads = "nodes" in fields or "edges" in fields
+        page = []
+        for id_ in ids:
+            if id_ in self._stored and not loads:
+                page.append(self._stored[id_].web_fields(fields))
+            elif self._loaded(id_):
+                page.append(self._pipelines[id_].web_fields(fields))
+        return Ok((page, encode_cursor(last) if last is not None else None))
 
     def web_json(
         self, pipeline_id=None
     ) -> Result[List[Dict[str, Any]], Exception]:
         """Returns a JSON representation of the pipelines for the web interface."""
         if pipeline_id is None:
+            self._load_all()
             return Ok(
                 [
                     pipeline.to_web_json()
@@ -112,18 +579,74 @@ class Pipelines:
         else:
             return self.get_pipeline(pipeline_id).map(lambda p: p.to_web_json())
 
+    def web_json_version(self, pipeline_id=None) -> Result[str, Exception]:
+        """Returns a tag that changes whenever the ``web_json`` of the pipeline(s) does.
+
+        Pipelines only ever bump their own version, and the set of pipelines
+        doesn't change without a bump of the service version, so the sum of
+        the versions identifies the state of a given set of pipelines. The
+        service id scopes the tags to a run, as the versions of the pipelines
+        restored from the store restart from their replayed edits.
+
+        The stored pipelines not loaded yet count as version 0: loading one
+        adds its version to the sum, unlisting one bumps the service version.
+        """
+        if pipeline_id is None:
+            return Ok(
+                f"{self.id}-{self.version}-"
+                f"{sum(p.version for p in self._pipelines.values())}"
+            )
+        else:
+            return self.get_pipeline(pipeline_id).map(
+                lambda p: f"{self.id}-{p.id}-{p.version}"
+            )
+
+    def web_json_bytes(self, pipeline_id=None) -> Result[bytes, Exception]:
+        """Returns the JSON encoded ``web_json``, from the pipelines' cached encodings."""
+        if pipeline_id is None:
+            self._load_all()
+            return Ok(
+                b"["
+                + b",".join(
+                    pipeline.to_web_json_bytes()
+                    for pipeline in self._pipelines.values()
+                )
+                + b"]"
+            )
+        else:
+            return self.get_pipeline(pipeline_id).map(
+                lambda p: p.to_web_json_bytes()
+            )
+
     def update_from_web_json(
         self, pipeline_id, web_json: Dict[str, Any]
     ) -> Result[Dict[str, Any], Exception]:
         """Update the pipelines from a JSON representation of the pipelines for the web interface."""
-        return self.get_pipeline(pipeline_id).map(
-            lambda p: p.update_from_web_json(web_json)
+        return self._edit(
+            pipeline_id, lambda p: p.update_from_web_json(web_json)
+        )
+
+    def patch_pipeline(
+        self, pipeline_id, patch: List[Dict[str, Any]]
+    ) -> Result[Dict[str, Any], Exception]:
+        """Update a pipeline with a JSON Patch (RFC 6902) of its web JSON representation."""
+        return self._edit(
+            pipeline_id,
+            lambda p: p.update_from_web_json(
+                apply_patch(p.to_web_json(), patch)
+            ),
         )
 
     async def instantiate_pipeline(
-        self, pipeline_id
+        self,
+        pipeline_id,
+        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
     ) -> Result[Dict[str, Any], Exception]:
-        """Instantiate a pipeline."""
+        """Instantiate a pipeline, constructing its nodes in the instantiation pool.
+
+        ``on_progress`` is called with a progress event as each node is
+        constructed or fails.
+        """
         pipeline = self.get_pipeline(pipeline_id)
         result = pipeline.ok()
         if result.is_none():
@@ -131,7 +654,13 @@ class Pipelines:
         else:
             try:
                 p = result.unwrap()
-                instance = p.instantiate()
+                instance = await p.instantiate_async(
+                    self.executor,
+                    self.node_instantiation_timeout,
+                    on_progress,
+                    self.instance_pool,
+                    self.instantiation_workers,
+                )
                 return Ok(instance)
             except Exception as e:
                 return Err(e)
@@ -0,0 +1,293 @@
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+StoredPipeline = Tuple[Dict[str, Any], List[List[Dict[str, Any]]]]
+
+
+class PipelineMetadata(NamedTuple):
+    """The fields of a stored pipeline that are listed without loading it."""
+
+    id: str
+    name: Optional[str]
+    description: Optional[str]
+    tags: Tuple[str, ...]
+    created_at: float
+
+    # A stored pipeline is neither, until it's loaded
+    instantiated = False
+    committed = False
+
+    def web_fields(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """The given web JSON fields of the pipeline, but its nodes and edges."""
+        return {
+            field: list(self.tags) if field == "tags" else getattr(self, field)
+            for field in fields
+        }
+
+    @classmethod
+    def from_document(
+        cls,
+        pipeline_id: str,
+        document: Dict[str, Any],
+        edits: Iterable[List[Dict[str, Any]]] = (),
+    ) -> "PipelineMetadata":
+        """The metadata of a snapshot, updated by the edits logged since."""
+        metadata = cls(
+            pipeline_id,
+            document.get("name"),
+            document.get("description"),
+            tuple(document.get("tags", ())),
+            document.get("created_at", time.time()),
+        )
+        for operation in (operation for edit in edits for operation in edit):
+            if operation.get("op") == "update-pipeline":
+                metadata = metadata._replace(
+                    name=operation["name"],
+                    description=operation["description"],
+                    tags=tuple(operation.get("tags", metadata.tags)),
+                )
+        return metadata
+
+
+class PipelineStore(ABC):
+    """A durable store of pipelines, as snapshots and logs of the edits since.
+
+    A snapshot is the web JSON document of a pipeline. Each edit appended to
+    its log is a list of batch operations (see ``PipelineOperation``), or the
+    ``update-pipeline`` of its name and description, so that the pipeline is
+    restored by applying the logged edits to its snapshot in order. Saving a
+    new snapshot discards the log.
+
+    The metadata of the pipelines (see ``PipelineMetadata``) is kept up to
+    date with their snapshots and edits, to list them without loading them.
+    A pipeline that fails to load is quarantined: it stays stored, but isn't
+    listed anymore.
+    """
+
+    @abstractmethod
+    def pipeline_ids(self) -> List[str]:
+        """The ids of the stored pipelines, without loading them."""
+
+    @abstractmethod
+    def metadata(self) -> List[PipelineMetadata]:
+        """The metadata of the stored pipelines, in creation order."""
+
+    @abstractmethod
+    def load(self, pipeline_id: str) -> Optional[StoredPipeline]:
+        """The snapshot and the logged edits of a pipeline, None if it isn't stored."""
+
+    @abstractmethod
+    def save(self, pipeline_id: str, document: Dict[str, Any]) -> None:
+        """Save a snapshot of a pipeline, discarding its log."""
+
+    @abstractmethod
+    def append(self, pipeline_id: str, operations: List[Dict[str, Any]]) -> int:
+        """Log an edit of a pipeline, returns the number of edits logged since its snapshot."""
+
+    @abstractmethod
+    def delete(self, pipeline_id: str) -> None:
+        """Delete a pipeline and its log."""
+
+    @abstractmethod
+    def quarantine(self, pipeline_id: str, error: str) -> None:
+        """Stop listing a pipeline that fails to load, keeping it stored with the error."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources of the store."""
+
+
+class SQLitePipelineStore(PipelineStore):
+    """A pipeline store in an SQLite database, in write-ahead logging mode.
+
+    Each call is a transaction committed before it returns, so an edit
+    acknowledged to a client survives a restart of the orchestrator.
+
+    Parameters
+    ----------
+    path: str
+        The path of the database file, created if it doesn't exist.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._lengths: Dict[str, int] = {}
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    pipeline_id TEXT PRIMARY KEY,
+                    document TEXT NOT NULL,
+                    saved_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS edits (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pipeline_id TEXT NOT NULL,
+                    operations TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS edits_by_pipeline
+                    ON edits (pipeline_id, seq);
+                CREATE TABLE IF NOT EXISTS pipelines (
+                    pipeline_id TEXT PRIMARY KEY,
+                    name TEXT,
+                    description TEXT,
+                    tags TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    error TEXT
+                );
+                """
+            )
+            self._index_snapshots()
+
+    def _index_snapshots(self) -> None:
+        """Add the metadata of the snapshots saved before it was kept."""
+        snapshots = self._connection.execute(
+            "SELECT pipeline_id, document FROM snapshots WHERE pipeline_id "
+            "NOT IN (SELECT pipeline_id FROM pipelines)"
+        ).fetchall()
+        if not snapshots:
+            return
+
+        with self._connection:
+            self._connection.execute("BEGIN")
+            for pipeline_id, document in snapshots:
+                edits = self._connection.execute(
+                    "SELECT operations FROM edits WHERE pipeline_id = ? "
+                    "ORDER BY seq",
+                    (pipeline_id,),
+                ).fetchall()
+                self._write_metadata(
+                    PipelineMetadata.from_document(
+                        pipeline_id,
+                        json.loads(document),
+                        (json.loads(edit) for (edit,) in edits),
+                    )
+                )
+
+    def _write_metadata(self, metadata: PipelineMetadata) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO pipelines VALUES (?, ?, ?, ?, ?, NULL)",
+            (
+                metadata.id,
+                metadata.name,
+                metadata.description,
+                json.dumps(metadata.tags),
+                metadata.created_at,
+            ),
+        )
+
+    def pipeline_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT pipeline_id FROM snapshots JOIN pipelines "
+                "USING (pipeline_id) WHERE error IS NULL ORDER BY snapshots.rowid"
+            ).fetchall()
+        return [pipeline_id for (pipeline_id,) in rows]
+
+    def metadata(self) -> List[PipelineMetadata]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT pipeline_id, name, description, tags, created_at "
+                "FROM pipelines WHERE error IS NULL "
+                "ORDER BY created_at, pipeline_id"
+            ).fetchall()
+        return [
+            PipelineMetadata(
+                pipeline_id, name, description, tuple(json.loads(tags)), created
+            )
+            for pipeline_id, name, description, tags, created in rows
+        ]
+
+    def load(self, pipeline_id: str) -> Optional[StoredPipeline]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT document FROM snapshots WHERE pipeline_id = ?",
+                (pipeline_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            edits = self._connection.execute(
+                "SELECT operations FROM edits WHERE pipeline_id = ? ORDER BY seq",
+                (pipeline_id,),
+            ).fetchall()
+
+        self._lengths[pipeline_id] = len(edits)
+        return json.loads(row[0]), [json.loads(edit) for (edit,) in edits]
+
+    def save(self, pipeline_id: str, document: Dict[str, Any]) -> None:
+        encoded = json.dumps(document, separators=(",", ":"))
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (pipeline_id, encoded, time.time()),
+            )
+            self._connection.execute(
+                "DELETE FROM edits WHERE pipeline_id = ?", (pipeline_id,)
+            )
+            self._write_metadata(
+                PipelineMetadata.from_document(pipeline_id, document)
+            )
+        self._lengths[pipeline_id] = 0
+
+    def append(self, pipeline_id: str, operations: List[Dict[str, Any]]) -> int:
+        encoded = json.dumps(operations, separators=(",", ":"))
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.execute(
+                "INSERT INTO edits (pipeline_id, operations) VALUES (?, ?)",
+                (pipeline_id, encoded),
+            )
+            for operation in operations:
+                if operation.get("op") == "update-pipeline":
+                    self._connection.execute(
+                        "UPDATE pipelines SET name = ?, description = ?, "
+                        "tags = COALESCE(?, tags) WHERE pipeline_id = ?",
+                        (
+                            operation["name"],
+                            operation["description"],
+                            json.dumps(operation["tags"])
+                            if "tags" in operation
+                            else None,
+                            pipeline_id,
+                        ),
+                    )
+            length = self._lengths[pipeline_id] = (
+                self._lengths.get(pipeline_id, 0) + 1
+            )
+        return length
+
+    def delete(self, pipeline_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.execute(
+                "DELETE FROM snapshots WHERE pipeline_id = ?", (pipeline_id,)
+            )
+            self._connection.execute(
+                "DELETE FROM edits WHERE pipeline_id = ?", (pipeline_id,)
+            )
+            self._connection.execute(
+                "DELETE FROM pipelines WHERE pipeline_id = ?", (pipeline_id,)
+            )
+        self._lengths.pop(pipeline_id, None)
+
+    def quarantine(self, pipeline_id: str, error: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE pipelines SET error = ? WHERE pipeline_id = ?",
+                (error, pipeline_id),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
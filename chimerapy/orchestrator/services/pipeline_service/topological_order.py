@@ -0,0 +1,92 @@
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set
+
+
+class TopologicalOrder:
+    """A topological order of a DAG, maintained as nodes and edges are added.
+
+    Implements the dynamic topological sort of Pearce and Kelly: an edge that
+    agrees with the current order is accepted in constant time. Otherwise,
+    only the nodes ordered between its sink and its source are searched,
+    either finding a cycle or reordering just the nodes affected by the edge.
+    Removing nodes or edges keeps a topological order valid.
+    """
+
+    def __init__(self) -> None:
+        self._index: Dict[Hashable, int] = {}
+        self._next = 0
+
+    def add_node(self, node: Hashable) -> None:
+        """Add a node, ordered after every other node."""
+        if node not in self._index:
+            self._index[node] = self._next
+            self._next += 1
+
+    def remove_node(self, node: Hashable) -> None:
+        """Remove a node from the order."""
+        self._index.pop(node, None)
+
+    def add_edge(
+        self,
+        source: Hashable,
+        sink: Hashable,
+        succ: Mapping[Hashable, Iterable[Hashable]],
+        pred: Mapping[Hashable, Iterable[Hashable]],
+    ) -> bool:
+        """Reorder the nodes for a new edge ``source -> sink``.
+
+        ``succ`` and ``pred`` are the successors and predecessors of each node
+        in the graph, without the new edge. Returns False, leaving the order
+        untouched, if the edge would create a cycle.
+        """
+        lower, upper = self._index[sink], self._index[source]
+        if lower > upper:
+            return True
+
+        forward = self._search(sink, succ, lower, upper, source)
+        if forward is None:
+            return False
+        backward = self._search(source, pred, lower, upper)
+        self._reorder(backward, forward)
+        return True
+
+    def _search(
+        self,
+        start: Hashable,
+        adj: Mapping[Hashable, Iterable[Hashable]],
+        lower: int,
+        upper: int,
+        target: Optional[Hashable] = None,
+    ) -> Optional[Set[Hashable]]:
+        """The nodes reachable from ``start`` ordered between the bounds.
+
+        Returns None if the ``target`` is reached.
+        """
+        if start == target:
+            return None
+
+        index = self._index
+        visited = {start}
+        stack = [start]
+        while stack:
+            for node in adj[stack.pop()]:
+                if node == target:
+                    return None
+                if node not in visited and lower < index[node] < upper:
+                    visited.add(node)
+                    stack.append(node)
+        return visited
+
+    def _reorder(self, backward: Set[Hashable], forward: Set[Hashable]) -> None:
+        """Move the ``backward`` nodes before the ``forward`` ones, in their slots."""
+        index = self._index
+        nodes: List[Hashable] = sorted(backward, key=index.__getitem__)
+        nodes.extend(sorted(forward, key=index.__getitem__))
+        slots = sorted(index[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            index[node] = slot
+
+    def __getitem__(self, node: Hashable) -> int:
+        return self._index[node]
+
+    def __len__(self) -> int:
+        return len(self._index)
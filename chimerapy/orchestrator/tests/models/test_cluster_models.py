@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pytest
@@ -18,6 +19,7 @@ from chimerapy.orchestrator.models.cluster_models import (
     ClusterState,
     NodeState,
     RegisteredMethod,
+    SubscriptionFilter,
     WorkerState,
 )
 from chimerapy.orchestrator.tests.base_test import BaseTest
@@ -221,3 +223,59 @@ class TestClusterModels(BaseTest):
                 },
             )
         }
+
+    def test_node_logdir(self):
+        node = _NodeState(id="n1", logdir=Path("/tmp24/w1/n1"))
+        assert NodeState.from_cp_node_state(node).logdir == "/tmp24/w1/n1"
+
+        state = _ManagerState(
+            id="manager1",
+            workers={"w1": _WorkerState(id="w1", nodes={"n1": node})},
+        )
+        manager_state = ClusterState.from_cp_manager_state(
+            state, zeroconf_discovery=False
+        )
+        assert manager_state.workers["w1"].nodes["n1"].logdir == "/tmp24/w1/n1"
+
+    def test_from_manager_dict(self, m_w_populated):
+        wire_dict = json.loads(m_w_populated.to_json())
+        manager_state = ClusterState.from_manager_dict(
+            wire_dict, zeroconf_discovery=True
+        )
+
+        assert manager_state == ClusterState.from_cp_manager_state(
+            m_w_populated, zeroconf_discovery=True
+        )
+        assert manager_state.model_dump(mode="json") == {
+            **wire_dict,
+            "zeroconf_discovery": True,
+        }
+
+    def test_subscription_filter(self, m_w_populated):
+        state = json.loads(m_w_populated.to_json())
+        assert SubscriptionFilter().project(state) == state
+
+        projected = SubscriptionFilter(workers=["w2"]).project(state)
+        assert list(projected["workers"]) == ["w2"]
+        assert projected["workers"]["w2"] == state["workers"]["w2"]
+
+        projected = SubscriptionFilter(nodes=["n1"], fields=["fsm"]).project(
+            state
+        )
+        assert projected["workers"] == {
+            "w1": {
+                **state["workers"]["w1"],
+                "nodes": {"n1": {"id": "n1", "fsm": "NULL"}},
+            }
+        }
+        assert projected["logdir"] == state["logdir"]
+
+    def test_subscription_filter_validation(self):
+        with pytest.raises(ValueError):
+            SubscriptionFilter(fields=["not_a_field"])
+        with pytest.raises(ValueError):
+            SubscriptionFilter.model_validate({"sessions": ["s1"]})
+        assert SubscriptionFilter().is_empty
+        assert hash(SubscriptionFilter(workers=["w1", "w2"])) == hash(
+            SubscriptionFilter(workers=["w2", "w1"])
+        )
@@ -1,9 +1,13 @@
 import json
 
 import pytest
+from pydantic import ValidationError
 
 from chimerapy.orchestrator.models.pipeline_config import (
     ChimeraPyPipelineConfig,
+    ReplicasConfig,
+    TemplateConfig,
+    TemplateExpansionError,
 )
 from chimerapy.orchestrator.tests.base_test import BaseTest
 from chimerapy.orchestrator.tests.utils import get_test_file_path
@@ -60,3 +64,76 @@ class TestPipelineConfig(BaseTest):
         assert manager.port == 8000
         assert manager.logdir == "/tmp/logs"
         assert not manager.zeroconf
+
+    def test_expand_templates(self):
+        with get_test_file_path("templated_pipeline.json").open() as f:
+            config = ChimeraPyPipelineConfig.model_validate(json.load(f))
+
+        expanded = config.expand_templates()
+        assert expanded.templates == [] and expanded.replicas == []
+        assert [node.name for node in expanded.nodes] == [
+            "dashboard",
+            "p1-webcam",
+            "p1-ShowWindow",
+            "p2-webcam",
+            "p2-ShowWindow",
+            "p3-webcam",
+            "p3-ShowWindow",
+        ]
+        assert expanded.nodes[3].kwargs == {
+            "camera": "/dev/video2",
+            "fps": 30,
+            "label": "p2-camera-2",
+            "name": "p2-webcam",
+        }
+        assert expanded.adj[:2] == [
+            ("p1-webcam", "p1-ShowWindow"),
+            ("p1-webcam", "dashboard"),
+        ]
+        assert expanded.mappings == {
+            "server": ["dashboard"],
+            "worker-1": ["p1-webcam", "p1-ShowWindow"],
+            "worker-2": ["p2-webcam", "p2-ShowWindow"],
+            "worker-3": ["p3-webcam", "p3-ShowWindow"],
+        }
+        # The config itself is left as is
+        assert len(config.nodes) == 1
+
+    def test_replicas_of_unknown_templates(self):
+        with get_test_file_path("templated_pipeline.json").open() as f:
+            config = json.load(f)
+
+        config["replicas"][0]["template"] = "missing"
+        with pytest.raises(ValidationError, match="Template missing not found"):
+            ChimeraPyPipelineConfig.model_validate(config)
+
+        config["templates"] *= 2
+        with pytest.raises(ValidationError, match="Duplicate templates"):
+            ChimeraPyPipelineConfig.model_validate(config)
+
+    def test_replicas(self):
+        template = TemplateConfig(
+            name="sensor",
+            nodes=[
+                {"registry_name": "Node", "name": "n", "kwargs": {"a": "{a}"}}
+            ],
+        )
+        replicas = ReplicasConfig(
+            count=3, start=0, workers=["w1", "w2"], parameters={"a": [1]}
+        )
+        expanded = replicas.expand(template)
+        assert [r.worker_id for r in expanded] == ["w1", "w2", "w1"]
+        assert [r.nodes[0].name for r in expanded] == [
+            "sensor-0-n",
+            "sensor-1-n",
+            "sensor-2-n",
+        ]
+        assert expanded[0].nodes[0].kwargs["a"] == [1]
+        assert template.nodes[0].kwargs == {"a": "{a}"}
+
+        with pytest.raises(TemplateExpansionError):
+            ReplicasConfig(parameters={"a": "{missing}"}).expand(template)
+        with pytest.raises(TemplateExpansionError):
+            ReplicasConfig().expand(
+                template.model_copy(update={"adj": [("n", "other")]})
+            )
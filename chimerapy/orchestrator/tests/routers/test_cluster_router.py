@@ -1,6 +1,7 @@
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from starlette.requests import Request
 
 from chimerapy.orchestrator.models.cluster_models import (
     ClusterState,
@@ -74,6 +75,53 @@ class TestClusterRouter(BaseTest):
             state = UpdateMessage.model_validate(state)
             assert state.signal == UpdateMessageType.NETWORK_UPDATE
 
+    @pytest.mark.anyio
+    async def test_delta_updates(self, cluster_manager_and_client):
+        manager, client = cluster_manager_and_client
+
+        with client.websocket_connect("/cluster/updates?delta=true") as ws:
+            state = ws.receive_json()
+            assert state["signal"] == UpdateMessageType.NETWORK_UPDATE
+            ws.send_json({"type": "resync"})
+            snapshot = ws.receive_json()
+            assert snapshot["data"] == state["data"]
+
+    @pytest.mark.anyio
+    async def test_filtered_updates(self, cluster_manager_and_client):
+        manager, client = cluster_manager_and_client
+
+        with client.websocket_connect("/cluster/updates?workers=w1") as ws:
+            state = ws.receive_json()
+            assert state["data"]["workers"] == {}
+            ws.send_json(
+                {"type": "subscribe", "filters": {"fields": ["diagnostics"]}}
+            )
+            assert (
+                ws.receive_json()["signal"] == UpdateMessageType.NETWORK_UPDATE
+            )
+            ws.send_json({"type": "subscribe", "filters": {"fields": ["ip"]}})
+            assert "error" in ws.receive_json()
+
+    @pytest.mark.anyio
+    async def test_msgpack_updates(self, cluster_manager_and_client):
+        msgpack = pytest.importorskip("msgpack")
+        manager, client = cluster_manager_and_client
+
+        with client.websocket_connect(
+            "/cluster/updates", subprotocols=["msgpack", "json"]
+        ) as ws:
+            assert ws.accepted_subprotocol == "msgpack"
+            state = msgpack.unpackb(ws.receive_bytes())
+            assert state["signal"] == UpdateMessageType.NETWORK_UPDATE
+
+        with client.websocket_connect(
+            "/cluster/updates", subprotocols=["json"]
+        ) as ws:
+            assert ws.accepted_subprotocol == "json"
+            assert ws.receive_json()["signal"] == (
+                UpdateMessageType.NETWORK_UPDATE
+            )
+
     @pytest.mark.anyio
     async def test_zeroconf_toggle(self, cluster_manager_and_client):
         manager, client = cluster_manager_and_client
@@ -108,3 +156,33 @@ class TestClusterRouter(BaseTest):
 
         response = client.post("/cluster/reset")
         assert response.status_code == 409
+
+    @pytest.mark.anyio
+    async def test_events_subscribe_when_streamed(
+        self, cluster_manager_and_client
+    ):
+        manager, _ = cluster_manager_and_client
+        router = ClusterRouter(manager)
+
+        def clients():
+            metrics = manager.get_updates_metrics()
+            return len(metrics["network"]["clients"]), len(
+                metrics["pipeline"]["clients"]
+            )
+
+        before = clients()
+        request = Request({"type": "http", "query_string": b"", "headers": []})
+        responses = [
+            await router.get_cluster_events(request),
+            await router.get_pipeline_events(request),
+        ]
+        # Not subscribed until the response is streamed
+        assert clients() == before
+
+        events = [response.body_iterator for response in responses]
+        for body in events:
+            assert await body.__anext__()
+        assert clients() == (before[0] + 1, before[1] + 1)
+        for body in events:
+            await body.aclose()
+        assert clients() == before
@@ -85,6 +85,217 @@ class TestPipelineRouter(BaseTest):
         assert pipelines.status_code == 200
         assert len(pipelines.json()) == 2
 
+    def test_conditional_gets(self, pipeline_client):
+        for url in ["/pipeline/list", "/pipeline/list-nodes"]:
+            response = pipeline_client.get(url)
+            etag = response.headers["etag"]
+            not_modified = pipeline_client.get(
+                url, headers={"If-None-Match": f'"stale", W/{etag}'}
+            )
+            assert not_modified.status_code == 304
+            assert not_modified.content == b""
+            assert not_modified.headers["etag"] == etag
+
+        pipeline_list = pipeline_client.get("/pipeline/list")
+        pipeline_id = pipeline_list.json()[1]["id"]
+        pipeline = pipeline_client.get(f"/pipeline/get/{pipeline_id}")
+        assert (
+            pipeline_client.get(
+                f"/pipeline/get/{pipeline_id}",
+                headers={"If-None-Match": pipeline.headers["etag"]},
+            ).status_code
+            == 304
+        )
+
+        node = pipeline_client.post(
+            f"/pipeline/add-node/{pipeline_id}",
+            json={"name": "WebcamNode", "registry_name": "WebcamNode"},
+        ).json()
+        pipeline_client.post(f"/pipeline/remove-node/{pipeline_id}", json=node)
+
+        for url, response in [
+            ("/pipeline/list", pipeline_list),
+            (f"/pipeline/get/{pipeline_id}", pipeline),
+        ]:
+            modified = pipeline_client.get(
+                url, headers={"If-None-Match": response.headers["etag"]}
+            )
+            assert modified.status_code == 200
+            assert modified.headers["etag"] != response.headers["etag"]
+            assert modified.json() == response.json()
+
+    def test_invalidate_instance_pool(self):
+        pipelines = Pipelines()
+        app = FastAPI()
+        app.include_router(PipelineRouter(pipelines))
+        client = TestClient(app)
+
+        pipelines.instance_pool.release(
+            WebcamNode, {"name": "webcam"}, object()
+        )
+        response = client.delete("/pipeline/instance-pool")
+        assert response.status_code == 200
+        assert response.json() == {"dropped": 1}
+        assert len(pipelines.instance_pool) == 0
+
+    def test_paginated_list(self):
+        app = FastAPI()
+        app.include_router(PipelineRouter(Pipelines()))
+        client = TestClient(app)
+        for j in range(5):
+            client.put(
+                "/pipeline/create",
+                json={
+                    "name": f"pipeline{j}",
+                    "tags": ["even"] if j % 2 else [],
+                },
+            )
+
+        response = client.get(
+            "/pipeline/list", params={"limit": 2, "fields": "id,name"}
+        )
+        assert response.status_code == 200
+        assert [p["name"] for p in response.json()] == [
+            "pipeline0",
+            "pipeline1",
+        ]
+        assert set(response.json()[0]) == {"id", "name"}
+
+        names = [p["name"] for p in response.json()]
+        while "link" in response.headers:
+            next_url = response.headers["link"].split(";")[0].strip("<>")
+            response = client.get(next_url)
+            names.extend(p["name"] for p in response.json())
+        assert names == [f"pipeline{j}" for j in range(5)]
+
+        tagged = client.get(
+            "/pipeline/list", params={"tag": "even", "fields": "name,tags"}
+        )
+        assert tagged.json() == [
+            {"name": "pipeline1", "tags": ["even"]},
+            {"name": "pipeline3", "tags": ["even"]},
+        ]
+        assert (
+            client.get(
+                "/pipeline/list",
+                params={"tag": "even", "fields": "name,tags"},
+                headers={"If-None-Match": tagged.headers["etag"]},
+            ).status_code
+            == 304
+        )
+
+        for params in [{"fields": "id,secret"}, {"cursor": "invalid"}]:
+            assert (
+                client.get("/pipeline/list", params=params).status_code == 422
+            )
+
+    def test_add_replicas(self, pipeline_client):
+        pipeline_id = pipeline_client.put(
+            "/pipeline/create", json={"name": "replicas"}
+        ).json()["id"]
+        request = {
+            "template": {
+                "name": "participant",
+                "nodes": ["WebcamNode", "ShowWindow"],
+                "adj": [["WebcamNode", "ShowWindow"]],
+            },
+            "replicas": {"count": 4, "workers": ["worker-{index}"]},
+        }
+
+        response = pipeline_client.post(
+            f"/pipeline/add-replicas/{pipeline_id}", json=request
+        )
+        assert response.status_code == 200
+        diff = response.json()
+        assert len(diff["added_nodes"]) == 8
+        assert len(diff["added_edges"]) == 4
+        assert diff["added_nodes"][7]["name"] == "participant-4-ShowWindow"
+        assert diff["added_nodes"][7]["worker_id"] == "worker-4"
+
+        request["replicas"]["links"] = [["ShowWindow", "missing"]]
+        response = pipeline_client.post(
+            f"/pipeline/add-replicas/{pipeline_id}", json=request
+        )
+        assert response.status_code == 422
+        pipeline = pipeline_client.get(f"/pipeline/get/{pipeline_id}").json()
+        assert len(pipeline["nodes"]) == 8
+
+    def test_batch(self, pipeline_client):
+        pipeline_id = pipeline_client.put(
+            "/pipeline/create", json={"name": "batch"}
+        ).json()["id"]
+
+        operations = [
+            {
+                "op": "add-node",
+                "node": {
+                    "id": "webcam",
+                    "name": "webcam",
+                    "registry_name": "WebcamNode",
+                },
+            },
+            {
+                "op": "add-node",
+                "node": {
+                    "id": "show",
+                    "name": "show",
+                    "registry_name": "ShowWindow",
+                },
+            },
+            {"op": "add-edge", "source": "webcam", "sink": "show"},
+        ]
+        failing = pipeline_client.post(
+            f"/pipeline/batch/{pipeline_id}",
+            json={
+                "operations": [
+                    *operations,
+                    {"op": "add-edge", "source": "show", "sink": "webcam"},
+                ]
+            },
+        )
+        assert failing.status_code == 500
+        assert "Operation 3 (add-edge)" in failing.json()["detail"]
+        assert (
+            pipeline_client.get(f"/pipeline/get/{pipeline_id}").json()["nodes"]
+            == []
+        )
+
+        diff = pipeline_client.post(
+            f"/pipeline/batch/{pipeline_id}", json={"operations": operations}
+        )
+        assert diff.status_code == 200
+        assert len(diff.json()["added_nodes"]) == 2
+        assert diff.json()["added_edges"][0]["source"] == "webcam"
+
+        pipeline = pipeline_client.get(f"/pipeline/get/{pipeline_id}")
+        patched = pipeline_client.patch(
+            f"/pipeline/update/{pipeline_id}",
+            json=[
+                {"op": "test", "path": "/nodes/1/id", "value": "show"},
+                {"op": "replace", "path": "/nodes/1/worker_id", "value": "w"},
+                {"op": "remove", "path": "/edges/0"},
+            ],
+            headers={"If-Match": pipeline.headers["etag"]},
+        )
+        assert patched.status_code == 200
+        assert patched.json()["nodes"][1]["worker_id"] == "w"
+        assert patched.json()["edges"] == []
+
+        stale = pipeline_client.patch(
+            f"/pipeline/update/{pipeline_id}",
+            json=[{"op": "replace", "path": "/name", "value": "stale"}],
+            headers={"If-Match": pipeline.headers["etag"]},
+        )
+        assert stale.status_code == 412
+
+        invalid = pipeline_client.patch(
+            f"/pipeline/update/{pipeline_id}",
+            json=[{"op": "remove", "path": "/nodes/5"}],
+        )
+        assert invalid.status_code == 422
+
+        pipeline_client.delete(f"/pipeline/remove/{pipeline_id}")
+
     def test_node_edge_operations(self, pipeline_client):
         pipeline = pipeline_client.get("/pipeline/list").json()[0]
         pipeline_id = pipeline["id"]
@@ -0,0 +1,222 @@
+import asyncio
+import json
+
+import pytest
+
+from chimerapy.orchestrator.models.cluster_models import SubscriptionFilter
+from chimerapy.orchestrator.routers.updates_session import (
+    HEARTBEAT,
+    EventStream,
+    UpdatesSession,
+)
+from chimerapy.orchestrator.services.cluster_service.frames import Frame
+from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    UpdatesBroadcaster,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.client_state = None
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    def client_sends(self, message):
+        self.incoming.put_nowait({"type": "websocket.receive", "text": message})
+
+    def disconnect(self):
+        self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+
+def state_frame(seq):
+    return Frame({"signal": "NETWORK_UPDATE", "data": {"step": seq}}, seq=seq)
+
+
+class TestUpdatesSession(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.mark.anyio
+    async def test_bursts_are_conflated(self):
+        ws = FakeWebSocket()
+        session = UpdatesSession(ws, lambda msg: msg == "STOP", max_rate=20)
+        for seq in range(1, 101):
+            session.queue.put_nowait(state_frame(seq))
+
+        task = asyncio.create_task(session.run())
+        await asyncio.sleep(0.01)
+        for seq in range(101, 111):
+            session.queue.put_nowait(state_frame(seq))
+        session.queue.put_nowait("STOP")
+        await asyncio.wait_for(task, timeout=1)
+
+        assert [msg["data"]["step"] for msg in ws.sent] == [100, 110]
+        assert session.stats.emitted == 2
+        assert session.stats.conflated == 108
+
+    @pytest.mark.anyio
+    async def test_no_conflation_without_rate(self):
+        ws = FakeWebSocket()
+        session = UpdatesSession(ws, lambda msg: msg == "STOP")
+        for seq in range(1, 4):
+            session.queue.put_nowait(state_frame(seq))
+        session.queue.put_nowait("STOP")
+        await asyncio.wait_for(session.run(), timeout=1)
+
+        assert len(ws.sent) == 3
+        assert session.stats.conflated == 0
+
+    @pytest.mark.anyio
+    async def test_client_messages(self):
+        ws, received = FakeWebSocket(), []
+        session = UpdatesSession(
+            ws, lambda msg: msg == "STOP", on_message=received.append
+        )
+        task = asyncio.create_task(session.run())
+
+        ws.client_sends('{"type": "resync"}')
+        ws.client_sends("not json")
+        session.queue.put_nowait(state_frame(1))
+        await asyncio.sleep(0.01)
+        assert received == [{"type": "resync"}]
+        assert len(ws.sent) == 1
+
+        ws.disconnect()
+        await asyncio.wait_for(task, timeout=1)
+        assert session.closed
+
+    @pytest.mark.anyio
+    async def test_single_task_per_idle_session(self):
+        ws = FakeWebSocket()
+        session = UpdatesSession(ws, lambda msg: msg == "STOP")
+        baseline = len(asyncio.all_tasks())
+        task = asyncio.create_task(session.run())
+        await asyncio.sleep(0.01)
+        assert len(asyncio.all_tasks()) == baseline + 1
+
+        # The updates are sent by a sender that ends with the burst
+        session.queue.put_nowait(state_frame(1))
+        session.queue.put_nowait(state_frame(2))
+        await asyncio.sleep(0.01)
+        assert len(ws.sent) == 2
+        assert len(asyncio.all_tasks()) == baseline + 1
+
+        session.queue.put_nowait("STOP")
+        await asyncio.wait_for(task, timeout=1)
+        assert session.closed
+
+    @pytest.mark.anyio
+    async def test_disconnect_ends_session(self):
+        broadcaster = UpdatesBroadcaster("STOP")
+        await broadcaster.initialize()
+        broadcast_task = asyncio.create_task(broadcaster.start_broadcast())
+
+        sessions = [
+            UpdatesSession(FakeWebSocket(), lambda msg: msg == "STOP")
+            for _ in range(10)
+        ]
+        tasks = []
+        for session in sessions:
+            session.stats = await broadcaster.add_client(session.queue)
+            tasks.append(asyncio.create_task(session.run()))
+
+        await broadcaster.put_update({"data": 1})
+        await asyncio.sleep(0.01)
+        assert all(len(session.ws.sent) == 1 for session in sessions)
+
+        for session in sessions:
+            session.ws.disconnect()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+        for session in sessions:
+            await broadcaster.remove_client(session.queue)
+            await broadcaster.remove_client(session.queue)  # idempotent
+        assert broadcaster.metrics()["clients"] == []
+
+        broadcaster.enqueue_sentinel()
+        await broadcast_task
+
+
+class TestEventStream(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @staticmethod
+    async def collect(stream):
+        return [event async for event in stream.events()]
+
+    @pytest.mark.anyio
+    async def test_events(self):
+        stream = EventStream(lambda msg: msg == "STOP", heartbeat=0)
+        stream.queue.put_nowait(state_frame(1))
+        stream.queue.put_nowait(Frame({"signal": "STOPPED"}))
+        stream.queue.put_nowait(state_frame(1))  # Already sent
+        stream.queue.put_nowait("STOP")
+        events = await asyncio.wait_for(self.collect(stream), timeout=1)
+
+        assert events == [
+            'id: 1\ndata: {"signal":"NETWORK_UPDATE","data":{"step":1},"seq":1}\n\n',
+            'data: {"signal":"STOPPED"}\n\n',
+        ]
+        assert stream.stats.emitted == 2
+
+    @pytest.mark.anyio
+    async def test_events_are_shared(self):
+        frame = state_frame(1)
+        assert frame.event() is frame.event()
+
+    @pytest.mark.anyio
+    async def test_filtered_events(self):
+        view = SubscriptionFilter(workers=["w1"])
+        stream = EventStream(lambda msg: msg == "STOP", view, heartbeat=0)
+        stream.queue.put_nowait(
+            Frame(
+                {"data": {"workers": {"w1": {"id": "w1"}, "w2": {"id": "w2"}}}},
+                seq=1,
+            )
+        )
+        stream.queue.put_nowait(None)
+        (event,) = await asyncio.wait_for(self.collect(stream), timeout=1)
+
+        data = json.loads(event.split("data: ", 1)[1])
+        assert list(data["data"]["workers"]) == ["w1"]
+
+    @pytest.mark.anyio
+    async def test_heartbeat(self):
+        stream = EventStream(lambda msg: msg == "STOP", heartbeat=0.01)
+        events = stream.events()
+        assert (
+            await asyncio.wait_for(events.__anext__(), timeout=1) == HEARTBEAT
+        )
+
+        stream.queue.put_nowait(state_frame(1))
+        assert (await events.__anext__()).startswith("id: 1\n")
+        await events.aclose()
+
+    @pytest.mark.anyio
+    async def test_replay_from_last_event_id(self):
+        broadcaster = UpdatesBroadcaster("STOP")
+        await broadcaster.initialize()
+        broadcast_task = asyncio.create_task(broadcaster.start_broadcast())
+        for step in range(1, 6):
+            await broadcaster.put_update({"data": {"step": step}})
+        await asyncio.sleep(0.01)
+
+        stream = EventStream(lambda msg: msg == "STOP", heartbeat=0)
+        await broadcaster.add_client(stream.queue, last_seq=3)
+        broadcaster.enqueue_sentinel()
+        await broadcast_task
+        events = await asyncio.wait_for(self.collect(stream), timeout=1)
+
+        assert [event.split("\n", 1)[0] for event in events] == [
+            "id: 4",
+            "id: 5",
+        ]
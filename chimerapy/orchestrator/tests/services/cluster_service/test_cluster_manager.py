@@ -5,10 +5,19 @@ import pytest
 import chimerapy.engine as cpe
 from chimerapy.engine.utils import get_ip_address
 from chimerapy.orchestrator.models.cluster_models import (
+    PlacementRequest,
     UpdateMessage,
     UpdateMessageType,
 )
-from chimerapy.orchestrator.services.cluster_service import ClusterManager
+from chimerapy.orchestrator.services.cluster_service import (
+    ClusterManager,
+)
+from chimerapy.orchestrator.services.cluster_service import (
+    cluster_manager as cluster_manager_module,
+)
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    PlacementError,
+)
 from chimerapy.orchestrator.services.pipeline_service import Pipelines
 from chimerapy.orchestrator.tests.base_test import BaseTest
 
@@ -94,8 +103,8 @@ class TestClusterManager(BaseTest):
 
         assert client_queue.qsize() == 1
         msg = await client_queue.get()
-        assert msg["signal"] == UpdateMessageType.NETWORK_UPDATE
-        assert msg["data"] is None
+        assert msg.payload["signal"] == UpdateMessageType.NETWORK_UPDATE
+        assert msg.payload["data"] is None
 
     @pytest.mark.anyio
     async def test_zeroconf(self, cluster_manager):
@@ -105,6 +114,27 @@ class TestClusterManager(BaseTest):
         cluster_manager.disable_zeroconf_discovery()
         assert cluster_manager.is_zeroconf_discovery_enabled() is False
 
+    def test_place_pipeline(self, cluster_manager, pipelines, dev_worker):
+        pipeline = pipelines.create_pipeline(name="placed").unwrap()
+        screen = pipeline.add_node(node_name="ScreenCaptureNode")
+        show = pipeline.add_node("ShowWindow")
+
+        plan = cluster_manager.place_pipeline(
+            pipeline.id, PlacementRequest(strategy="round-robin")
+        ).unwrap()
+        assert plan.assignments == {
+            screen.id: dev_worker.id,
+            show.id: dev_worker.id,
+        }
+        assert pipeline.can_instantiate()
+
+        result = cluster_manager.place_pipeline(
+            pipeline.id, PlacementRequest(pins={show.id: "unknown"})
+        )
+        with pytest.raises(PlacementError):
+            result.unwrap()
+        pipelines.remove_pipeline(pipeline.id)
+
     @pytest.mark.anyio
     @pytest.mark.timeout(5 * MINUTE)
     async def test_pipeline_operations(self, cluster_manager, pipeline_test):
@@ -160,3 +190,72 @@ class TestClusterManager(BaseTest):
         assert cluster_manager._active_pipeline is None
         assert not pipeline_test.instantiated
         assert not pipeline_test.committed
+
+
+@pytest.mark.slow
+class TestCommitOutcome(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.fixture
+    def cluster_manager(self, monkeypatch):
+        manager = ClusterManager(
+            pipeline_service=Pipelines(),
+            logdir="./logs",
+            port=0,
+            commit_mode="incremental",
+        )
+        # The engine's manager answers each commit with the next result
+        results = []
+
+        async def async_reset(keep_workers=True):
+            pass
+
+        async def async_commit(graph, mapping):
+            return results.pop(0)
+
+        async def recommit(manager, pipeline, plan):
+            return results.pop(0)
+
+        monkeypatch.setattr(manager._manager, "async_reset", async_reset)
+        monkeypatch.setattr(manager._manager, "async_commit", async_commit)
+        monkeypatch.setattr(cluster_manager_module, "recommit", recommit)
+        manager.results = results
+        yield manager
+        manager._manager.shutdown()
+
+    @pytest.fixture
+    def pipeline(self, cluster_manager):
+        pipeline = cluster_manager._pipeline_service.create_pipeline(
+            "committed"
+        ).unwrap()
+        for node_name in ("ScreenCaptureNode", "ShowWindow"):
+            pipeline.add_node(node_name).worker_id = "w1"
+        pipeline.instantiate()
+        cluster_manager._active_pipeline = pipeline
+        return pipeline
+
+    @pytest.mark.anyio
+    async def test_failed_commits(self, cluster_manager, pipeline):
+        cluster_manager.results.extend([False, True, False, True])
+
+        assert not await cluster_manager._commit_active_pipeline()
+        assert not pipeline.committed
+        assert cluster_manager._deployment is None
+        assert cluster_manager.last_commit["success"] is False
+
+        assert await cluster_manager._commit_active_pipeline()
+        assert pipeline.committed
+        assert cluster_manager._deployment is not None
+
+        # After a failed incremental commit, the next one is a full one
+        pipeline.committed = False
+        assert not await cluster_manager._commit_active_pipeline()
+        assert cluster_manager.last_commit["mode"] == "incremental"
+        assert not pipeline.committed
+        assert cluster_manager._deployment is None
+
+        assert await cluster_manager._commit_active_pipeline()
+        assert cluster_manager.last_commit["mode"] == "full"
+        assert pipeline.committed
@@ -0,0 +1,258 @@
+import inspect
+
+import pytest
+
+from chimerapy.engine.eventbus import EventBus
+from chimerapy.engine.manager import Manager
+from chimerapy.engine.manager.worker_handler_service import (
+    WorkerHandlerService,
+)
+from chimerapy.engine.node import Node
+from chimerapy.orchestrator.registry.utils import step_node
+from chimerapy.orchestrator.services.cluster_service.deployment import (
+    Deployment,
+    recommit,
+)
+from chimerapy.orchestrator.services.pipeline_service import (
+    CompactPipeline,
+    Pipeline,
+)
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class FakeManager:
+    """The requests ``recommit`` makes, failing the destruction of some nodes."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.worker_handler = self
+        self.eventbus = self
+        self.requests = []
+
+    def _register_graph(self, graph):
+        self.requests.append(("register",))
+
+    def _map_graph(self, worker_graph_map):
+        pass
+
+    async def asend(self, event):
+        self.requests.append(("event", event.type))
+
+    async def _async_request_node_destruction(self, worker_id, node_id):
+        self.requests.append(("destroy", node_id))
+        return node_id not in self.failing
+
+    async def _async_request_node_creation(self, worker_id, node_id):
+        self.requests.append(("create", node_id))
+        return True
+
+    async def _async_request_node_pub_table(self, worker_id):
+        return True
+
+    async def _async_request_connection_creation(self, worker_id):
+        self.requests.append(("connect", worker_id))
+        return True
+
+
+class TestDeployment(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.fixture(scope="session", autouse=True)
+    def deployed_step_node(self):
+        @step_node(add_to_registry=True)
+        class DeployedStepNode(Node):
+            def __init__(self, name, gain=1):
+                super().__init__(name=name)
+                self.gain = gain
+
+            def step(self, inputs):
+                return inputs
+
+        return DeployedStepNode
+
+    @pytest.fixture(params=[Pipeline, CompactPipeline])
+    def pipeline(self, request):
+        """a (w1) -> b (w2), c (w3) -> d (w3)."""
+        pipeline = request.param(name="deployed")
+        for name, worker_id in (
+            ("a", "w1"),
+            ("b", "w2"),
+            ("c", "w3"),
+            ("d", "w3"),
+        ):
+            node = pipeline.add_node("DeployedStepNode", name=name)
+            node.worker_id = worker_id
+        ids = self.ids(pipeline)
+        pipeline.add_edge(ids["a"], ids["b"])
+        pipeline.add_edge(ids["c"], ids["d"])
+        pipeline.instantiate()
+        return pipeline
+
+    @staticmethod
+    def ids(pipeline):
+        return {
+            wrapped_node.kwargs["name"]: node_id
+            for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+        }
+
+    @staticmethod
+    def names(pipeline, node_ids):
+        return {
+            pipeline.nodes[node_id]["wrapped_node"].kwargs["name"]
+            for node_id in node_ids
+        }
+
+    @staticmethod
+    def recommit(pipeline, update, workers=("w1", "w2", "w3")):
+        """The plan to commit the pipeline again once updated."""
+        deployment = Deployment.of(pipeline)
+        pipeline.destroy()
+        update(pipeline)
+        pipeline.instantiate()
+        return deployment, deployment.diff(pipeline, workers)
+
+    def test_unchanged(self, pipeline):
+        deployment, plan = self.recommit(pipeline, lambda p: None)
+        assert plan.kept == deployment.nodes
+        assert plan.destroyed == {}
+        assert plan.created == []
+        assert plan.workers == set()
+
+    def test_changed_sink(self, pipeline):
+        ids = self.ids(pipeline)
+
+        def update(p):
+            p.nodes[ids["b"]]["wrapped_node"].kwargs["gain"] = 2
+
+        deployment, plan = self.recommit(pipeline, update)
+        assert plan.created == [ids["b"]]
+        assert set(plan.destroyed) == {ids["b"]}
+        assert self.names(pipeline, plan.kept) == {"a", "c", "d"}
+        assert plan.workers == {"w2"}
+
+    def test_changed_source(self, pipeline):
+        ids = self.ids(pipeline)
+
+        def update(p):
+            p.nodes[ids["a"]]["wrapped_node"].kwargs["gain"] = 2
+
+        _, plan = self.recommit(pipeline, update)
+        # Its subscriber is redeployed too
+        assert self.names(pipeline, plan.created) == {"a", "b"}
+        assert self.names(pipeline, plan.kept) == {"c", "d"}
+        assert plan.workers == {"w1", "w2"}
+
+    def test_moved_node(self, pipeline):
+        ids = self.ids(pipeline)
+
+        def update(p):
+            p.nodes[ids["b"]]["wrapped_node"].worker_id = "w3"
+
+        _, plan = self.recommit(pipeline, update)
+        # All the nodes of the worker it's moved to are redeployed
+        assert self.names(pipeline, plan.created) == {"b", "c", "d"}
+        assert self.names(pipeline, plan.kept) == {"a"}
+        assert plan.workers == {"w3"}
+
+    def test_added_and_removed_nodes(self, pipeline):
+        ids = self.ids(pipeline)
+        removed = pipeline.nodes[ids["c"]]["wrapped_node"].instance
+
+        def update(p):
+            p.remove_node(ids["c"])
+            e = p.add_node("DeployedStepNode", name="e")
+            e.worker_id = "w1"
+            p.add_edge(ids["b"], e.id)
+
+        _, plan = self.recommit(pipeline, update)
+        assert self.names(pipeline, plan.created) == {"a", "b", "d", "e"}
+        assert plan.kept == {}
+        assert plan.destroyed[ids["c"]].instance is removed
+        assert set(plan.destroyed) == set(ids.values())
+
+    def test_disconnected_worker(self, pipeline):
+        deployment, plan = self.recommit(
+            pipeline, lambda p: None, workers=("w1", "w3")
+        )
+        ids = self.ids(pipeline)
+        assert plan.created == [ids["b"]]
+        assert plan.destroyed == {}
+        assert self.names(pipeline, plan.kept) == {"a", "c", "d"}
+
+    def test_adopt_instances(self, pipeline):
+        ids = self.ids(pipeline)
+        deployment, plan = self.recommit(
+            pipeline,
+            lambda p: p.nodes[ids["b"]]["wrapped_node"].kwargs.update(gain=2),
+        )
+        replaced = pipeline.nodes[ids["a"]]["wrapped_node"].instance
+        pool = NodeInstancePool()
+        pipeline.adopt_instances(
+            {node_id: node.instance for node_id, node in plan.kept.items()},
+            pool,
+        )
+        for node_id, node in plan.kept.items():
+            assert pipeline.nodes[node_id]["wrapped_node"].instance is (
+                node.instance
+            )
+            assert node.instance.id in pipeline.chimerapy_graph.G
+        assert pipeline.nodes[ids["b"]]["wrapped_node"].instance.gain == 2
+        assert pool.acquire(type(replaced), {"name": "a"}) is replaced
+
+        pipeline.destroy()
+        with pytest.raises(ValueError):
+            pipeline.adopt_instances({})
+
+    @pytest.mark.anyio
+    async def test_recommit(self, pipeline):
+        ids = self.ids(pipeline)
+        _, plan = self.recommit(
+            pipeline,
+            lambda p: p.nodes[ids["b"]]["wrapped_node"].kwargs.update(gain=2),
+        )
+        pipeline.adopt_instances(
+            {node_id: node.instance for node_id, node in plan.kept.items()}
+        )
+        instance = pipeline.nodes[ids["b"]]["wrapped_node"].instance
+
+        manager = FakeManager()
+        assert await recommit(manager, pipeline, plan)
+        assert manager.requests == [
+            ("destroy", plan.destroyed[ids["b"]].instance.id),
+            ("register",),
+            ("event", "save_meta"),
+            ("create", instance.id),
+            ("connect", "w2"),
+        ]
+
+        # Nothing is created once a destruction failed
+        manager = FakeManager(failing={plan.destroyed[ids["b"]].instance.id})
+        assert not await recommit(manager, pipeline, plan)
+        assert [request[0] for request in manager.requests] == ["destroy"]
+
+    @pytest.mark.parametrize(
+        "engine_class, name",
+        [
+            (Manager, "_register_graph"),
+            (Manager, "_async_request_node_destruction"),
+            (Manager, "_async_request_node_creation"),
+            (Manager, "_async_request_node_pub_table"),
+            (Manager, "_async_request_connection_creation"),
+            (WorkerHandlerService, "_map_graph"),
+            (EventBus, "asend"),
+        ],
+    )
+    def test_engine_internals(self, engine_class, name):
+        # recommit relies on these internals of the engine, which FakeManager
+        # stands in for: they must be called the same in the engine pinned
+        fake = list(inspect.signature(getattr(FakeManager, name)).parameters)
+        engine = list(inspect.signature(getattr(engine_class, name)).parameters)
+        assert engine[: len(fake)] == fake
+        assert inspect.iscoroutinefunction(
+            getattr(engine_class, name)
+        ) == inspect.iscoroutinefunction(getattr(FakeManager, name))
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from chimerapy.orchestrator.json_patch import apply_patch
+from chimerapy.orchestrator.models.cluster_models import SubscriptionFilter
+from chimerapy.orchestrator.services.cluster_service.frames import (
+    Frame,
+    FrameEncoder,
+    conflate,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class TestFrames(BaseTest):
+    @pytest.fixture(scope="class")
+    def states(self):
+        return [
+            {"id": "manager", "workers": {}},
+            {"id": "manager", "workers": {"w1": {"name": "worker1"}}},
+            {"id": "manager", "workers": {"w1": {"name": "worker-1"}}},
+        ]
+
+    @pytest.fixture(scope="class")
+    def frames(self, states):
+        return [
+            Frame({"signal": "NETWORK_UPDATE", "data": state}, seq=seq)
+            for seq, state in enumerate(states, start=1)
+        ]
+
+    def test_full_encoding(self, frames):
+        encoder = FrameEncoder()
+        for frame in frames:
+            assert json.loads(encoder.encode(frame)) == {
+                **frame.payload,
+                "seq": frame.seq,
+            }
+        assert encoder.encode(frames[1]) is None  # Already sent
+
+    def test_delta_encoding(self, frames, states):
+        encoder = FrameEncoder(delta=True)
+        snapshot = json.loads(encoder.encode(frames[0]))
+        assert snapshot == {**frames[0].payload, "seq": 1}
+
+        state = snapshot["data"]
+        for seq, frame in enumerate(frames[1:], start=2):
+            delta = json.loads(encoder.encode(frame))
+            assert delta["seq"] == seq
+            assert delta["base_seq"] == seq - 1
+            assert "data" not in delta
+            state = apply_patch(state, delta["patch"])
+            assert state == states[seq - 1]
+
+    def test_delta_gap_is_folded_into_patch(self, frames, states):
+        encoder = FrameEncoder(delta=True)
+        encoder.encode(frames[0])
+        delta = json.loads(encoder.encode(frames[2]))
+        assert delta["base_seq"] == 1
+        assert apply_patch(states[0], delta["patch"]) == states[2]
+
+    def test_resync(self, frames):
+        encoder = FrameEncoder(delta=True)
+        encoder.encode(frames[0])
+        encoder.encode(frames[1])
+        encoder.resync()
+        assert encoder.encode(frames[1]) == frames[1].text()
+        assert encoder.encode(frames[1]) is None
+        assert "patch" in json.loads(encoder.encode(frames[2]))
+
+    def test_resume(self, frames, states):
+        encoder = FrameEncoder(delta=True)
+        encoder.resume(frames[0])
+        assert encoder.encode(frames[0]) is None
+        delta = json.loads(encoder.encode(frames[1]))
+        assert apply_patch(states[0], delta["patch"]) == states[1]
+
+    def test_snapshot_base(self, frames, states):
+        # A snapshot numbered as an earlier frame doesn't share its patches
+        snapshot = Frame(frames[1].payload | {"data": states[2]}, seq=2)
+        encoder = FrameEncoder(delta=True)
+        encoder.encode(snapshot)
+        assert json.loads(encoder.encode(frames[2]))["patch"] == []
+        assert frames[2].delta_text(frames[1]) != frames[2].delta_text(snapshot)
+
+    def test_unnumbered_frames(self, frames):
+        encoder = FrameEncoder(delta=True)
+        encoder.encode(frames[0])
+        initial = Frame({"signal": "NETWORK_UPDATE", "data": {}})
+        assert encoder.encode(initial) == initial.text()
+        assert encoder.encode(frames[1]) == frames[1].text()
+
+    def test_encoded_once(self, frames, states):
+        assert frames[1].delta_text(frames[0]) is frames[1].delta_text(
+            frames[0]
+        )
+        assert frames[1].text() is frames[1].text()
+
+    def test_conflate(self, frames):
+        lifecycle = Frame({"signal": "NETWORK_UPDATE", "data": {}})
+        batch = [frames[0], lifecycle, frames[1], "SHUTDOWN", frames[2]]
+        assert conflate(batch) == [lifecycle, "SHUTDOWN", frames[2]]
+        assert conflate([lifecycle]) == [lifecycle]
+
+    def test_filtered_encoding(self, frames):
+        view = SubscriptionFilter(workers=["w2"])
+        encoder = FrameEncoder(view=view)
+        assert json.loads(encoder.encode(frames[1]))["data"]["workers"] == {}
+        assert frames[1].text(view) is FrameEncoder(view=view).encode(frames[1])
+
+        # Empty filters share the unfiltered encoding
+        assert FrameEncoder(view=SubscriptionFilter()).encode(frames[1]) is (
+            frames[1].text()
+        )
+
+    def test_filtered_delta_encoding(self, frames, states):
+        encoder = FrameEncoder(delta=True)
+        encoder.encode(frames[0])
+        encoder.subscribe(SubscriptionFilter(workers=["w2"]))
+
+        snapshot = json.loads(encoder.encode(frames[1]))
+        assert snapshot["data"]["workers"] == {}
+        delta = json.loads(encoder.encode(frames[2]))
+        assert delta["patch"] == []
+
+    def test_msgpack_encoding(self, frames, states):
+        msgpack = pytest.importorskip("msgpack")
+        encoder = FrameEncoder(delta=True, binary=True)
+
+        snapshot = msgpack.unpackb(encoder.encode(frames[0]))
+        assert snapshot == {**frames[0].payload, "seq": 1}
+        delta = msgpack.unpackb(encoder.encode(frames[1]))
+        assert apply_patch(snapshot["data"], delta["patch"]) == states[1]
+
+        assert frames[1].text(binary=True) is frames[1].text(binary=True)
+        assert msgpack.unpackb(frames[1].text(binary=True)) == json.loads(
+            frames[1].text()
+        )
@@ -0,0 +1,246 @@
+import pytest
+
+from chimerapy.orchestrator.models.cluster_models import (
+    ClusterState,
+    PlacementRequest,
+    WorkerCapacity,
+)
+from chimerapy.orchestrator.services.cluster_service.placement import (
+    BinPackingPlacement,
+    LeastLoadedPlacement,
+    MinCutPlacement,
+    NodeDemand,
+    PlacementEngine,
+    PlacementError,
+    RoundRobinPlacement,
+    WorkerLoad,
+)
+from chimerapy.orchestrator.services.pipeline_service import CompactPipeline
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    NodeNotFoundError,
+    Pipeline,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+def make_state(workers):
+    """A cluster state with the nodes of each worker, as (name, cpu, memory[, payload_size])."""
+    return ClusterState.model_validate(
+        {
+            "workers": {
+                worker_id: {
+                    "id": worker_id,
+                    "name": worker_id,
+                    "nodes": {
+                        f"{worker_id}-{name}": {
+                            "id": f"{worker_id}-{name}",
+                            "fsm": "STOPPED",
+                            "name": name,
+                            "diagnostics": {
+                                "timestamp": "",
+                                "latency": 0,
+                                "payload_size": payload_size,
+                                "cpu_usage": cpu,
+                                "memory_usage": memory,
+                                "num_of_steps": 10 if payload_size else 0,
+                            },
+                        }
+                        for name, cpu, memory, payload_size in (
+                            (*node, 0)[:4] for node in nodes
+                        )
+                    },
+                }
+                for worker_id, nodes in workers.items()
+            }
+        }
+    )
+
+
+class TestPlacementStrategies(BaseTest):
+    @pytest.fixture
+    def nodes(self):
+        return [
+            NodeDemand("a", 1.0, 10.0),
+            NodeDemand("b", 4.0, 10.0),
+            NodeDemand("c", 2.0, 10.0),
+            NodeDemand("d", 3.0, 10.0),
+        ]
+
+    def make_workers(self, capacity=None):
+        return [
+            WorkerLoad(worker_id, capacity or WorkerCapacity())
+            for worker_id in ("w1", "w2")
+        ]
+
+    def test_round_robin(self, nodes):
+        workers = self.make_workers()
+        assignments = RoundRobinPlacement().place(nodes, workers)
+        assert assignments == {"a": "w1", "b": "w2", "c": "w1", "d": "w2"}
+
+        # Full workers are skipped
+        workers = self.make_workers()
+        workers[1].capacity = WorkerCapacity(nodes=1)
+        assignments = RoundRobinPlacement().place(nodes, workers)
+        assert assignments == {"a": "w1", "b": "w2", "c": "w1", "d": "w1"}
+
+    def test_least_loaded(self, nodes):
+        workers = self.make_workers()
+        assignments = LeastLoadedPlacement().place(nodes, workers)
+        assert assignments == {"b": "w1", "d": "w2", "c": "w2", "a": "w1"}
+        assert [w.cpu for w in workers] == [5.0, 5.0]
+
+    def test_bin_packing(self, nodes):
+        workers = self.make_workers(WorkerCapacity(cpu=6.0))
+        assignments = BinPackingPlacement().place(nodes, workers)
+        assert assignments == {"b": "w1", "d": "w2", "c": "w1", "a": "w2"}
+
+        workers = self.make_workers(WorkerCapacity(memory=25.0))
+        with pytest.raises(PlacementError):
+            BinPackingPlacement().place(
+                nodes + [NodeDemand("e", 0, 10)], workers
+            )
+
+    def test_min_cut(self):
+        nodes = [NodeDemand(node_id, 1.0, 0.0) for node_id in "abcde"]
+        traffic = {("a", "b"): 1e6, ("c", "d"): 1e6, ("b", "c"): 10.0}
+
+        # The busiest edges are kept within a worker
+        workers = self.make_workers()
+        assignments = MinCutPlacement().place(nodes[:4], workers, traffic)
+        assert assignments == {"a": "w1", "b": "w1", "c": "w2", "d": "w2"}
+
+        # e is drawn to the worker of its pinned neighbour, if it has room
+        workers = self.make_workers()
+        workers[1].add(NodeDemand("pinned", 1.0, 0.0))
+        assignments = MinCutPlacement(imbalance=2.0).place(
+            nodes[4:], workers, {("pinned", "e"): 100.0}
+        )
+        assert assignments == {"e": "w2"}
+        workers = self.make_workers()
+        workers[1].add(NodeDemand("pinned", 1.0, 0.0))
+        assignments = MinCutPlacement().place(
+            nodes[4:], workers, {("pinned", "e"): 100.0}
+        )
+        assert assignments == {"e": "w1"}
+
+        # The capacities and the imbalance limit split the groups
+        workers = self.make_workers(WorkerCapacity(nodes=1))
+        with pytest.raises(PlacementError):
+            MinCutPlacement().place(nodes[:3], workers, traffic)
+        workers = self.make_workers()
+        assignments = MinCutPlacement(imbalance=1.0).place(
+            nodes[:3], workers, {("a", "b"): 10.0, ("b", "c"): 20.0}
+        )
+        assert assignments["b"] == assignments["c"] != assignments["a"]
+
+
+class TestPlacementEngine(BaseTest):
+    @pytest.fixture(params=[Pipeline, CompactPipeline])
+    def pipeline(self, request):
+        pipeline = request.param(name="placed")
+        for name in ("cam", "mic", "show"):
+            pipeline.add_node("WebcamNode", name=name)
+        return pipeline
+
+    @pytest.fixture
+    def node_ids(self, pipeline):
+        return {
+            wrapped_node.kwargs["name"]: node_id
+            for node_id, wrapped_node in pipeline.nodes(data="wrapped_node")
+        }
+
+    def test_plan(self, pipeline, node_ids):
+        # cam ran on w1 before, an unrelated node loads w2
+        state = make_state(
+            {"w1": [("cam", 4.0, 100.0)], "w2": [("other", 3.0, 50.0)]}
+        )
+        plan = PlacementEngine().plan(pipeline, state, PlacementRequest())
+
+        # Without diagnostics, mic and show are estimated like cam
+        assert plan.assignments == {
+            node_ids["cam"]: "w1",
+            node_ids["mic"]: "w2",
+            node_ids["show"]: "w1",
+        }
+        assert plan.workers["w1"].cpu == 8.0
+        assert plan.workers["w2"].cpu == 7.0
+        assert plan.workers["w2"].memory == 150.0
+
+    def test_pins(self, pipeline, node_ids):
+        state = make_state({"w1": [], "w2": []})
+        pipeline.nodes[node_ids["cam"]]["wrapped_node"].worker_id = "w2"
+        pipeline.nodes[node_ids["mic"]]["wrapped_node"].worker_id = "gone"
+        request = PlacementRequest(
+            strategy="bin-packing",
+            pins={node_ids["show"]: "w2"},
+            keep_assigned=True,
+            default_capacity=WorkerCapacity(nodes=2),
+        )
+
+        plan = PlacementEngine().plan(pipeline, state, request)
+        assert plan.assignments == {
+            node_ids["cam"]: "w2",
+            node_ids["show"]: "w2",
+            node_ids["mic"]: "w1",
+        }
+
+        with pytest.raises(PlacementError):
+            PlacementEngine().plan(
+                pipeline, state, PlacementRequest(pins={node_ids["cam"]: "w3"})
+            )
+        with pytest.raises(NodeNotFoundError):
+            PlacementEngine().plan(
+                pipeline, state, PlacementRequest(pins={"unknown": "w1"})
+            )
+
+    def test_traffic(self):
+        pipeline = Pipeline(name="video")
+        cam = pipeline.add_node("WebcamNode", name="cam")
+        show = pipeline.add_node("ShowWindow", name="show")
+        mic = pipeline.add_node("WebcamNode", name="mic")
+        display = pipeline.add_node("ShowWindow", name="display")
+        pipeline.add_edge(cam.id, show.id)
+        pipeline.add_edge(mic.id, display.id)
+
+        # cam sent 1000 KB in a diagnostics interval, mic has the declared
+        # throughput of a webcam
+        state = make_state({"w1": [("cam", 4.0, 0.0, 1000.0)], "w2": []})
+        engine = PlacementEngine(diagnostics_interval=10)
+        cam_rate, mic_rate = 102400.0, 30 * 640 * 480 * 3
+        assert engine.traffic(pipeline, state) == {
+            (cam.id, show.id): cam_rate,
+            (mic.id, display.id): mic_rate,
+        }
+
+        plan = engine.plan(pipeline, state, PlacementRequest())
+        assert plan.cross_worker_traffic == cam_rate + mic_rate
+        plan = engine.plan(
+            pipeline, state, PlacementRequest(strategy="min-cut")
+        )
+        assert plan.cross_worker_traffic == 0
+        assert plan.assignments[cam.id] == plan.assignments[show.id]
+        assert plan.assignments[mic.id] != plan.assignments[cam.id]
+
+        cam.worker_id = show.worker_id = "w1"
+        mic.worker_id = "w2"
+        report = engine.report(pipeline, state)
+        assert report.total == cam_rate + mic_rate
+        assert report.cross_worker == mic_rate
+        assert [(e.source, e.sink) for e in report.cross_worker_edges] == [
+            (mic.id, display.id)
+        ]
+
+    def test_errors(self, pipeline):
+        state = make_state({"w1": []})
+        with pytest.raises(PlacementError):
+            PlacementEngine().plan(
+                pipeline, state, PlacementRequest(strategy="random")
+            )
+        with pytest.raises(PlacementError):
+            PlacementEngine().plan(pipeline, make_state({}), PlacementRequest())
+        with pytest.raises(PlacementError):
+            PlacementEngine().plan(
+                pipeline,
+                state,
+                PlacementRequest(default_capacity=WorkerCapacity(nodes=2)),
+            )
@@ -1,8 +1,16 @@
 import asyncio
+import json
+from pathlib import Path
 
 import pytest
+from websockets import serve
 
+from chimerapy.engine.networking.enums import GENERAL_MESSAGE, MANAGER_MESSAGE
+from chimerapy.engine.states import ManagerState
+from chimerapy.orchestrator.services.cluster_service.frames import Frame
 from chimerapy.orchestrator.services.cluster_service.updates_broadcaster import (
+    ClusterUpdatesBroadCaster,
+    OverflowPolicy,
     UpdatesBroadcaster,
 )
 from chimerapy.orchestrator.tests.base_test import BaseTest
@@ -37,5 +45,372 @@ class TestUpdatesBroadCaster(BaseTest):
 
         for j in range(10):
             msg = await client_queue.get()
-            assert msg["message_id"] == j
-            assert msg["message_type"] == "test"
+            assert msg.payload["message_id"] == j
+            assert msg.payload["message_type"] == "test"
+
+
+class TestBoundedUpdatesBroadcaster(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @staticmethod
+    async def _broadcast(updates_broadcaster, num_updates):
+        for j in range(num_updates):
+            await updates_broadcaster.put_update({"message_id": j})
+            if j % 100 == 0:
+                await asyncio.sleep(0)
+
+        while not updates_broadcaster.update_queue.empty():
+            await asyncio.sleep(0)
+
+    @staticmethod
+    async def _start(policy, max_queue_size=5):
+        updates_broadcaster = UpdatesBroadcaster(
+            max_queue_size=max_queue_size, overflow_policy=policy
+        )
+        await updates_broadcaster.initialize()
+        task = asyncio.create_task(updates_broadcaster.start_broadcast())
+        return updates_broadcaster, task
+
+    @pytest.mark.anyio
+    async def test_drop_oldest(self):
+        updates_broadcaster, task = await self._start(
+            OverflowPolicy.DROP_OLDEST
+        )
+        client_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(client_queue)
+        await self._broadcast(updates_broadcaster, 20)
+
+        assert client_queue.qsize() == 5
+        assert updates_broadcaster.dropped(client_queue) == 15
+        ids = [
+            client_queue.get_nowait().payload["message_id"] for _ in range(5)
+        ]
+        assert ids == list(range(15, 20))
+        task.cancel()
+
+    @pytest.mark.anyio
+    async def test_drop_newest(self):
+        updates_broadcaster, task = await self._start(
+            OverflowPolicy.DROP_NEWEST
+        )
+        client_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(client_queue)
+        await self._broadcast(updates_broadcaster, 20)
+
+        assert client_queue.qsize() == 5
+        assert updates_broadcaster.dropped(client_queue) == 15
+        ids = [
+            client_queue.get_nowait().payload["message_id"] for _ in range(5)
+        ]
+        assert ids == list(range(0, 5))
+        task.cancel()
+
+    @pytest.mark.anyio
+    async def test_coalesce(self):
+        updates_broadcaster, task = await self._start(OverflowPolicy.COALESCE)
+        client_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(client_queue)
+        await self._broadcast(updates_broadcaster, 7)
+
+        assert client_queue.qsize() == 2
+        assert updates_broadcaster.dropped(client_queue) == 5
+        assert client_queue.get_nowait().payload["message_id"] == 5
+        assert client_queue.get_nowait().payload["message_id"] == 6
+        task.cancel()
+
+    @pytest.mark.anyio
+    async def test_send(self):
+        updates_broadcaster, task = await self._start(OverflowPolicy.COALESCE)
+        client_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(client_queue)
+        await self._broadcast(updates_broadcaster, 5)
+
+        # A reply to a single client goes through its overflow policy too
+        updates_broadcaster.send(client_queue, Frame({"message_id": "reply"}))
+        assert client_queue.qsize() == 1
+        assert updates_broadcaster.dropped(client_queue) == 5
+        assert client_queue.get_nowait().payload["message_id"] == "reply"
+
+        await updates_broadcaster.remove_client(client_queue)
+        updates_broadcaster.send(client_queue, Frame({}))
+        assert client_queue.empty()
+        task.cancel()
+
+    def test_default_policy(self):
+        assert UpdatesBroadcaster().overflow_policy is OverflowPolicy.COALESCE
+        assert (
+            ClusterUpdatesBroadCaster("localhost", 0).updater.overflow_policy
+            is OverflowPolicy.COALESCE
+        )
+
+    @pytest.mark.anyio
+    async def test_disconnect(self):
+        updates_broadcaster, task = await self._start(OverflowPolicy.DISCONNECT)
+        slow_queue = asyncio.Queue()
+        fast_queue = asyncio.Queue(maxsize=5)
+        await updates_broadcaster.add_client(slow_queue)
+        await updates_broadcaster.add_client(fast_queue)
+        await self._broadcast(updates_broadcaster, 5)
+        for _ in range(5):
+            fast_queue.get_nowait()
+
+        await self._broadcast(updates_broadcaster, 1)
+
+        assert slow_queue.qsize() == 1
+        assert slow_queue.get_nowait() is None
+        assert fast_queue.get_nowait().payload["message_id"] == 0
+        metrics = updates_broadcaster.metrics()
+        assert len(metrics["clients"]) == 1
+        assert metrics["received"] == 6
+
+        await updates_broadcaster.remove_client(slow_queue)
+        task.cancel()
+
+    @pytest.mark.anyio
+    async def test_sentinel_is_not_dropped(self):
+        updates_broadcaster, task = await self._start(
+            OverflowPolicy.DROP_NEWEST
+        )
+        client_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(client_queue)
+        await self._broadcast(updates_broadcaster, 10)
+        updates_broadcaster.enqueue_sentinel()
+        await task
+
+        assert client_queue.qsize() == 5
+        messages = [client_queue.get_nowait() for _ in range(5)]
+        assert messages[-1] == updates_broadcaster._sentinel
+
+    @pytest.mark.anyio
+    async def test_stalled_client_queue_is_bounded(self):
+        updates_broadcaster, task = await self._start(
+            OverflowPolicy.DROP_OLDEST, max_queue_size=16
+        )
+        stalled_queue = asyncio.Queue()
+        await updates_broadcaster.add_client(stalled_queue)
+
+        for _ in range(9):
+            await self._broadcast(updates_broadcaster, 500)
+            assert stalled_queue.qsize() <= 16
+
+        assert stalled_queue.qsize() == 16
+        assert updates_broadcaster.dropped(stalled_queue) == 4500 - 16
+        task.cancel()
+
+    @pytest.mark.anyio
+    async def test_frames_are_shared(self):
+        updates_broadcaster, task = await self._start(
+            OverflowPolicy.DROP_OLDEST
+        )
+        queues = [asyncio.Queue() for _ in range(3)]
+        for q in queues:
+            await updates_broadcaster.add_client(q)
+
+        await updates_broadcaster.put_update({"message_id": 0, "data": "é"})
+        frames = [await q.get() for q in queues]
+
+        assert all(frame is frames[0] for frame in frames)
+        assert frames[0].text() == '{"message_id":0,"data":"é","seq":1}'
+        assert frames[0].text() is frames[1].text()
+        task.cancel()
+
+
+class TestResumableUpdatesBroadcaster(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.fixture(scope="class")
+    async def broadcaster(self, anyio_backend):
+        broadcaster = UpdatesBroadcaster("STOP", history_size=5)
+        await broadcaster.initialize()
+        task = asyncio.create_task(broadcaster.start_broadcast())
+        for i in range(8):
+            await broadcaster.put_update({"data": i})
+        await broadcaster.put_update({"error": "not numbered"})
+        while broadcaster.update_queue.qsize():
+            await asyncio.sleep(0)
+        yield broadcaster
+        task.cancel()
+
+    @staticmethod
+    def drain(q):
+        return [q.get_nowait() for _ in range(q.qsize())]
+
+    @pytest.mark.anyio
+    async def test_history(self, broadcaster):
+        assert broadcaster.seq == 8
+        assert broadcaster.latest.seq == 8
+        assert [frame.seq for frame in broadcaster.history] == [4, 5, 6, 7, 8]
+        assert broadcaster.get_frame(6).payload == {"data": 5}
+        assert broadcaster.get_frame(2) is None
+
+    @pytest.mark.anyio
+    async def test_resume(self, broadcaster):
+        q = asyncio.Queue()
+        snapshot = broadcaster.snapshot({"data": "current"})
+        await broadcaster.add_client(q, last_seq=5, snapshot=snapshot)
+        assert [frame.seq for frame in self.drain(q)] == [6, 7, 8]
+
+        q = asyncio.Queue()
+        await broadcaster.add_client(q, last_seq=8, snapshot=snapshot)
+        assert self.drain(q) == []
+        await broadcaster.remove_client(q)
+
+    @pytest.mark.anyio
+    async def test_snapshot_when_not_resumable(self, broadcaster):
+        snapshot = broadcaster.snapshot({"data": "current"})
+        assert snapshot.seq == 8
+        for last_seq in [None, 1, 42]:
+            q = asyncio.Queue()
+            await broadcaster.add_client(q, last_seq, snapshot)
+            assert self.drain(q) == [snapshot]
+            await broadcaster.remove_client(q)
+
+    @pytest.mark.anyio
+    async def test_snapshot_is_not_broadcast(self, broadcaster):
+        q1, q2 = asyncio.Queue(), asyncio.Queue()
+        await broadcaster.add_client(q1)
+        await broadcaster.add_client(q2, snapshot=broadcaster.snapshot({}))
+        assert self.drain(q1) == []
+        assert len(self.drain(q2)) == 1
+
+
+class TestClusterUpdatesBroadcaster(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.mark.anyio
+    async def test_network_updates_are_numbered(self):
+        broadcaster = ClusterUpdatesBroadCaster("localhost", 0)
+        state = ManagerState(id="manager", logdir=Path("/tmp")).to_dict()
+
+        for _ in range(3):
+            await broadcaster.put_update({"data": state})
+
+        frames = [
+            broadcaster.updater.update_queue.get_nowait() for _ in range(3)
+        ]
+        assert [frame.seq for frame in frames] == [1, 2, 3]
+        assert [json.loads(frame.text())["seq"] for frame in frames] == [
+            1,
+            2,
+            3,
+        ]
+        delta = json.loads(frames[2].delta_text(frames[1]))
+        assert delta["patch"] == []
+
+    @pytest.mark.anyio
+    async def test_unnumbered_updates_have_no_seq(self):
+        broadcaster = ClusterUpdatesBroadCaster("localhost", 0)
+        await broadcaster.put_update({})
+
+        frame = broadcaster.updater.update_queue.get_nowait()
+        assert frame.seq is None
+        assert "seq" not in json.loads(frame.text())
+
+
+class FakeManager:
+    """A manager websocket that sends an update, then drops the connection."""
+
+    def __init__(self, drops: int):
+        self.drops = drops
+        self.registrations = []
+        self.state = ManagerState(id="manager", logdir=Path("/tmp")).to_dict()
+
+    async def handler(self, ws):
+        self.registrations.append(json.loads(await ws.recv()))
+        await ws.send(
+            json.dumps(
+                {
+                    "signal": MANAGER_MESSAGE.NETWORK_STATUS_UPDATE.value,
+                    "data": self.state,
+                }
+            )
+        )
+        if self.drops > 0:
+            self.drops -= 1
+            await ws.close(code=1011)
+        else:
+            await ws.send(
+                json.dumps({"signal": GENERAL_MESSAGE.SHUTDOWN.value})
+            )
+
+
+class TestReconnectingBroadcaster(BaseTest):
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @staticmethod
+    async def drain(q):
+        messages = []
+        while (msg := await asyncio.wait_for(q.get(), timeout=5)) != "SHUTDOWN":
+            messages.append(msg)
+        return messages
+
+    @pytest.mark.anyio
+    async def test_reconnects_and_resyncs(self):
+        manager = FakeManager(drops=2)
+        async with serve(manager.handler, "localhost", 0) as server:
+            broadcaster = ClusterUpdatesBroadCaster(
+                "localhost",
+                server.sockets[0].getsockname()[1],
+                state_provider=lambda: manager.state,
+                reconnect_delay=0.01,
+            )
+            await broadcaster.initialize()
+            q = asyncio.Queue()
+            await broadcaster.add_client(q)
+            task = asyncio.create_task(broadcaster.broadcast_updates())
+
+            frames = await self.drain(q)
+            await task
+
+        assert len(manager.registrations) == 3
+        assert all(
+            msg["signal"] == GENERAL_MESSAGE.CLIENT_REGISTER.value
+            for msg in manager.registrations
+        )
+        # Each drop is followed by a resync with the current state
+        assert [frame.seq for frame in frames] == [1, 2, 3, 4, 5, None]
+        assert frames[-1].payload["signal"] == "SHUTDOWN"
+
+        health = broadcaster.metrics()["connection"]
+        assert health["connects"] == 3
+        assert health["disconnects"] == 2
+        assert health["reconnect_attempts"] == 2
+
+    @pytest.mark.anyio
+    async def test_gives_up_after_reconnect_attempts(self):
+        manager = FakeManager(drops=1)
+        async with serve(manager.handler, "localhost", 0) as server:
+            broadcaster = ClusterUpdatesBroadCaster(
+                "localhost",
+                server.sockets[0].getsockname()[1],
+                reconnect_attempts=2,
+                reconnect_delay=0.01,
+            )
+            await broadcaster.initialize()
+            server.close(close_connections=False)
+            q = asyncio.Queue()
+            await broadcaster.add_client(q)
+            await broadcaster.broadcast_updates()
+            frames = await self.drain(q)
+
+        assert frames[-1].payload == {"error": "Connection to manager lost."}
+        health = broadcaster.metrics()["connection"]
+        assert health["connected"] is False
+        assert health["reconnect_attempts"] == 2
+
+    def test_backoff_delay(self):
+        broadcaster = ClusterUpdatesBroadCaster(
+            "localhost", 0, reconnect_delay=1, max_reconnect_delay=10
+        )
+        for attempt in range(10):
+            assert (
+                0 <= broadcaster.backoff_delay(attempt) <= min(10, 2**attempt)
+            )
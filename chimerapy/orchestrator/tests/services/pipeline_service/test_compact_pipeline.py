@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from chimerapy.orchestrator.models.pipeline_models import WrappedNode
+from chimerapy.orchestrator.services.pipeline_service import (
+    CompactPipeline,
+    Pipeline,
+)
+from chimerapy.orchestrator.services.pipeline_service.compact_pipeline import (
+    EdgeData,
+    NodeData,
+    NodeRecord,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    NotADagError,
+)
+from chimerapy.orchestrator.tests.services.pipeline_service import (
+    test_pipeline,
+)
+from chimerapy.orchestrator.tests.utils import get_pipeline_config
+
+
+class TestCompactPipeline(test_pipeline.TestPipeline):
+    """Runs the tests of Pipeline on a CompactPipeline, which has its API."""
+
+    @pytest.fixture
+    def pipeline(self):
+        p = CompactPipeline(name="test_pipeline")
+        assert p.name == "test_pipeline"
+        assert p.description == "A pipeline"
+        return p
+
+    def chain(self, pipeline, num_nodes):
+        nodes = [
+            pipeline.add_node("DummyStepNode", name=f"step-{i}")
+            for i in range(num_nodes)
+        ]
+        for source, sink in zip(nodes, nodes[1:]):
+            pipeline.add_edge(source.id, sink.id)
+        return nodes
+
+    def test_compact_storage(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        step, other_step = self.chain(pipeline, 2)
+        pipeline.add_edge(webcam.id, step.id, edge_id="edge")
+
+        assert isinstance(webcam, NodeRecord)
+        assert webcam.NodeClass.__name__ == "WebcamNode"
+        assert not hasattr(webcam, "__dict__")
+        assert isinstance(pipeline.nodes[webcam.id], NodeData)
+        assert dict(pipeline.nodes[webcam.id]) == {"wrapped_node": webcam}
+        assert isinstance(pipeline.edges[webcam.id, step.id], EdgeData)
+        assert pipeline.edges[webcam.id, step.id]["id"] == "edge"
+        with pytest.raises(KeyError):
+            pipeline.nodes[webcam.id]["color"] = "red"
+
+    def test_interned_ids(self, pipeline):
+        step, other_step = self.chain(pipeline, 2)
+        web_json = json.loads(json.dumps(pipeline.to_web_json()))
+        loaded = CompactPipeline.from_web_json(web_json)
+
+        (node_id,) = (key for key in loaded._node if key == step.id)
+        (successor_id,) = loaded._pred[other_step.id]
+        assert successor_id is node_id
+
+    def test_csr(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        first, second, third = self.chain(pipeline, 3)
+        pipeline.add_edge(webcam.id, second.id)
+
+        csr = pipeline.to_csr()
+        assert csr.nodes == [webcam.id, first.id, second.id, third.id]
+        assert list(csr.successors(0)) == [2]
+        assert list(csr.successors(1)) == [2]
+        assert list(csr.successors(3)) == []
+        order = [csr.nodes[node] for node in csr.topological_order()]
+        assert order.index(second.id) < order.index(third.id)
+        assert pipeline.is_dag()
+
+    def test_batch_reorders_on_csr(self, pipeline):
+        nodes = self.chain(pipeline, 4)
+        with pytest.raises(NotADagError):
+            pipeline.update_from_web_json(
+                {
+                    **pipeline.to_web_json(),
+                    "edges": [
+                        *pipeline.to_web_json()["edges"],
+                        {"source": nodes[3].id, "sink": nodes[0].id},
+                    ],
+                }
+            )
+        assert pipeline.number_of_edges() == 3
+
+    def test_networkx_round_trip(self):
+        config = get_pipeline_config("local_camera")
+        pipeline = Pipeline.from_pipeline_config(config)
+        compact = CompactPipeline.from_networkx(pipeline)
+        assert compact.to_web_json() == pipeline.to_web_json()
+
+        exported = compact.to_networkx()
+        assert type(exported) is Pipeline
+        assert all(
+            isinstance(wrapped_node, WrappedNode)
+            for _, wrapped_node in exported.nodes(data="wrapped_node")
+        )
+        assert exported.to_web_json() == pipeline.to_web_json()
+        assert (
+            CompactPipeline.from_pipeline_config(config).to_web_json()["nodes"]
+            != []
+        )
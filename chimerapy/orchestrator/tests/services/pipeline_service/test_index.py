@@ -0,0 +1,76 @@
+import pytest
+
+from chimerapy.orchestrator.services.pipeline_service.index import (
+    InvalidQueryError,
+    PipelineIndex,
+    decode_cursor,
+    encode_cursor,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import Pipeline
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class TestPipelineIndex(BaseTest):
+    @pytest.fixture
+    def index(self):
+        return PipelineIndex()
+
+    def make_pipeline(self, index, name, created_at, tags=()):
+        pipeline = Pipeline(name, tags=tags)
+        pipeline.created_at = created_at
+        index.add(pipeline)
+        pipeline.index = index
+        return pipeline
+
+    def test_query(self, index):
+        pipelines = [
+            self.make_pipeline(index, f"p{j % 3}", 10.0 - j, tags=["t"] * j)
+            for j in range(6)
+        ]
+        by_creation = [p.id for p in reversed(pipelines)]
+        assert index.query() == (by_creation, None)
+        assert index.query({"name": "p0"}) == (
+            [pipelines[3].id, pipelines[0].id],
+            None,
+        )
+        assert index.query({"tag": "t", "name": "p1"})[0] == [
+            pipelines[4].id,
+            pipelines[1].id,
+        ]
+
+        ids, last = index.query(limit=4)
+        assert ids == by_creation[:4]
+        assert index.query(after=last) == (by_creation[4:], None)
+        assert index.query(limit=6) == (by_creation, None)
+
+        with pytest.raises(InvalidQueryError):
+            index.query({"owner": "me"})
+
+    def test_update_and_remove(self, index):
+        first = self.make_pipeline(index, "first", 1.0)
+        second = self.make_pipeline(index, "second", 2.0, tags=["a", "b"])
+
+        second.tags = ["b", "c"]
+        first.instantiated = True
+        assert index.query({"tag": "a"})[0] == []
+        assert index.query({"tag": "c"})[0] == [second.id]
+        assert index.query({"instantiated": True})[0] == [first.id]
+
+        # A new creation time moves the pipeline
+        first.created_at = 3.0
+        assert index.query()[0] == [second.id, first.id]
+
+        index.remove(second.id)
+        index.remove(second.id)
+        assert len(index) == 1
+        assert index.query({"tag": "b"})[0] == []
+        assert index._buckets.keys() == {
+            ("name", "first"),
+            ("instantiated", True),
+            ("committed", False),
+        }
+
+    def test_cursor(self):
+        assert decode_cursor(encode_cursor((1.5, "id"))) == (1.5, "id")
+        with pytest.raises(InvalidQueryError):
+            decode_cursor("invalid")
@@ -0,0 +1,74 @@
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+    freeze,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class Source:
+    pass
+
+
+class Sink:
+    pass
+
+
+class TestNodeInstancePool(BaseTest):
+    def test_freeze(self):
+        assert freeze({"a": [1, {"b": 2}], "c": "d"}) == freeze(
+            {"c": "d", "a": [1, {"b": 2}]}
+        )
+        assert freeze({"a": 1}) != freeze({"a": True})
+        assert freeze([1, 2]) != freeze((1, 2))
+
+    def test_acquire_release(self):
+        pool = NodeInstancePool(capacity=4)
+        assert pool.acquire(Source, {"name": "src"}) is None
+
+        first, second = Source(), Source()
+        pool.release(Source, {"name": "src"}, first)
+        pool.release(Source, {"name": "src"}, second)
+        assert len(pool) == 2
+
+        assert pool.acquire(Source, {"name": "other"}) is None
+        assert pool.acquire(Sink, {"name": "src"}) is None
+        assert {
+            pool.acquire(Source, {"name": "src"}),
+            pool.acquire(Source, {"name": "src"}),
+        } == {first, second}
+        assert pool.acquire(Source, {"name": "src"}) is None
+        assert len(pool) == 0
+        assert (pool.hits, pool.misses) == (2, 4)
+
+    def test_eviction(self):
+        pool = NodeInstancePool(capacity=2)
+        instances = [Source() for _ in range(3)]
+        for i, instance in enumerate(instances):
+            pool.release(Source, {"name": f"src-{i}"}, instance)
+
+        assert len(pool) == 2
+        assert pool.acquire(Source, {"name": "src-0"}) is None
+        assert pool.acquire(Source, {"name": "src-2"}) is instances[2]
+
+        disabled = NodeInstancePool(capacity=0)
+        disabled.release(Source, {"name": "src"}, Source())
+        assert len(disabled) == 0
+
+    def test_unhashable_kwargs(self):
+        pool = NodeInstancePool()
+        kwargs = {"name": "src", "callback": {"unhashable": bytearray()}}
+        pool.release(Source, kwargs, Source())
+        assert len(pool) == 0
+        assert pool.acquire(Source, kwargs) is None
+
+    def test_invalidate(self):
+        pool = NodeInstancePool()
+        pool.release(Source, {"name": "src"}, Source())
+        pool.release(Source, {"name": "src"}, Source())
+        pool.release(Sink, {"name": "sink"}, Sink())
+
+        assert pool.invalidate(Source) == 2
+        assert len(pool) == 1
+        assert pool.acquire(Source, {"name": "src"}) is None
+        assert pool.invalidate() == 1
+        assert len(pool) == 0
@@ -1,9 +1,25 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from networkx import NetworkXError
 
 from chimerapy.engine.node import Node
+from chimerapy.orchestrator.models.pipeline_config import (
+    ChimeraPyPipelineConfig,
+    ReplicasConfig,
+    TemplateConfig,
+    TemplateExpansionError,
+)
+from chimerapy.orchestrator.models.pipeline_models import PipelineBatch
 from chimerapy.orchestrator.registry.utils import step_node
+from chimerapy.orchestrator.services.pipeline_service.instance_pool import (
+    NodeInstancePool,
+)
 from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    BatchOperationError,
+    NodeInstantiationError,
     NodeNotFoundError,
     NotADagError,
     Pipeline,
@@ -13,6 +29,7 @@ from chimerapy.orchestrator.tests.utils import (
     can_find_mmlapipe_configs,
     get_mmlapipe_configs_root_dir,
     get_pipeline_config,
+    get_test_file_path,
 )
 
 
@@ -36,6 +53,35 @@ class TestPipeline(BaseTest):
 
         return DummyStepNode
 
+    @pytest.fixture(scope="class")
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.fixture(scope="session", autouse=True)
+    def failing_step_node(self):
+        @step_node(add_to_registry=True)
+        class FailingStepNode(Node):
+            def __init__(self, name):
+                raise RuntimeError("Missing device")
+
+            def step(self, inputs):
+                return inputs
+
+        return FailingStepNode
+
+    @pytest.fixture(scope="session", autouse=True)
+    def slow_step_node(self):
+        @step_node(add_to_registry=True)
+        class SlowStepNode(Node):
+            def __init__(self, name, delay=1.0):
+                time.sleep(delay)
+                super().__init__(name=name)
+
+            def step(self, inputs):
+                return inputs
+
+        return SlowStepNode
+
     def test_pipeline_adding_nodes(self, pipeline):
         wrapped_node = pipeline.add_node("WebcamNode")
         assert wrapped_node.to_web_node().id == wrapped_node.id
@@ -133,6 +179,425 @@ class TestPipeline(BaseTest):
         assert web_json["edges"][0]["sink"] == wrapped_node_2.id
         assert web_json["description"] == "Webcam to ShowWindow"
 
+    def test_web_json_cache(self, pipeline):
+        wrapped_node_1 = pipeline.add_node("WebcamNode")
+        wrapped_node_2 = pipeline.add_node("ShowWindow")
+        web_json = pipeline.to_web_json()
+        version = pipeline.version
+        assert pipeline.to_web_json() is web_json
+        assert pipeline.to_web_json_bytes() is pipeline.to_web_json_bytes()
+        assert json.loads(pipeline.to_web_json_bytes()) == web_json
+
+        pipeline.add_edge(wrapped_node_1.id, wrapped_node_2.id)
+        assert pipeline.version > version
+        assert len(pipeline.to_web_json()["edges"]) == 1
+
+        version = pipeline.version
+        pipeline.committed = True
+        assert pipeline.version > version
+        assert json.loads(pipeline.to_web_json_bytes())["committed"]
+
+        web_json = pipeline.to_web_json()
+        pipeline.update_from_web_json(
+            {
+                **web_json,
+                "nodes": [
+                    {**node, "worker_id": "worker"}
+                    for node in web_json["nodes"]
+                ],
+            }
+        )
+        assert all(
+            node["worker_id"] == "worker"
+            for node in pipeline.to_web_json()["nodes"]
+        )
+
+    @staticmethod
+    def batch(*operations):
+        return PipelineBatch.model_validate(
+            {"operations": list(operations)}
+        ).operations
+
+    def test_apply_batch(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        diff = pipeline.apply_batch(
+            self.batch(
+                {
+                    "op": "add-node",
+                    "node": {
+                        "id": "step",
+                        "name": "step",
+                        "registry_name": "DummyStepNode",
+                        "worker_id": "worker-1",
+                    },
+                },
+                {
+                    "op": "add-node",
+                    "node": {
+                        "id": "show",
+                        "name": "show",
+                        "registry_name": "ShowWindow",
+                    },
+                },
+                {"op": "add-edge", "source": webcam.id, "sink": "step"},
+                {"op": "add-edge", "source": "step", "sink": "show"},
+                {"op": "update-node", "id": webcam.id, "worker_id": "worker-2"},
+            )
+        )
+
+        assert diff.version == pipeline.version
+        assert [node.id for node in diff.added_nodes] == ["step", "show"]
+        assert diff.added_nodes[0].worker_id == "worker-1"
+        assert [node.worker_id for node in diff.updated_nodes] == ["worker-2"]
+        assert len(diff.added_edges) == 2
+        assert diff.removed_nodes == diff.removed_edges == []
+        assert len(pipeline.to_web_json()["edges"]) == 2
+
+        diff = pipeline.apply_batch(
+            self.batch(
+                {"op": "remove-node", "id": "step"},
+                {"op": "add-edge", "source": webcam.id, "sink": "show"},
+            )
+        )
+        assert diff.removed_nodes == ["step"]
+        assert len(diff.removed_edges) == 2
+        assert [(e["source"], e["sink"]) for e in diff.added_edges] == [
+            (webcam.id, "show")
+        ]
+
+    def test_apply_batch_rollback(self, pipeline):
+        step_1 = pipeline.add_node("DummyStepNode")
+        step_2 = pipeline.add_node("DummyStepNode")
+        pipeline.add_edge(step_1.id, step_2.id)
+        web_json, version = pipeline.to_web_json(), pipeline.version
+
+        with pytest.raises(BatchOperationError) as e:
+            pipeline.apply_batch(
+                self.batch(
+                    {"op": "update-node", "id": step_1.id, "worker_id": "w"},
+                    {"op": "remove-node", "id": step_2.id},
+                    {"op": "remove-node", "id": "missing"},
+                )
+            )
+        assert e.value.index == 2
+        assert isinstance(e.value.error, NodeNotFoundError)
+
+        with pytest.raises(NotADagError):
+            pipeline.apply_batch(
+                self.batch(
+                    {
+                        "op": "remove-edge",
+                        "source": step_1.id,
+                        "sink": step_2.id,
+                    },
+                    {"op": "add-edge", "source": step_2.id, "sink": step_1.id},
+                    {"op": "add-edge", "source": step_1.id, "sink": step_2.id},
+                )
+            )
+
+        assert pipeline.version == version
+        assert pipeline.to_web_json() is web_json
+        assert pipeline._build_web_json()["edges"] == web_json["edges"]
+        assert step_1.worker_id is None
+        with pytest.raises(NotADagError):
+            pipeline.add_edge(step_2.id, step_1.id)
+
+        # Cycles are only checked once all the operations are applied
+        pipeline.apply_batch(
+            self.batch(
+                {"op": "add-edge", "source": step_2.id, "sink": step_1.id},
+                {"op": "remove-edge", "source": step_1.id, "sink": step_2.id},
+            )
+        )
+        assert list(pipeline.edges) == [(step_2.id, step_1.id)]
+        with pytest.raises(NotADagError):
+            pipeline.add_edge(step_1.id, step_2.id)
+
+    def test_apply_batch_rollback_keeps_order(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        step = pipeline.add_node("DummyStepNode")
+        show = pipeline.add_node("ShowWindow")
+        other_show = pipeline.add_node("ShowWindow")
+        pipeline.add_edge(webcam.id, step.id)
+        pipeline.add_edge(step.id, show.id)
+        pipeline.add_edge(webcam.id, other_show.id)
+        web_json = pipeline.to_web_json()
+        nodes, edges = list(pipeline.nodes), list(pipeline.edges)
+
+        with pytest.raises(BatchOperationError):
+            pipeline.apply_batch(
+                self.batch(
+                    {"op": "remove-node", "id": step.id},
+                    {
+                        "op": "remove-edge",
+                        "source": webcam.id,
+                        "sink": other_show.id,
+                    },
+                    {"op": "remove-node", "id": "missing"},
+                )
+            )
+
+        assert list(pipeline.nodes) == nodes
+        assert list(pipeline.edges) == edges
+        assert list(pipeline.predecessors(show.id)) == [step.id]
+        assert pipeline.to_web_json() is web_json
+        assert pipeline._build_web_json() == web_json
+
+    def test_update_from_web_json(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        step = pipeline.add_node("DummyStepNode")
+        show = pipeline.add_node("ShowWindow")
+        other_step = pipeline.add_node("DummyStepNode")
+        pipeline.add_edge(webcam.id, step.id)
+        pipeline.add_edge(step.id, show.id)
+        web_json = pipeline.to_web_json()
+
+        version = pipeline.version
+        assert pipeline.update_from_web_json(web_json) is web_json
+        assert pipeline.version == version  # Nothing changed
+
+        nodes = [
+            {**node, "worker_id": "worker"} if node["id"] == show.id else node
+            for node in web_json["nodes"]
+            if node["id"] != step.id
+        ]
+        updated = pipeline.update_from_web_json(
+            {
+                **web_json,
+                "nodes": nodes,
+                "edges": [{"source": webcam.id, "sink": show.id}],
+            }
+        )
+        assert step.id not in pipeline.nodes
+        assert list(pipeline.edges) == [(webcam.id, show.id)]
+        assert show.worker_id == "worker"
+        assert [node["id"] for node in updated["nodes"]] == [
+            webcam.id,
+            show.id,
+            other_step.id,
+        ]
+
+        with pytest.raises(NotADagError):
+            pipeline.update_from_web_json(
+                {
+                    **updated,
+                    "edges": [
+                        *updated["edges"],
+                        {"source": other_step.id, "sink": other_step.id},
+                    ],
+                }
+            )
+        assert pipeline.to_web_json() is updated
+
+    def test_update_from_web_json_defaults(self, pipeline):
+        slow = pipeline.add_node("SlowStepNode", delay=0)
+        show = pipeline.add_node("ShowWindow")
+        pipeline.add_edge(slow.id, show.id)
+        web_json, version = pipeline.to_web_json(), pipeline.version
+
+        # The fields left out are unchanged
+        nodes = [
+            {
+                key: value
+                for key, value in node.items()
+                if key not in ("type", "package", "kwargs")
+            }
+            for node in web_json["nodes"]
+        ]
+        assert pipeline.update_from_web_json({**web_json, "nodes": nodes}) is (
+            web_json
+        )
+        assert pipeline.version == version
+        assert slow.kwargs == {"delay": 0}
+
+        nodes[0]["kwargs"] = {"delay": 0.0}
+        pipeline.update_from_web_json({**web_json, "nodes": nodes})
+        assert pipeline.version == version
+
+    def test_update_from_web_json_new_node_edges(self, pipeline):
+        webcam = pipeline.add_node("WebcamNode")
+        web_json = pipeline.to_web_json()
+
+        updated = pipeline.update_from_web_json(
+            {
+                **web_json,
+                "nodes": [
+                    *web_json["nodes"],
+                    {"name": "show", "registry_name": "ShowWindow"},
+                ],
+                "edges": [{"source": webcam.id, "sink": "show"}],
+            }
+        )
+        show = next(node for node in updated["nodes"] if node["name"] == "show")
+        assert list(pipeline.edges) == [(webcam.id, show["id"])]
+
+    @pytest.mark.anyio
+    async def test_instantiate_async(self, pipeline):
+        slow = pipeline.add_node("SlowStepNode")
+        other_slow = pipeline.add_node("SlowStepNode")
+        pipeline.add_edge(slow.id, other_slow.id)
+        for wrapped_node in (slow, other_slow):
+            wrapped_node.worker_id = "worker"
+
+        events = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            await pipeline.instantiate_async(
+                executor, node_timeout=10, on_progress=events.append
+            )
+
+        assert time.perf_counter() - start < 2  # Constructed concurrently
+        assert pipeline.instantiated
+        assert slow.instance.name == slow.name
+        assert other_slow.instance.name == other_slow.name
+        assert [event["completed"] for event in events] == [1, 2]
+        assert {event["node_id"] for event in events} == {
+            slow.id,
+            other_slow.id,
+        }
+        assert all(event["status"] == "instantiated" for event in events)
+        assert all(event["total"] == 2 for event in events)
+
+    @pytest.mark.anyio
+    async def test_instantiate_async_queued_nodes(self, pipeline):
+        slow_nodes = [
+            pipeline.add_node("SlowStepNode", delay=0.2) for _ in range(6)
+        ]
+        for wrapped_node in slow_nodes:
+            wrapped_node.worker_id = "worker"
+
+        # Six nodes on two workers take 0.6s, each one only 0.2s once started
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            await pipeline.instantiate_async(
+                executor, node_timeout=0.4, max_workers=2
+            )
+
+        assert pipeline.instantiated
+        assert all(node.instance is not None for node in slow_nodes)
+
+    @pytest.mark.anyio
+    async def test_instantiate_async_errors(self, pipeline):
+        step = pipeline.add_node("SlowStepNode", delay=0)
+        failing = pipeline.add_node("FailingStepNode")
+        slow = pipeline.add_node("SlowStepNode")
+        for wrapped_node in (step, failing, slow):
+            wrapped_node.worker_id = "worker"
+
+        events = []
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            with pytest.raises(NodeInstantiationError) as e:
+                await pipeline.instantiate_async(
+                    executor, node_timeout=0.2, on_progress=events.append
+                )
+
+        assert e.value.errors == {
+            failing.id: "RuntimeError: Missing device",
+            slow.id: "Timed out after 0.2s",
+        }
+        assert not pipeline.instantiated
+        assert step.instance is None
+        assert {event["node_id"]: event["status"] for event in events} == {
+            step.id: "instantiated",
+            failing.id: "failed",
+            slow.id: "failed",
+        }
+
+    @pytest.mark.anyio
+    async def test_instantiate_reuses_instances(self, pipeline):
+        slow = pipeline.add_node("SlowStepNode", name="slow", delay=0)
+        other_slow = pipeline.add_node("SlowStepNode", name="other", delay=0)
+        for wrapped_node in (slow, other_slow):
+            wrapped_node.worker_id = "worker"
+
+        pool = NodeInstancePool()
+        await pipeline.instantiate_async(pool=pool)
+        instance, other_instance = slow.instance, other_slow.instance
+        pipeline.destroy(pool)
+        assert slow.instance is None
+        assert len(pool) == 2
+
+        pipeline.apply_batch(
+            self.batch(
+                {
+                    "op": "update-node",
+                    "id": other_slow.id,
+                    "kwargs": {"name": "other", "delay": 0.01},
+                }
+            )
+        )
+        events = []
+        await pipeline.instantiate_async(pool=pool, on_progress=events.append)
+        assert slow.instance is instance
+        assert other_slow.instance is not other_instance
+        assert {event["node_id"]: event["status"] for event in events} == {
+            slow.id: "reused",
+            other_slow.id: "instantiated",
+        }
+
+        pipeline.destroy(pool)
+        pipeline.instantiate(pool)
+        assert slow.instance is instance
+
+    def test_add_replicas(self, pipeline):
+        dashboard = pipeline.add_node("ShowWindow", name="dashboard")
+        template = TemplateConfig(
+            name="participant",
+            parameters={"delay": 0.5},
+            nodes=[
+                "WebcamNode",
+                {
+                    "registry_name": "SlowStepNode",
+                    "name": "step",
+                    "kwargs": {"delay": "{delay}"},
+                },
+            ],
+            adj=[("WebcamNode", "step")],
+        )
+        replicas = ReplicasConfig(
+            count=50,
+            workers=["worker-{index}"],
+            links=[("step", "dashboard")],
+        )
+        version = pipeline.version
+
+        diff = pipeline.add_replicas(template, replicas)
+        assert pipeline.version == version + 1
+        assert len(diff.added_nodes) == 100
+        assert len(diff.added_edges) == 100
+        assert pipeline.in_degree(dashboard.id) == 50
+
+        step = diff.added_nodes[3]
+        assert step.name == "participant-2-step"
+        assert step.worker_id == "worker-2"
+        assert step.kwargs == {"delay": 0.5, "name": "participant-2-step"}
+        assert pipeline.has_edge(diff.added_nodes[2].id, step.id)
+
+        # A failed expansion leaves the pipeline as is
+        pipeline.add_node("ShowWindow", name="dashboard")
+        with pytest.raises(TemplateExpansionError):
+            pipeline.add_replicas(template, replicas)
+        with pytest.raises(TemplateExpansionError):
+            pipeline.add_replicas(template, ReplicasConfig(prefix="", count=2))
+        assert len(pipeline) == 102
+
+    def test_from_templated_config(self):
+        with get_test_file_path("templated_pipeline.json").open() as f:
+            config = ChimeraPyPipelineConfig.model_validate(json.load(f))
+
+        pipeline = Pipeline.from_pipeline_config(config)
+        expanded = Pipeline.from_pipeline_config(config.expand_templates())
+        assert len(pipeline) == len(expanded) == 7
+        assert sorted(
+            (node["name"], node["worker_id"], node["kwargs"]["label"])
+            for node in pipeline.to_web_json()["nodes"]
+            if node["registry_name"] == "WebcamNode"
+        ) == [
+            ("p1-webcam", "worker-1", "p1-camera-1"),
+            ("p2-webcam", "worker-2", "p2-camera-2"),
+            ("p3-webcam", "worker-3", "p3-camera-3"),
+        ]
+        assert pipeline.number_of_edges() == expanded.number_of_edges() == 6
+
     def test_from_local_camera(self):
         config = get_pipeline_config("local_camera")
         pipeline = Pipeline.from_pipeline_config(config)
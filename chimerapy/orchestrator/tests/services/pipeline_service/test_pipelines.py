@@ -2,10 +2,22 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from chimerapy.orchestrator.services.pipeline_service.compact_pipeline import (
+    CompactPipeline,
+)
+from chimerapy.orchestrator.services.pipeline_service.index import (
+    InvalidQueryError,
+)
+from chimerapy.orchestrator.services.pipeline_service.pipeline import (
+    Pipeline,
+)
 from chimerapy.orchestrator.services.pipeline_service.pipelines import (
     PipelineNotFoundError,
     Pipelines,
 )
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    SQLitePipelineStore,
+)
 from chimerapy.orchestrator.tests.base_test import BaseTest
 
 
@@ -128,6 +140,253 @@ class TestPipelines(BaseTest):
         pipelines.remove_pipeline(pipeline.id)
         assert pipeline.id not in pipelines._pipelines
 
+    def test_instantiation_executor(self):
+        pipelines = Pipelines(instantiation_workers=2)
+        executor = pipelines.executor
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert pipelines.executor is executor
+        pipelines.shutdown()
+        assert pipelines.executor is not executor
+        pipelines.shutdown()
+
+        with pytest.raises(ValueError):
+            Pipelines(instantiation_executor="fiber")
+
+    def test_list_pipelines(self, pipelines):
+        created = [
+            pipelines.create_pipeline(
+                f"test_pipeline{j % 2}", "", tags=["tagged"] if j < 2 else []
+            ).unwrap()
+            for j in range(4)
+        ]
+        page, cursor = pipelines.list_pipelines(limit=3, fields=["id"]).unwrap()
+        assert page == [{"id": pipeline.id} for pipeline in created[:3]]
+        page, cursor = pipelines.list_pipelines(
+            cursor=cursor, limit=3, fields=["id"]
+        ).unwrap()
+        assert page == [{"id": created[3].id}]
+        assert cursor is None
+
+        page, _ = pipelines.list_pipelines(
+            {"name": "test_pipeline1", "tag": "tagged"}
+        ).unwrap()
+        assert page == [created[1].to_web_json()]
+
+        # The indexes follow the changes of the pipelines
+        created[0].name = "renamed"
+        created[2].tags = ["tagged", "tagged"]
+        created[3].committed = True
+        assert pipelines.get_pipelines_by_name("renamed").unwrap() == [
+            created[0]
+        ]
+        page, _ = pipelines.list_pipelines(
+            {"tag": "tagged", "committed": False}, fields=["id", "tags"]
+        ).unwrap()
+        assert page == [
+            {"id": pipeline.id, "tags": ["tagged"]} for pipeline in created[:3]
+        ]
+
+        pipelines.remove_pipeline(created[1].id)
+        assert created[1].id not in pipelines.index
+        assert pipelines.get_pipelines_by_name("test_pipeline1").unwrap() == [
+            created[3]
+        ]
+
+        with pytest.raises(InvalidQueryError):
+            pipelines.list_pipelines(fields=["id", "secret"]).unwrap()
+        with pytest.raises(InvalidQueryError):
+            pipelines.list_pipelines({"owner": "me"}).unwrap()
+
+    def test_store(self, tmp_path):
+        path = str(tmp_path / "pipelines.db")
+        pipelines = Pipelines(store=SQLitePipelineStore(path))
+        pipeline = pipelines.create_pipeline(
+            "test_pipeline", "test_description"
+        ).unwrap()
+        webcam = pipelines.add_node_to(pipeline.id, "WebcamNode").unwrap()
+        show = pipelines.add_node_to(pipeline.id, "ShowWindow").unwrap()
+        removed = pipelines.add_node_to(pipeline.id, "ShowWindow").unwrap()
+        pipelines.add_edge_to(pipeline.id, (webcam.id, show.id)).unwrap()
+        pipelines.remove_node_from(pipeline.id, removed.id).unwrap()
+        pipelines.patch_pipeline(
+            pipeline.id,
+            [
+                {"op": "replace", "path": "/name", "value": "renamed"},
+                {"op": "add", "path": "/tags/-", "value": "stored"},
+                {"op": "replace", "path": "/nodes/0/worker_id", "value": "w"},
+            ],
+        ).unwrap()
+        removed_pipeline = pipelines.create_pipeline("removed", "").unwrap()
+        pipelines.remove_pipeline(removed_pipeline.id)
+        pipelines.shutdown()
+
+        restarted = Pipelines(store=SQLitePipelineStore(path))
+        assert set(restarted._stored) == {pipeline.id}
+        assert restarted._pipelines == {}
+
+        restored = restarted.get_pipeline(pipeline.id).unwrap()
+        assert restored.to_web_json() == pipeline.to_web_json()
+        assert restored.tags == ("stored",)
+        assert restarted.web_json().unwrap() == [pipeline.to_web_json()]
+        restarted.shutdown()
+
+    def test_store_snapshots(self, tmp_path):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store, snapshot_interval=3)
+        pipeline = pipelines.create_pipeline("test_pipeline", "").unwrap()
+        for _ in range(4):
+            pipelines.add_node_to(pipeline.id, "WebcamNode").unwrap()
+
+        # The third edit saved a snapshot, the fourth was logged after it
+        document, edits = store.load(pipeline.id)
+        assert len(document["nodes"]) == 3
+        assert len(edits) == 1
+
+        # Failed edits aren't logged
+        pipelines.remove_node_from(pipeline.id, "missing")
+        assert len(store.load(pipeline.id)[1]) == 1
+
+        restarted = Pipelines(store=store)
+        assert (
+            restarted.get_pipeline(pipeline.id).unwrap().to_web_json()
+            == pipeline.to_web_json()
+        )
+        pipelines.shutdown()
+
+    def test_list_stored_pipelines(self, tmp_path):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store)
+        created = [
+            pipelines.create_pipeline(f"test_pipeline{j}", "").unwrap()
+            for j in range(4)
+        ]
+        pipelines.add_node_to(created[2].id, "WebcamNode").unwrap()
+
+        restarted = Pipelines(store=store)
+        page, cursor = restarted.list_pipelines(
+            limit=2, fields=["id", "name", "committed"]
+        ).unwrap()
+        assert page == [
+            {"id": pipeline.id, "name": pipeline.name, "committed": False}
+            for pipeline in created[:2]
+        ]
+        assert restarted._pipelines == {}  # Listed from the metadata
+
+        # Only the pipelines of the page are loaded for their nodes
+        page, _ = restarted.list_pipelines(
+            cursor=cursor, limit=1, fields=["id", "nodes"]
+        ).unwrap()
+        assert page == [
+            {"id": created[2].id, "nodes": created[2].to_web_json()["nodes"]}
+        ]
+        assert list(restarted._pipelines) == [created[2].id]
+        pipelines.shutdown()
+
+    def test_store_quarantine(self, tmp_path, caplog):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store)
+        pipeline = pipelines.create_pipeline("stored", "").unwrap()
+        corrupt = pipelines.create_pipeline("corrupt", "").unwrap()
+        store.append(corrupt.id, [{"op": "remove-node", "id": "missing"}])
+
+        restarted = Pipelines(store=store)
+        version = restarted.web_json_version().unwrap()
+        page, _ = restarted.list_pipelines(fields=["id", "name"]).unwrap()
+        assert page == [
+            {"id": pipeline.id, "name": "stored"},
+            {"id": corrupt.id, "name": "corrupt"},
+        ]
+        page, _ = restarted.list_pipelines(fields=["id", "edges"]).unwrap()
+        assert page == [{"id": pipeline.id, "edges": []}]
+        assert f"Quarantining pipeline {corrupt.id}" in caplog.text
+
+        assert restarted.web_json_version().unwrap() != version
+        assert restarted.get_pipelines_by_name("corrupt").unwrap() == []
+        with pytest.raises(PipelineNotFoundError):
+            restarted.get_pipeline(corrupt.id).unwrap()
+        assert [metadata.id for metadata in store.metadata()] == [pipeline.id]
+        pipelines.shutdown()
+
+    def test_store_failed_edit(self, tmp_path, monkeypatch):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store)
+        pipeline = pipelines.create_pipeline("test_pipeline", "").unwrap()
+        webcam = pipelines.add_node_to(pipeline.id, "WebcamNode").unwrap()
+        web_json = pipeline.to_web_json()
+
+        def append(pipeline_id, operations):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(store, "append", append)
+        with pytest.raises(OSError):
+            pipelines.add_node_to(pipeline.id, "ShowWindow").unwrap()
+        with pytest.raises(OSError):
+            pipelines.remove_node_from(pipeline.id, webcam.id).unwrap()
+        with pytest.raises(OSError):
+            pipelines.patch_pipeline(
+                pipeline.id,
+                [{"op": "replace", "path": "/name", "value": "renamed"}],
+            ).unwrap()
+
+        # The edits that couldn't be logged are undone
+        assert pipeline.to_web_json() == web_json
+        assert pipelines.get_pipelines_by_name("test_pipeline").unwrap() == [
+            pipeline
+        ]
+        pipelines.shutdown()
+
+    @pytest.mark.parametrize("stored", [False, True])
+    def test_edits_dont_build_web_json(self, tmp_path, monkeypatch, stored):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store if stored else None)
+        pipeline = pipelines.create_pipeline("test_pipeline", "").unwrap()
+        built = []
+        to_web_json = Pipeline.to_web_json
+
+        def counting_to_web_json(self, *args, **kwargs):
+            built.append(self.id)
+            return to_web_json(self, *args, **kwargs)
+
+        monkeypatch.setattr(Pipeline, "to_web_json", counting_to_web_json)
+        webcam = pipelines.add_node_to(pipeline.id, "WebcamNode").unwrap()
+        show = pipelines.add_node_to(pipeline.id, "ShowWindow").unwrap()
+        pipelines.add_edge_to(pipeline.id, (webcam.id, show.id)).unwrap()
+        pipelines.remove_edge_from(pipeline.id, (webcam.id, show.id)).unwrap()
+        pipelines.add_edge_to(pipeline.id, (webcam.id, show.id)).unwrap()
+        pipelines.remove_node_from(pipeline.id, show.id).unwrap()
+        assert built == []
+
+        if stored:
+            monkeypatch.undo()
+            restarted = Pipelines(store=store)
+            assert (
+                restarted.get_pipeline(pipeline.id).unwrap().to_web_json()
+                == pipeline.to_web_json()
+            )
+        pipelines.shutdown()
+
+    def test_compact_graph_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            Pipelines(graph_backend="arrays")
+
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        pipelines = Pipelines(store=store, graph_backend="compact")
+        pipeline = pipelines.create_pipeline("test_pipeline", "").unwrap()
+        assert isinstance(pipeline, CompactPipeline)
+        webcam = pipelines.add_node_to(pipeline.id, "WebcamNode").unwrap()
+        show = pipelines.add_node_to(pipeline.id, "ShowWindow").unwrap()
+        pipelines.add_edge_to(pipeline.id, (webcam.id, show.id)).unwrap()
+        pipelines.patch_pipeline(
+            pipeline.id,
+            [{"op": "replace", "path": "/nodes/0/worker_id", "value": "w"}],
+        ).unwrap()
+
+        restarted = Pipelines(store=store, graph_backend="compact")
+        restored = restarted.get_pipeline(pipeline.id).unwrap()
+        assert isinstance(restored, CompactPipeline)
+        assert restored.to_web_json() == pipeline.to_web_json()
+        pipelines.shutdown()
+
     def test_web_json(self, pipelines):
         node_choices = ["WebcamNode", "ShowWindow"]
         pipelines_created = []
@@ -158,6 +417,8 @@ class TestPipelines(BaseTest):
                 "instantiated": False,
                 "committed": False,
                 "description": "test_description",
+                "tags": [],
+                "created_at": pipelines_created[0].created_at,
                 "nodes": [
                     {
                         "name": "WebcamNode",
@@ -192,6 +453,8 @@ class TestPipelines(BaseTest):
                 "instantiated": False,
                 "committed": False,
                 "description": "test_description",
+                "tags": [],
+                "created_at": pipelines_created[1].created_at,
                 "nodes": [
                     {
                         "name": "WebcamNode",
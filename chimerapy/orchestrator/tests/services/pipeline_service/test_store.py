@@ -0,0 +1,120 @@
+import pytest
+
+from chimerapy.orchestrator.services.pipeline_service.store import (
+    PipelineMetadata,
+    SQLitePipelineStore,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class TestSQLitePipelineStore(BaseTest):
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = SQLitePipelineStore(str(tmp_path / "pipelines.db"))
+        yield store
+        store.close()
+
+    def test_save_and_load(self, store):
+        assert store.load("missing") is None
+        store.save("pipeline", {"id": "pipeline", "nodes": []})
+        assert store.append("pipeline", [{"op": "remove-node", "id": "a"}]) == 1
+        assert store.append("pipeline", [{"op": "remove-node", "id": "b"}]) == 2
+
+        assert store.pipeline_ids() == ["pipeline"]
+        assert store.load("pipeline") == (
+            {"id": "pipeline", "nodes": []},
+            [
+                [{"op": "remove-node", "id": "a"}],
+                [{"op": "remove-node", "id": "b"}],
+            ],
+        )
+
+        # A snapshot discards the log
+        store.save("pipeline", {"id": "pipeline", "nodes": ["a"]})
+        assert store.load("pipeline") == (
+            {"id": "pipeline", "nodes": ["a"]},
+            [],
+        )
+        assert store.append("pipeline", []) == 1
+
+    def test_delete(self, store):
+        store.save("first", {})
+        store.save("second", {})
+        store.append("first", [])
+        store.delete("first")
+        assert store.pipeline_ids() == ["second"]
+        assert store.load("first") is None
+
+    def test_reopen(self, store, tmp_path):
+        store.save("pipeline", {"name": "stored"})
+        store.append("pipeline", [{"op": "remove-node", "id": "a"}])
+        assert (
+            store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+            == "wal"
+        )
+
+        reopened = SQLitePipelineStore(store.path)
+        try:
+            assert reopened.load("pipeline") == (
+                {"name": "stored"},
+                [[{"op": "remove-node", "id": "a"}]],
+            )
+            # The log length is counted from the loaded edits
+            assert reopened.append("pipeline", []) == 2
+        finally:
+            reopened.close()
+
+    def test_metadata(self, store):
+        store.save(
+            "first",
+            {"id": "first", "name": "a", "tags": ["x"], "created_at": 2.0},
+        )
+        store.save("second", {"id": "second", "name": "b", "created_at": 1.0})
+        store.append(
+            "first",
+            [
+                {"op": "remove-node", "id": "a"},
+                {
+                    "op": "update-pipeline",
+                    "name": "renamed",
+                    "description": "described",
+                    "tags": ["y"],
+                },
+            ],
+        )
+
+        assert store.metadata() == [
+            PipelineMetadata("second", "b", None, (), 1.0),
+            PipelineMetadata("first", "renamed", "described", ("y",), 2.0),
+        ]
+        store.delete("second")
+        assert [metadata.id for metadata in store.metadata()] == ["first"]
+
+    def test_metadata_of_older_stores(self, store):
+        store.save("pipeline", {"name": "stored", "created_at": 1.0})
+        store.append(
+            "pipeline",
+            [{"op": "update-pipeline", "name": "renamed", "description": ""}],
+        )
+        store._connection.execute("DROP TABLE pipelines")
+
+        reopened = SQLitePipelineStore(store.path)
+        try:
+            assert reopened.metadata() == [
+                PipelineMetadata("pipeline", "renamed", "", (), 1.0)
+            ]
+        finally:
+            reopened.close()
+
+    def test_quarantine(self, store):
+        store.save("corrupt", {})
+        store.save("pipeline", {})
+        store.quarantine("corrupt", "ValueError()")
+
+        assert store.pipeline_ids() == ["pipeline"]
+        assert [metadata.id for metadata in store.metadata()] == ["pipeline"]
+        assert store.load("corrupt") == ({}, [])
+
+        # A new snapshot lists it again
+        store.save("corrupt", {})
+        assert len(store.metadata()) == 2
@@ -0,0 +1,55 @@
+import random
+
+import networkx as nx
+
+from chimerapy.orchestrator.services.pipeline_service.topological_order import (
+    TopologicalOrder,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class TestTopologicalOrder(BaseTest):
+    @staticmethod
+    def add_edge(graph, order, source, sink):
+        if order.add_edge(source, sink, graph._succ, graph._pred):
+            graph.add_edge(source, sink)
+            return True
+        return False
+
+    def test_reorders_nodes(self):
+        graph, order = nx.DiGraph(), TopologicalOrder()
+        for node in "abc":
+            graph.add_node(node)
+            order.add_node(node)
+
+        assert self.add_edge(graph, order, "c", "b")
+        assert self.add_edge(graph, order, "b", "a")
+        assert order["c"] < order["b"] < order["a"]
+        assert not self.add_edge(graph, order, "a", "c")
+        assert not self.add_edge(graph, order, "a", "a")
+        assert order["c"] < order["b"] < order["a"]
+
+    def test_agrees_with_networkx(self):
+        rng = random.Random(0)
+        graph, order = nx.DiGraph(), TopologicalOrder()
+        for node in range(50):
+            graph.add_node(node)
+            order.add_node(node)
+
+        for _ in range(500):
+            source, sink = rng.sample(range(50), 2)
+            if graph.has_edge(source, sink):
+                continue
+            creates_cycle = nx.has_path(graph, sink, source)
+            assert self.add_edge(graph, order, source, sink) != creates_cycle
+            assert all(order[u] < order[v] for u, v in graph.edges)
+
+            if rng.random() < 0.1:
+                node = rng.choice(list(graph.nodes))
+                graph.remove_node(node)
+                order.remove_node(node)
+                graph.add_node(node)
+                order.add_node(node)
+
+        assert nx.is_directed_acyclic_graph(graph)
+        assert len(order) == 50
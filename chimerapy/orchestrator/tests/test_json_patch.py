@@ -0,0 +1,102 @@
+import pytest
+
+from chimerapy.orchestrator.json_patch import (
+    JsonPatchError,
+    apply_patch,
+    make_patch,
+)
+from chimerapy.orchestrator.tests.base_test import BaseTest
+
+
+class TestJsonPatch(BaseTest):
+    @pytest.fixture(scope="class")
+    def old(self):
+        return {
+            "id": "manager",
+            "workers": {
+                "w1": {"name": "worker1", "nodes": {"n1": {"fsm": "READY"}}},
+                "w/2": {"name": "worker2", "nodes": {}},
+            },
+            "ports": [1, 2],
+            "enabled": True,
+        }
+
+    @pytest.fixture(scope="class")
+    def new(self):
+        return {
+            "id": "manager",
+            "workers": {
+                "w1": {
+                    "name": "worker1",
+                    "nodes": {"n1": {"fsm": "PREVIEWING"}},
+                },
+                "w3": {"name": "worker3", "nodes": {}},
+            },
+            "ports": [1, 2, 3],
+            "enabled": 1,
+        }
+
+    def test_make_patch(self, old, new):
+        patch = make_patch(old, new)
+        assert {"op": "remove", "path": "/workers/w~12"} in patch
+        assert {
+            "op": "replace",
+            "path": "/workers/w1/nodes/n1/fsm",
+            "value": "PREVIEWING",
+        } in patch
+        assert {"op": "replace", "path": "/ports", "value": [1, 2, 3]} in patch
+        assert {"op": "replace", "path": "/enabled", "value": 1} in patch
+        assert len(patch) == 5
+
+    def test_no_changes(self, old):
+        assert make_patch(old, old) == []
+        assert make_patch(old, {**old}) == []
+
+    def test_round_trip(self, old, new):
+        patched = apply_patch(old, make_patch(old, new))
+        assert patched == new
+        assert "w/2" in old["workers"]
+
+    def test_list_operations(self):
+        doc = {"nodes": [{"id": "a"}, {"id": "b"}]}
+        patched = apply_patch(
+            doc,
+            [
+                {"op": "add", "path": "/nodes/-", "value": {"id": "c"}},
+                {"op": "remove", "path": "/nodes/0"},
+                {"op": "replace", "path": "/nodes/0/id", "value": "d"},
+            ],
+        )
+        assert patched == {"nodes": [{"id": "d"}, {"id": "c"}]}
+
+    def test_move_copy_test(self):
+        doc = {"a": {"b": [1, 2]}, "c": True}
+        patched = apply_patch(
+            doc,
+            [
+                {"op": "test", "path": "/c", "value": True},
+                {"op": "copy", "from": "/a/b", "path": "/d"},
+                {"op": "move", "from": "/a/b/0", "path": "/a/b/-"},
+                {"op": "move", "from": "/c", "path": "/e"},
+                {"op": "test", "path": "/d", "value": [1, 2]},
+            ],
+        )
+        assert patched == {"a": {"b": [2, 1]}, "d": [1, 2], "e": True}
+
+        with pytest.raises(JsonPatchError):
+            apply_patch(doc, [{"op": "test", "path": "/c", "value": 1}])
+
+        with pytest.raises(JsonPatchError):
+            apply_patch(doc, [{"op": "move", "from": "/a", "path": "/a/x"}])
+
+    def test_invalid_patches(self, old):
+        with pytest.raises(JsonPatchError):
+            apply_patch(old, [{"op": "remove", "path": "/missing"}])
+
+        with pytest.raises(JsonPatchError):
+            apply_patch(
+                old, [{"op": "replace", "path": "/ports/5", "value": 1}]
+            )
+
+        with pytest.raises(JsonPatchError):
+            apply_patch(old, [{"op": "unknown", "path": "/id"}])
@@ -26,6 +26,26 @@ class TestRegisteredNodes(BaseTest):
             "ShowWindow", "chimerapy-orchestrator"
         )
 
+    def test_registry_version(self):
+        dnodes = DiscoveredNodes()
+        version = dnodes.version
+        dnodes.add_node(
+            "ScreenCaptureNode", get_registered_node("ScreenCaptureNode")
+        )  # Without a package, the node isn't added
+        assert dnodes.version == version
+
+        dnodes.add_node(
+            "ScreenCaptureNode",
+            get_registered_node("ScreenCaptureNode"),
+            package="a-package",
+        )
+        assert dnodes.version != version
+
+        version = dnodes.version
+        dnodes.remove_package("a-package")
+        assert dnodes.version != version
+        assert DiscoveredNodes().version != dnodes.version
+
     @pytest.mark.skipif(
         not can_find_plugin_nodes_package(),
         reason="plugin-nodes-package not found",